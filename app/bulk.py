@@ -0,0 +1,318 @@
+from __future__ import annotations
+import argparse, csv, json, sqlite3, sys, time, uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import db
+from cache import invalidate_all
+from supplier import _require_uuid, _require_email
+from schema import _parse_id_list, ensure_schema
+
+# Result
+@dataclass
+class ImportReport:
+    entity: str
+    rows_read: int = 0
+    rows_inserted: int = 0
+    rows_rejected: int = 0
+    links_inserted: int = 0
+    links_unresolved: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)  # (row number, message)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_inserted / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.entity}: {self.rows_inserted}/{self.rows_read} rows inserted, "
+            f"{self.rows_rejected} rejected, {self.links_inserted} links "
+            f"({self.links_unresolved} unresolved) in {self.seconds:.2f}s "
+            f"({self.rows_per_sec:,.0f} rows/sec)"
+        )
+
+# Readers (streaming, one dict per row)
+def _read_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+READERS: Dict[str, Callable[[str], Iterator[Dict[str, Any]]]] = {
+    "csv": _read_csv,
+    "jsonl": _read_jsonl,
+}
+
+def _detect_format(path: str) -> str:
+    ext = path.rsplit(".", 1)[-1].lower()
+    if ext in ("jsonl", "ndjson"):
+        return "jsonl"
+    if ext == "csv":
+        return "csv"
+    raise ValueError(f"cannot detect format of {path}; pass fmt='csv' or fmt='jsonl'")
+
+# Field validation
+def _text(row: Dict[str, Any], key: str, max_len: int, required: bool) -> Optional[str]:
+    v = row.get(key)
+    v = None if v is None else str(v).strip()
+    if not v:
+        if required:
+            raise ValueError(f"{key} is required")
+        return None
+    if len(v) > max_len:
+        raise ValueError(f"{key} must be ≤ {max_len} chars")
+    return v
+
+def _new_or_given_id(row: Dict[str, Any], key: str) -> str:
+    v = row.get(key)
+    v = str(v).strip() if v else str(uuid.uuid4())
+    _require_uuid(v, key)
+    return v
+
+def _id_list(row: Dict[str, Any], key: str) -> List[str]:
+    v = row.get(key)
+    if not v:
+        return []
+    ids = [str(x) for x in v] if isinstance(v, list) else _parse_id_list(str(v))
+    for x in ids:
+        _require_uuid(x, key)
+    return ids
+
+def _url_list(row: Dict[str, Any], key: str) -> List[str]:
+    v = row.get(key)
+    if not v:
+        return []
+    if isinstance(v, list):
+        return [str(x) for x in v]
+    return [u.strip() for u in str(v).split("|") if u.strip()]
+
+# Each parser returns (row values for the INSERT, [(link_sql, params), ...]).
+Links = List[Tuple[str, tuple]]
+
+_LINK_SUPPLIER = (
+    "INSERT OR IGNORE INTO Product_Supplier (Product_Id, Supplier_Id) "
+    "SELECT ?, ? WHERE EXISTS (SELECT 1 FROM Suppliers WHERE Supplier_Id = ?)"
+)
+_LINK_CATEGORY = (
+    "INSERT OR IGNORE INTO Product_Category (Product_Id, Category_Id) "
+    "SELECT ?, ? WHERE EXISTS (SELECT 1 FROM Category WHERE Category_Id = ?)"
+)
+_LINK_PRODUCT_SUPPLIER = (
+    "INSERT OR IGNORE INTO Product_Supplier (Product_Id, Supplier_Id) "
+    "SELECT ?, ? WHERE EXISTS (SELECT 1 FROM Products WHERE Product_Id = ?)"
+)
+_LINK_PRODUCT_CATEGORY = (
+    "INSERT OR IGNORE INTO Product_Category (Product_Id, Category_Id) "
+    "SELECT ?, ? WHERE EXISTS (SELECT 1 FROM Products WHERE Product_Id = ?)"
+)
+_INSERT_IMAGE = "INSERT INTO Images (Image_Id, Product_Id, Image_URL) VALUES (?, ?, ?)"
+
+def _parse_product(row: Dict[str, Any]) -> Tuple[tuple, Links]:
+    pid = _new_or_given_id(row, "product_id")
+    name = _text(row, "product_name", 2000, required=True)
+    desc = _text(row, "product_description", 10000, required=False)
+    try:
+        quantity = int(row.get("product_quantity"))
+    except (TypeError, ValueError):
+        raise ValueError("product_quantity must be an integer")
+    if quantity < 0:
+        raise ValueError("product_quantity must be >= 0")
+    try:
+        price = float(row.get("product_price"))
+    except (TypeError, ValueError):
+        raise ValueError("product_price must be a float")
+    if price <= 0:
+        raise ValueError("product_price must be > 0")
+
+    links: Links = [(_LINK_SUPPLIER, (pid, sid, sid)) for sid in _id_list(row, "supplier_ids")]
+    links += [(_LINK_CATEGORY, (pid, cid, cid)) for cid in _id_list(row, "category_ids")]
+    links += [(_INSERT_IMAGE, (str(uuid.uuid4()), pid, url)) for url in _url_list(row, "image_urls")]
+    return (pid, name, desc, quantity, price), links
+
+def _parse_supplier(row: Dict[str, Any]) -> Tuple[tuple, Links]:
+    sid = _new_or_given_id(row, "supplier_id")
+    name = _text(row, "supplier_name", 2000, required=True)
+    contact = _text(row, "supplier_contact", 320, required=True)
+    _require_email(contact)
+    links: Links = [(_LINK_PRODUCT_SUPPLIER, (pid, sid, pid)) for pid in _id_list(row, "product_ids")]
+    return (sid, name, contact), links
+
+def _parse_category(row: Dict[str, Any]) -> Tuple[tuple, Links]:
+    cid = _new_or_given_id(row, "category_id")
+    name = _text(row, "category_name", 2000, required=True)
+    desc = _text(row, "category_description", 10000, required=False)
+    links: Links = [(_LINK_PRODUCT_CATEGORY, (pid, cid, pid)) for pid in _id_list(row, "product_ids")]
+    return (cid, name, desc), links
+
+def _parse_image(row: Dict[str, Any]) -> Tuple[tuple, Links]:
+    iid = _new_or_given_id(row, "image_id")
+    pid = str(row.get("product_id") or "").strip()
+    _require_uuid(pid, "product_id")
+    url = _text(row, "image_url", 10000, required=True)
+    return (iid, pid, url), []
+
+# entity -> (row parser, INSERT statement)
+ENTITIES: Dict[str, Tuple[Callable[[Dict[str, Any]], Tuple[tuple, Links]], str]] = {
+    "products": (
+        _parse_product,
+        "INSERT INTO Products (Product_Id, Product_Name, Product_Description, Product_Quantity, Product_Price) "
+        "VALUES (?, ?, ?, ?, ?)",
+    ),
+    "suppliers": (
+        _parse_supplier,
+        "INSERT INTO Suppliers (Supplier_Id, Supplier_Name, Supplier_Contact, Product_Ids) VALUES (?, ?, ?, '[]')",
+    ),
+    "categories": (
+        _parse_category,
+        "INSERT INTO Category (Category_Id, Category_Name, Category_Description, Product_Ids) VALUES (?, ?, ?, '[]')",
+    ),
+    "images": (
+        _parse_image,
+        "INSERT INTO Images (Image_Id, Product_Id, Image_URL) "
+        "SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM Products WHERE Product_Id = ?2)",
+    ),
+}
+
+# Loader
+def _reject(report: ImportReport, on_error: str, rownum: int, msg: str) -> None:
+    if on_error == "raise":
+        raise ValueError(f"row {rownum}: {msg}")
+    report.rows_rejected += 1
+    if on_error == "collect":
+        report.errors.append((rownum, msg))
+
+def _flush(
+    conn: sqlite3.Connection,
+    insert_sql: str,
+    batch: List[Tuple[int, tuple, Links]],
+    report: ImportReport,
+    on_error: str,
+) -> None:
+    with conn:
+        # Open the transaction first: a SAVEPOINT outside one starts its own,
+        # and its RELEASE would commit the rows before their links.
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        # Fast path: one executemany for the whole batch. If any row violates a
+        # constraint, roll the batch back and insert row by row to find it.
+        conn.execute("SAVEPOINT bulk_batch")
+        try:
+            cur = conn.executemany(insert_sql, (values for _, values, _ in batch))
+            ok = batch if cur.rowcount == len(batch) else None
+        except sqlite3.IntegrityError:
+            ok = None
+        if ok is None:
+            conn.execute("ROLLBACK TO bulk_batch")
+            ok = []
+            for rownum, values, links in batch:
+                try:
+                    inserted = conn.execute(insert_sql, values).rowcount
+                except sqlite3.IntegrityError as e:
+                    _reject(report, on_error, rownum, str(e))
+                    continue
+                if inserted:
+                    ok.append((rownum, values, links))
+                else:
+                    _reject(report, on_error, rownum, "referenced row does not exist")
+        conn.execute("RELEASE bulk_batch")
+        report.rows_inserted += len(ok)
+
+        by_sql: Dict[str, List[tuple]] = {}
+        for _, _, links in ok:
+            for sql, params in links:
+                by_sql.setdefault(sql, []).append(params)
+        for sql, params in by_sql.items():
+            n = conn.executemany(sql, params).rowcount
+            report.links_inserted += n
+            report.links_unresolved += len(params) - n
+        # Batches touch too many entities to track one by one
+        invalidate_all(conn)
+
+def import_rows(
+    conn: sqlite3.Connection,
+    entity: str,
+    rows: Iterable[Dict[str, Any]],
+    batch_size: int = 50_000,
+    on_error: str = "collect",
+) -> ImportReport:
+    """Validate and insert rows of one entity, batch_size rows per transaction.
+
+    Bad rows are skipped ("skip"), skipped and recorded in report.errors
+    ("collect"), or abort the import ("raise"). Link columns (supplier_ids,
+    category_ids, image_urls, product_ids) are resolved in the same batch;
+    links to rows that do not exist are counted as unresolved.
+    """
+    if entity not in ENTITIES:
+        raise ValueError(f"entity must be one of {', '.join(ENTITIES)}")
+    if on_error not in ("skip", "collect", "raise"):
+        raise ValueError("on_error must be 'skip', 'collect' or 'raise'")
+    parse, insert_sql = ENTITIES[entity]
+    report = ImportReport(entity)
+    start = time.perf_counter()
+
+    batch: List[Tuple[int, tuple, Links]] = []
+    for rownum, row in enumerate(rows, start=1):
+        report.rows_read += 1
+        try:
+            values, links = parse(row)
+        except ValueError as e:
+            _reject(report, on_error, rownum, str(e))
+            continue
+        batch.append((rownum, values, links))
+        if len(batch) >= batch_size:
+            _flush(conn, insert_sql, batch, report, on_error)
+            batch = []
+    if batch:
+        _flush(conn, insert_sql, batch, report, on_error)
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+def import_file(
+    conn: sqlite3.Connection,
+    entity: str,
+    path: str,
+    fmt: Optional[str] = None,
+    batch_size: int = 50_000,
+    on_error: str = "collect",
+) -> ImportReport:
+    """Stream a CSV or JSON Lines file into import_rows."""
+    fmt = fmt or _detect_format(path)
+    if fmt not in READERS:
+        raise ValueError(f"fmt must be one of {', '.join(READERS)}")
+    return import_rows(conn, entity, READERS[fmt](path), batch_size, on_error)
+
+# CLI
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Bulk import a CSV or JSON Lines feed into inventory.db")
+    ap.add_argument("entity", choices=sorted(ENTITIES))
+    ap.add_argument("path")
+    ap.add_argument("--db", default="inventory.db")
+    ap.add_argument("--format", choices=sorted(READERS), dest="fmt")
+    ap.add_argument("--batch-size", type=int, default=50_000)
+    ap.add_argument("--on-error", choices=("skip", "collect", "raise"), default="collect")
+    ap.add_argument("--max-errors", type=int, default=20, help="errors to print when collecting")
+    args = ap.parse_args(argv)
+
+    conn = db.connect(args.db)
+    ensure_schema(conn)
+    try:
+        report = import_file(conn, args.entity, args.path, args.fmt, args.batch_size, args.on_error)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    print(report.summary())
+    for rownum, msg in report.errors[: args.max_errors]:
+        print(f"  row {rownum}: {msg}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+from __future__ import annotations
+import os, sqlite3, threading, time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+# In-process read-through cache for single-entity lookups (existence probes,
+# read_supplier, repository reads).
+#
+# Entries are kept per database file, so the writer and every reader
+# connection of a ConnectionPool share them. Only connections created by
+# db.connect take part; anything else (a bare sqlite3.connect) always goes to
+# SQLite. Mutations invalidate the entities they touch immediately and again
+# when their transaction commits or rolls back. Writes made by other
+# processes are not seen until an entry expires, so set a TTL if several
+# processes write to the same file.
+#
+# INVENTORY_CACHE=0 in the environment, or configure(enabled=False), turns
+# the cache off; every lookup then goes to SQLite.
+
+MAXSIZE = 10_000
+TTL: Optional[float] = None  # seconds; None keeps entries until evicted or invalidated
+# Cached views of one entity; invalidate() drops all of them.
+VIEWS = ("exists", "read")
+
+_MISSING = object()
+
+class LRUCache:
+    """Bounded, thread-safe LRU map with an optional per-entry TTL."""
+
+    def __init__(self, maxsize: int = MAXSIZE, ttl: Optional[float] = TTL) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be > 0")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = self.misses = self.evictions = 0
+        # Bumped by every invalidation. A value loaded while the version moved
+        # may predate the write that caused it, so it is not stored.
+        self.version = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return _MISSING
+
+    def put(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            expires = None if self.ttl is None else time.monotonic() + self.ttl
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            self.version += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+# Registry: one LRUCache per database
+_enabled = os.environ.get("INVENTORY_CACHE", "1").lower() not in ("0", "false", "off", "no")
+_caches: Dict[Hashable, LRUCache] = {}
+_registry_lock = threading.Lock()
+
+def configure(enabled: Optional[bool] = None, maxsize: Optional[int] = None, ttl: Any = _MISSING) -> None:
+    """Change the cache settings. Existing entries are dropped."""
+    global _enabled, MAXSIZE, TTL
+    if enabled is not None:
+        _enabled = enabled
+    if maxsize is not None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be > 0")
+        MAXSIZE = maxsize
+    if ttl is not _MISSING:
+        TTL = ttl
+    with _registry_lock:
+        _caches.clear()
+
+def is_enabled() -> bool:
+    return _enabled
+
+def _cache_for(conn: sqlite3.Connection) -> Optional[LRUCache]:
+    if not _enabled:
+        return None
+    db_key = getattr(conn, "cache_key", None)
+    if db_key is None:
+        return None
+    c = _caches.get(db_key)
+    if c is None:
+        with _registry_lock:
+            c = _caches.setdefault(db_key, LRUCache(MAXSIZE, TTL))
+    return c
+
+def cached(conn: sqlite3.Connection, key: Hashable, load: Callable[[], Any]) -> Any:
+    """Return the cached value for key, or load() it and cache the result.
+
+    Values loaded inside an open transaction are returned but not cached:
+    they may include writes that are later rolled back.
+    """
+    c = _cache_for(conn)
+    if c is None:
+        return load()
+    value = c.get(key)
+    if value is not _MISSING:
+        return value
+    version = c.version
+    value = load()
+    if not conn.in_transaction:
+        c.put(key, value, version)
+    return value
+
+def invalidate(conn: sqlite3.Connection, kind: str, ids: Iterable[Any]) -> None:
+    """Drop every cached entry for the given entities (kind is the table name)."""
+    c = _cache_for(conn)
+    if c is None:
+        return
+    keys = [(kind, rid, view) for rid in ids for view in VIEWS]
+    c.discard(keys)
+    pending = getattr(conn, "_cache_pending", None)
+    if pending is not None and conn.in_transaction:
+        pending.append(keys)
+
+def invalidate_all(conn: sqlite3.Connection) -> None:
+    """Drop everything cached for conn's database (bulk changes, cascades)."""
+    c = _cache_for(conn)
+    if c is None:
+        return
+    c.clear()
+    pending = getattr(conn, "_cache_pending", None)
+    if pending is not None and conn.in_transaction:
+        pending.append(None)
+
+def flush_pending(conn: sqlite3.Connection) -> None:
+    """Re-apply the invalidations of a transaction that just ended.
+
+    Another connection can re-cache an entity between a write and its
+    commit; invalidating again at commit removes that stale copy.
+    """
+    pending = conn._cache_pending
+    if not pending:
+        return
+    c = _cache_for(conn)
+    batches = pending[:]
+    pending.clear()
+    if c is None:
+        return
+    if None in batches:
+        c.clear()
+    else:
+        c.discard([k for keys in batches for k in keys])
+
+def stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters summed over every database."""
+    out = {"hits": 0, "misses": 0, "evictions": 0, "size": 0}
+    for c in list(_caches.values()):
+        out["hits"] += c.hits
+        out["misses"] += c.misses
+        out["evictions"] += c.evictions
+        out["size"] += len(c)
+    return out
+
+def reset_stats() -> None:
+    for c in list(_caches.values()):
+        c.hits = c.misses = c.evictions = 0
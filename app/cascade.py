@@ -0,0 +1,71 @@
+from __future__ import annotations
+import sqlite3
+from typing import Iterable
+
+from cache import invalidate_all
+
+# Scratch tables are per connection, so concurrent cascades never see each other's ids.
+_SETUP = (
+    "CREATE TEMP TABLE IF NOT EXISTS _cascade_products (Product_Id TEXT PRIMARY KEY) WITHOUT ROWID",
+    "CREATE TEMP TABLE IF NOT EXISTS _cascade_categories (Category_Id TEXT PRIMARY KEY) WITHOUT ROWID",
+)
+
+def _delete_products(
+    conn: sqlite3.Connection, product_ids: Iterable[str], drop_empty_categories: bool = True
+) -> int:
+    """Cascade-delete products inside the caller's transaction. Returns the number of products deleted."""
+    for ddl in _SETUP:
+        conn.execute(ddl)
+    conn.execute("DELETE FROM _cascade_products")
+    conn.execute("DELETE FROM _cascade_categories")
+    conn.executemany(
+        "INSERT OR IGNORE INTO _cascade_products (Product_Id) VALUES (?)",
+        ((pid,) for pid in product_ids),
+    )
+
+    # Every statement below probes a primary key or secondary index once per
+    # product in the batch; nothing scans Suppliers, Category or Images.
+    if drop_empty_categories:
+        conn.execute("""
+            INSERT OR IGNORE INTO _cascade_categories (Category_Id)
+            SELECT Category_Id FROM Product_Category
+            WHERE Product_Id IN (SELECT Product_Id FROM _cascade_products)
+        """)
+    # Products go first: their Product_Detail rows go with them, so the
+    # link and image triggers below find nothing left to refresh.
+    deleted = conn.execute(
+        "DELETE FROM Products WHERE Product_Id IN (SELECT Product_Id FROM _cascade_products)"
+    ).rowcount
+    conn.execute(
+        "DELETE FROM Product_Supplier WHERE Product_Id IN (SELECT Product_Id FROM _cascade_products)"
+    )
+    conn.execute(
+        "DELETE FROM Product_Category WHERE Product_Id IN (SELECT Product_Id FROM _cascade_products)"
+    )
+    if drop_empty_categories:
+        conn.execute("""
+            DELETE FROM Category
+            WHERE Category_Id IN (SELECT Category_Id FROM _cascade_categories)
+              AND NOT EXISTS (
+                  SELECT 1 FROM Product_Category pc WHERE pc.Category_Id = Category.Category_Id
+              )
+        """)
+    conn.execute(
+        "DELETE FROM Images WHERE Product_Id IN (SELECT Product_Id FROM _cascade_products)"
+    )
+
+    conn.execute("DELETE FROM _cascade_products")
+    conn.execute("DELETE FROM _cascade_categories")
+    if deleted:
+        # Suppliers, categories and images of the deleted products all changed
+        invalidate_all(conn)
+    return deleted
+
+def delete_products(
+    conn: sqlite3.Connection, product_ids: Iterable[str], drop_empty_categories: bool = True
+) -> int:
+    """Delete a batch of products in one transaction, removing their supplier/category
+    links and images. Categories left with no products are deleted unless
+    drop_empty_categories is False. Returns the number of products deleted."""
+    with conn:
+        return _delete_products(conn, product_ids, drop_empty_categories)
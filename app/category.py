@@ -1,20 +1,36 @@
-import re 
+from supplier import UUID_RX, _uuid_bytes, _uuid_str
+
 class Category:
-    def __init__(self, category_id, category_name, category_description, product_ids=None):
-        self.category_id = category_id
+    # No per-instance __dict__; category_id may be held as 16 bytes (compact_id=True)
+    __slots__ = ("_category_id", "category_name", "category_description", "product_ids")
+
+    def __init__(self, category_id, category_name, category_description, product_ids=None, compact_id=False):
+        self._category_id = _uuid_bytes(category_id) if compact_id else category_id
         self.category_name = category_name
         self.category_description = category_description
         self.product_ids = product_ids or []
 
+    @classmethod
+    def from_row(cls, row, compact_id=False):
+        # Fast path for (Category_Id, Category_Name, Category_Description) rows
+        self = cls.__new__(cls)
+        self._category_id, self.category_name, self.category_description = row
+        if compact_id:
+            self._category_id = _uuid_bytes(self._category_id)
+        # Shared empty tuple until a product is added
+        self.product_ids = ()
+        return self
+
+    @property
+    def category_id(self):
+        return _uuid_str(self._category_id)
+
+    @category_id.setter
+    def category_id(self, id):
+        self._category_id = id
+
     def isUUID(self,id):
-        UUID_Check = re.compile(
-            r'^[0-9a-fA-F]{8}-'
-            r'[0-9a-fA-F]{4}-'
-            r'[1-5][0-9a-fA-F]{3}-'
-            r'[89ABab][0-9a-fA-F]{3}-'
-            r'[0-9a-fA-F]{12}$'
-        )
-        return bool(UUID_Check.fullmatch(id))
+        return bool(UUID_RX.fullmatch(id or ""))
     
     def set_category_id(self,id):
         # Id must be a UUID
@@ -37,10 +53,26 @@ class Category:
     
 
     def add_product(self, product_id):
+        if self.product_ids.__class__ is not list:
+            self.product_ids = list(self.product_ids)
         self.product_ids.append(product_id)
 
     def remove_product(self, product_id):
+        if self.product_ids.__class__ is not list:
+            self.product_ids = list(self.product_ids)
         self.product_ids.remove(product_id)
     
+    def to_dict(self):
+        return {
+            "category_id": self.category_id,
+            "category_name": self.category_name,
+            "category_description": self.category_description,
+            "product_ids": list(self.product_ids),
+        }
+
     def __str__(self):
-        return f"Category: Id='{self.category_id}', Name='{self.category_name}', Description='{self.category_description}', ProductIds='{self.product_ids}' "
\ No newline at end of file
+        return f"Category: Id='{self.category_id}', Name='{self.category_name}', Description='{self.category_description}', ProductIds='{self.product_ids}' "
+
+def row_factory(cursor, row):
+    """sqlite3 row_factory for SELECTs of the three Category columns."""
+    return Category.from_row(row)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+import argparse, json, sqlite3, sys, time
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import db
+from schema import ensure_schema
+
+# Consumer side of the Change_Log table (see schema.py). A consumer keeps
+# the Seq of the last change it applied and asks for what came after:
+#
+#     offset = 0
+#     for batch in follow(conn, offset):
+#         apply(batch)
+#         offset = batch[-1]["seq"]
+#
+# Seq only grows and never appears out of order, so the offset is all the
+# state a consumer needs. A new consumer can start from a full export
+# (export.py) instead of the log, as long as latest_seq() is read in the
+# same read transaction as the export.
+
+LOG_COLUMNS = ("Seq", "Entity", "Op", "Entity_Id", "Related_Id", "Changed_At")
+_NAMES = [c.lower() for c in LOG_COLUMNS]
+
+def latest_seq(conn: sqlite3.Connection) -> int:
+    """Seq of the newest change ever logged (0 if none), including pruned ones."""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'Change_Log'").fetchone()
+    return row[0] if row else 0
+
+def tail(conn: sqlite3.Connection, offset: int = 0, batch_size: int = 500,
+         entities: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """Up to batch_size changes with seq > offset, oldest first.
+
+    entities (e.g. ["product", "image"]) restricts the batch to those kinds.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be > 0")
+    where = ""
+    args: List[Any] = [offset]
+    if entities:
+        where = f" AND Entity IN ({', '.join('?' * len(entities))})"
+        args.extend(entities)
+    rows = conn.execute(
+        f"SELECT {', '.join(LOG_COLUMNS)} FROM Change_Log WHERE Seq > ?{where} ORDER BY Seq LIMIT ?",
+        [*args, batch_size],
+    ).fetchall()
+    return [dict(zip(_NAMES, row)) for row in rows]
+
+def iter_changes(conn: sqlite3.Connection, offset: int = 0, batch_size: int = 500,
+                 entities: Optional[Sequence[str]] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Batches of changes after offset until the log is caught up."""
+    while True:
+        batch = tail(conn, offset, batch_size, entities)
+        if batch:
+            yield batch
+            offset = batch[-1]["seq"]
+        if len(batch) < batch_size:
+            return
+
+def follow(conn: sqlite3.Connection, offset: int = 0, batch_size: int = 500,
+           entities: Optional[Sequence[str]] = None, poll_interval: float = 1.0) -> Iterator[List[Dict[str, Any]]]:
+    """Like iter_changes, but waits for new changes instead of returning."""
+    while True:
+        for batch in iter_changes(conn, offset, batch_size, entities):
+            yield batch
+            offset = batch[-1]["seq"]
+        time.sleep(poll_interval)
+
+def prune(conn: sqlite3.Connection, through_seq: int) -> int:
+    """Delete changes with seq <= through_seq (once every consumer is past them). Returns the count."""
+    with conn:
+        return conn.execute("DELETE FROM Change_Log WHERE Seq <= ?", (through_seq,)).rowcount
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Read the inventory change log")
+    ap.add_argument("--db", default="inventory.db")
+    ap.add_argument("--since", type=int, default=0, help="print changes after this seq")
+    ap.add_argument("--batch-size", type=int, default=500)
+    ap.add_argument("--entity", action="append", help="only this entity (repeatable)")
+    ap.add_argument("--follow", action="store_true", help="keep waiting for new changes")
+    ap.add_argument("--prune", type=int, metavar="SEQ", help="delete changes up to and including SEQ")
+    args = ap.parse_args(argv)
+
+    conn = db.connect(args.db)
+    ensure_schema(conn)
+    try:
+        if args.prune is not None:
+            print(f"Pruned {prune(conn, args.prune)} changes", file=sys.stderr)
+            return 0
+        batches = (follow if args.follow else iter_changes)(conn, args.since, args.batch_size, args.entity)
+        for batch in batches:
+            for change in batch:
+                print(json.dumps(change))
+            sys.stdout.flush()
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,475 @@
+from __future__ import annotations
+import os, queue, sqlite3, threading, time, urllib.parse
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+import cache, instrument
+from instrument import QueryStats
+from supplier import UUID_RX, _uuid_bytes, _uuid_str
+
+T = TypeVar("T")
+
+DEFAULT_PATH = "inventory.db"
+BUSY_TIMEOUT_MS = 5000
+# NORMAL is durable across application crashes in WAL mode; only an OS crash
+# or power loss can drop the last few commits. Use FULL to fsync every commit.
+SYNCHRONOUS = "NORMAL"
+CACHE_SIZE_KIB = 64 * 1024
+# Read-only connections map the database file instead of copying pages into
+# their own cache, so every reader process shares the OS page cache.
+MMAP_SIZE = 1024 * 1024 * 1024
+# How often (seconds) a snapshot pool looks for a refreshed snapshot file
+SNAPSHOT_CHECK_S = 1.0
+
+# Binary id storage. Id columns of a binary database are declared "UUID BLOB";
+# with PARSE_DECLTYPES the converter below hands them back as strings.
+sqlite3.register_converter("UUID", _uuid_str)
+
+def _encode_value(v: Any) -> Any:
+    if v.__class__ is str and len(v) == 36 and UUID_RX.fullmatch(v):
+        return _uuid_bytes(v)
+    return v
+
+def _encode_params(params: Any) -> Any:
+    if isinstance(params, dict):
+        return {k: _encode_value(v) for k, v in params.items()}
+    return [_encode_value(v) for v in params]
+
+class BinaryIdCursor(sqlite3.Cursor):
+    """Cursor that binds UUID-shaped string parameters as 16-byte blobs."""
+
+    def execute(self, sql: str, parameters: Any = ()) -> "BinaryIdCursor":
+        return super().execute(sql, _encode_params(parameters))
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> "BinaryIdCursor":
+        return super().executemany(sql, map(_encode_params, seq_of_parameters))
+
+class InventoryConnection(sqlite3.Connection):
+    """sqlite3.Connection that can group many `with conn:` blocks into one commit.
+
+    Outside batch() it behaves exactly like sqlite3.Connection. Inside it,
+    each `with conn:` block becomes a SAVEPOINT: a block that raises is
+    rolled back on its own, and everything else is committed once when the
+    outermost batch() exits.
+
+    It also identifies its database for the entity cache (cache.py) and
+    replays the cache invalidations of each transaction once it ends.
+    """
+
+    binary_ids = False
+    cursor_class: type = sqlite3.Cursor
+    query_stats: Optional[QueryStats] = None
+
+    def __init__(self, database: Any, *args: Any, **kwargs: Any) -> None:
+        super().__init__(database, *args, **kwargs)
+        self._batch_depth = 0
+        self._savepoints: List[Optional[str]] = []
+        self._savepoint_seq = 0
+        # Connections to the same file share cache entries; in-memory databases never do.
+        path = os.fspath(database)
+        self.cache_key: Any = object() if path in ("", ":memory:") or "mode=memory" in path else (
+            path if path.startswith("file:") else os.path.abspath(path))
+        self._cache_pending: List[Any] = []
+
+    def commit(self) -> None:
+        super().commit()
+        cache.flush_pending(self)
+
+    def rollback(self) -> None:
+        super().rollback()
+        cache.flush_pending(self)
+
+    @contextmanager
+    def batch(self) -> Iterator["InventoryConnection"]:
+        outer = self._batch_depth == 0
+        if outer and not self.in_transaction:
+            self.execute("BEGIN IMMEDIATE")
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if outer:
+                self.rollback()
+            raise
+        self._batch_depth -= 1
+        if outer:
+            self.commit()
+
+    def __enter__(self) -> "InventoryConnection":
+        if self._batch_depth:
+            self._savepoint_seq += 1
+            name = f"batch_sp{self._savepoint_seq}"
+            self.execute(f"SAVEPOINT {name}")
+            self._savepoints.append(name)
+            return self
+        self._savepoints.append(None)
+        return super().__enter__()
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        name = self._savepoints.pop()
+        if name is None:
+            try:
+                return super().__exit__(exc_type, exc, tb)
+            finally:
+                if not self.in_transaction:
+                    cache.flush_pending(self)
+        if exc_type is not None:
+            self.execute(f"ROLLBACK TO {name}")
+        self.execute(f"RELEASE {name}")
+        return False
+
+class BinaryIdConnection(InventoryConnection):
+    """InventoryConnection for databases that store ids as 16-byte blobs.
+
+    Callers keep passing and receiving UUID strings: string parameters that
+    look like a UUID are bound as blobs, and "UUID" columns are converted
+    back on the way out. Any other text that happens to be a canonical UUID
+    string is stored as a blob too, so don't use UUIDs as names.
+    """
+
+    binary_ids = True
+    cursor_class = BinaryIdCursor
+
+    def cursor(self, factory: Any = None) -> sqlite3.Cursor:
+        return super().cursor(factory or self.cursor_class)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def uses_binary_ids(path: str) -> bool:
+    """True if the database at path was created (or migrated) with binary ids."""
+    if path == ":memory:" or path.startswith("file:"):
+        return False
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute(
+            "SELECT type FROM pragma_table_info('Products') WHERE name = 'Product_Id'"
+        ).fetchone()
+    finally:
+        conn.close()
+    return bool(row) and row[0].upper().startswith("UUID")
+
+def connect(
+    path: str = DEFAULT_PATH,
+    readonly: bool = False,
+    busy_timeout_ms: int = BUSY_TIMEOUT_MS,
+    synchronous: str = SYNCHRONOUS,
+    binary_ids: Optional[bool] = None,
+    stats: Optional[QueryStats] = None,
+    immutable: bool = False,
+) -> InventoryConnection:
+    """Open a connection with the inventory pragmas applied.
+
+    Writers use BEGIN IMMEDIATE so a transaction takes the write lock up
+    front (waiting up to busy_timeout_ms) instead of failing when it tries
+    to upgrade a read lock. Read-only connections open the file with
+    mode=ro and memory-map it (MMAP_SIZE).
+
+    immutable=True (read-only only) is for snapshot files made by
+    copy_snapshot: SQLite skips all locking and change detection, so the
+    file must never be written in place. Snapshot connections bypass the
+    entity cache.
+
+    binary_ids=None detects the id storage mode from the existing schema;
+    pass True to create a new database with 16-byte ids.
+
+    stats (default: instrument.enable()'s, if any) records every statement
+    run on the connection.
+    """
+    if immutable and not readonly:
+        raise ValueError("immutable connections must be readonly")
+    if binary_ids is None:
+        binary_ids = uses_binary_ids(path)
+    if stats is None:
+        stats = instrument.default_stats()
+    factory = BinaryIdConnection if binary_ids else InventoryConnection
+    uri = readonly and path != ":memory:" and not path.startswith("file:")
+    conn = sqlite3.connect(
+        f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro{'&immutable=1' if immutable else ''}"
+        if uri else path,
+        timeout=busy_timeout_ms / 1000,
+        isolation_level=None if readonly else "IMMEDIATE",
+        check_same_thread=False,
+        detect_types=sqlite3.PARSE_DECLTYPES if binary_ids else 0,
+        factory=factory if stats is None else instrument.instrumented(factory),
+        uri=uri,
+    )
+    if uri:
+        # Share cache entries (and the writer's invalidations) with other connections to the file
+        conn.cache_key = None if immutable else os.path.abspath(path)
+    conn.query_stats = stats
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    if not readonly:
+        conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(f"PRAGMA synchronous = {synchronous}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    return conn
+
+def copy_snapshot(path: str, snapshot_path: str) -> None:
+    """Write a consistent copy of the database at path to snapshot_path.
+
+    The copy is taken in one read transaction, so writers keep going while
+    it runs, and it replaces snapshot_path atomically: readers that have it
+    open keep the old file until they reopen (ConnectionPool(snapshot=True)
+    does that by itself). Each refresh copies the whole file.
+    """
+    tmp = snapshot_path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    src, dst = sqlite3.connect(path), sqlite3.connect(tmp)
+    try:
+        src.backup(dst)
+        # No -wal/-shm files: immutable readers need none
+        dst.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        src.close()
+        dst.close()
+    os.replace(tmp, snapshot_path)
+
+class ConnectionPool:
+    """Per-thread read connections plus one writer connection.
+
+    In WAL mode readers never block the writer or each other, so every
+    thread gets its own read connection. Writes are serialized in-process
+    through a single connection guarded by a lock, which keeps threads from
+    racing each other for the database write lock.
+
+        pool = ConnectionPool("inventory.db")
+        s = pool.read(read_supplier, sid)
+        pool.write(add_product_to_supplier, sid, pid)
+
+    snapshot=True makes a read-only pool over a file kept up to date by
+    copy_snapshot: readers open it immutable, have no writer to contend
+    with, and each thread reopens its connection once it notices (within
+    SNAPSHOT_CHECK_S) that the file was replaced.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        busy_timeout_ms: int = BUSY_TIMEOUT_MS,
+        synchronous: str = SYNCHRONOUS,
+        binary_ids: Optional[bool] = None,
+        stats: Optional[QueryStats] = None,
+        snapshot: bool = False,
+    ) -> None:
+        self.path = path
+        self.snapshot = snapshot
+        self.binary_ids = uses_binary_ids(path) if binary_ids is None else binary_ids
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.stats = stats
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._readers: List[sqlite3.Connection] = []
+        self._closed = False
+
+    def _open(self, readonly: bool) -> sqlite3.Connection:
+        if self._closed:
+            raise RuntimeError("connection pool is closed")
+        return connect(self.path, readonly, self.busy_timeout_ms, self.synchronous, self.binary_ids, self.stats,
+                       immutable=readonly and self.snapshot)
+
+    def _snapshot_file(self) -> Tuple[int, int]:
+        st = os.stat(self.path)
+        return st.st_ino, st.st_mtime_ns
+
+    def reader(self) -> sqlite3.Connection:
+        """The calling thread's read-only connection."""
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is not None and self.snapshot and time.monotonic() >= local.check_at:
+            local.check_at = time.monotonic() + SNAPSHOT_CHECK_S
+            if self._snapshot_file() != local.file:
+                with self._lock:
+                    self._readers.remove(conn)
+                conn.close()
+                conn = None
+        if conn is None:
+            if self.snapshot:
+                local.file = self._snapshot_file()
+                local.check_at = time.monotonic() + SNAPSHOT_CHECK_S
+            elif self._writer is None:
+                # Open the writer first so the database is in WAL mode before any reader attaches.
+                with self.writer():
+                    pass
+            conn = self._open(readonly=True)
+            local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Exclusive use of the writer connection for the duration of the block."""
+        if self.snapshot:
+            raise RuntimeError("snapshot connection pools are read-only")
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._open(readonly=False)
+            yield self._writer
+
+    def read(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return fn(self.reader(), *args, **kwargs)
+
+    def write(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self.writer() as conn:
+            return fn(conn, *args, **kwargs)
+
+    def close(self) -> None:
+        with self._write_lock, self._lock:
+            self._closed = True
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        self._local = threading.local()
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+# Group commit
+def run_batch(conn: InventoryConnection, ops: List[Tuple[Callable[..., Any], tuple]]) -> List[Tuple[bool, Any]]:
+    """Run each fn(conn, *args) in its own savepoint and commit them all at once.
+
+    Returns (True, result) or (False, exception) per op. An op that raises is
+    rolled back alone; if the commit itself fails, every op fails with it.
+    """
+    outcomes: List[Tuple[bool, Any]] = []
+    try:
+        with conn.batch():
+            for fn, args in ops:
+                try:
+                    with conn:
+                        outcomes.append((True, fn(conn, *args)))
+                except Exception as e:
+                    outcomes.append((False, e))
+    except Exception as e:
+        # The commit itself failed: nothing in this batch is durable.
+        return [(False, e)] * len(ops)
+    return outcomes
+
+class GroupCommitWriter:
+    """Background writer that commits queued writes in groups.
+
+    submit(fn, *args) queues fn(conn, *args) and returns a Future. The
+    writer thread takes the next op, then keeps collecting until it has
+    max_ops or max_delay_ms has passed, runs them with run_batch and
+    commits once. Futures resolve only after that commit, so a result
+    means the write is as durable as the connection's synchronous setting
+    makes any commit (FULL: fsynced).
+
+    With max_delay_ms=0 a group is whatever queued up while the previous
+    commit ran, which suits callers that wait on each write. A delay only
+    pays off for producers that keep submitting without waiting.
+
+        with GroupCommitWriter("inventory.db", max_ops=500, max_delay_ms=5) as w:
+            futures = [w.submit(add_product_to_supplier, sid, pid) for pid in pids]
+            for f in futures:
+                f.result()
+    """
+
+    def __init__(self, pool: Union[ConnectionPool, str] = DEFAULT_PATH, max_ops: int = 256,
+                 max_delay_ms: float = 0.0) -> None:
+        if max_ops <= 0:
+            raise ValueError("max_ops must be > 0")
+        if max_delay_ms < 0:
+            raise ValueError("max_delay_ms must be >= 0")
+        self._own_pool = not isinstance(pool, ConnectionPool)
+        self.pool = ConnectionPool(pool) if self._own_pool else pool
+        self.max_ops = max_ops
+        self.max_delay = max_delay_ms / 1000
+        self.groups = self.ops = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="inventory-group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        if self._closed:
+            raise RuntimeError("group commit writer is closed")
+        fut: Future = Future()
+        self._queue.put((fn, args, fut))
+        return fut
+
+    def write(self, fn: Callable[..., T], *args: Any) -> T:
+        """submit() and wait for the commit."""
+        return self.submit(fn, *args).result()
+
+    def flush(self) -> None:
+        """Wait until everything submitted so far is committed."""
+        self.write(lambda conn: None)
+
+    def _collect(self, first: Any) -> Tuple[List[Any], bool]:
+        items, closing = [first], False
+        deadline = time.monotonic() + self.max_delay
+        while len(items) < self.max_ops:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is None:
+                closing = True
+                break
+            items.append(item)
+        return items, closing
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            items, closing = self._collect(first)
+            items = [item for item in items if item[2].set_running_or_notify_cancel()]
+            if items:
+                try:
+                    with self.pool.writer() as conn:
+                        outcomes = run_batch(conn, [(fn, args) for fn, args, _ in items])
+                except Exception as e:
+                    outcomes = [(False, e)] * len(items)
+                self.groups += 1
+                self.ops += len(items)
+                for (_, _, fut), (ok, value) in zip(items, outcomes):
+                    if ok:
+                        fut.set_result(value)
+                    else:
+                        fut.set_exception(value)
+            if closing:
+                return
+
+    def close(self) -> None:
+        """Commit what is queued, stop the thread, and close the pool if this writer opened it."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            if self._own_pool:
+                self.pool.close()
+
+    def __enter__(self) -> "GroupCommitWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
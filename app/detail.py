@@ -0,0 +1,85 @@
+from __future__ import annotations
+import argparse, json, sqlite3, sys
+from typing import Any, Dict, Iterable, List, Optional
+
+import db
+from schema import DETAIL_PRODUCT_COLUMNS, ensure_schema, product_detail_select, rebuild_product_details
+
+# Catalogue reads from the Product_Detail read model (see schema.py): one
+# primary-key lookup per product, with supplier names, category names and
+# image URLs already joined. Triggers keep it current; rebuild() recomputes
+# it from scratch and verify() reports rows that disagree with the base tables.
+
+_COLUMNS = ("Product_Id",) + DETAIL_PRODUCT_COLUMNS + ("Suppliers", "Categories", "Images")
+_NAMES = [c.lower() for c in _COLUMNS]
+_JSON = {"suppliers", "categories", "images"}
+
+def _to_dict(row: tuple) -> Dict[str, Any]:
+    return {k: json.loads(v) if k in _JSON else v for k, v in zip(_NAMES, row)}
+
+def product_detail(conn: sqlite3.Connection, product_id: str) -> Dict[str, Any]:
+    """The product with its suppliers, categories and images. KeyError if missing."""
+    row = conn.execute(
+        f"SELECT {', '.join(_COLUMNS)} FROM Product_Detail WHERE Product_Id = ?", (product_id,)
+    ).fetchone()
+    if row is None:
+        raise KeyError(f"Product {product_id} not found")
+    return _to_dict(row)
+
+def product_details(conn: sqlite3.Connection, product_ids: Iterable[str]) -> List[Dict[str, Any]]:
+    """product_detail for each id that exists, in the order given."""
+    ids = list(product_ids)
+    found: Dict[Any, Dict[str, Any]] = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        for row in conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM Product_Detail WHERE Product_Id IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        ):
+            found[row[0]] = _to_dict(row)
+    return [found[pid] for pid in ids if pid in found]
+
+def rebuild(conn: sqlite3.Connection) -> int:
+    """Recompute every row from the base tables. Returns the row count."""
+    with conn:
+        return rebuild_product_details(conn)
+
+def verify(conn: sqlite3.Connection, limit: int = 100) -> List[Any]:
+    """Ids (up to limit) whose Product_Detail row is missing, stale or orphaned."""
+    fresh = product_detail_select(getattr(conn, "binary_ids", False))
+    stored = f"SELECT {', '.join(_COLUMNS)} FROM Product_Detail"
+    return [r[0] for r in conn.execute(
+        f"SELECT Product_Id FROM ({fresh} EXCEPT {stored}) "
+        f"UNION SELECT Product_Id FROM ({stored} EXCEPT {fresh}) LIMIT ?", (limit,)
+    )]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Product detail read model")
+    ap.add_argument("product_id", nargs="?")
+    ap.add_argument("--db", default="inventory.db")
+    ap.add_argument("--rebuild", action="store_true", help="recompute every row")
+    ap.add_argument("--verify", action="store_true", help="list rows that disagree with the base tables")
+    args = ap.parse_args(argv)
+
+    conn = db.connect(args.db)
+    ensure_schema(conn)
+    status = 0
+    if args.rebuild:
+        print(f"Rebuilt {rebuild(conn)} product details")
+    if args.verify:
+        bad = verify(conn)
+        for pid in bad:
+            print(f"Out of date: {pid}")
+        print(f"{len(bad)} out of date" if bad else "All product details are current")
+        status = 1 if bad else 0
+    if args.product_id:
+        try:
+            print(json.dumps(product_detail(conn, args.product_id), indent=2))
+        except KeyError as e:
+            print(f"Error: {e.args[0]}", file=sys.stderr)
+            status = 1
+    conn.close()
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+from __future__ import annotations
+import argparse, csv, io, json, os, sqlite3, struct, sys, time, zlib
+from array import array
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import db
+from category import Category
+from detail import _COLUMNS as DETAIL_COLUMNS, _to_dict as _detail_dict
+from query import PRODUCT_COLUMNS, SUPPLIER_COLUMNS, CATEGORY_COLUMNS, IMAGE_COLUMNS
+from schema import _id_text, ensure_schema
+from supplier import Supplier
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # parquet output is optional
+    pyarrow = None
+
+# Streaming catalogue export.
+#
+# Everything is read inside one read transaction on a read-only connection:
+# in WAL mode that is a consistent snapshot of every table, and writers carry
+# on while it runs. Rows are fetched batch_size at a time and written as they
+# arrive, so memory stays at one batch (one chunk for columnar output).
+#
+# Formats: jsonl, csv, columnar (see write_columnar / read_columnar) and,
+# when pyarrow is installed, parquet.
+
+BATCH_SIZE = 10_000
+FORMATS = ("jsonl", "csv", "columnar", "parquet")
+EXTENSIONS = {"jsonl": "jsonl", "csv": "csv", "columnar": "invcol", "parquet": "parquet"}
+
+# Column kinds: "int", "float", "str", and "json" (lists/objects; JSON text in csv/columnar/parquet)
+_PRODUCT_KINDS = ("str", "str", "str", "int", "float")
+TABLES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "products": tuple(zip([c.lower() for c in PRODUCT_COLUMNS], _PRODUCT_KINDS)),
+    "suppliers": (("supplier_id", "str"), ("supplier_name", "str"), ("supplier_contact", "str"),
+                  ("product_ids", "json")),
+    "categories": (("category_id", "str"), ("category_name", "str"), ("category_description", "str"),
+                   ("product_ids", "json")),
+    "images": tuple((c.lower(), "str") for c in IMAGE_COLUMNS),
+    "product_detail": tuple(zip([c.lower() for c in PRODUCT_COLUMNS], _PRODUCT_KINDS))
+                      + (("suppliers", "json"), ("categories", "json"), ("images", "json")),
+}
+
+# Row sources
+def _batches(cur: sqlite3.Cursor, batch_size: int) -> Iterator[tuple]:
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+def _with_product_ids(
+    conn: sqlite3.Connection, table: str, key: str, columns: Tuple[str, ...], link_table: str, batch_size: int,
+) -> Iterator[Tuple[tuple, List[Any]]]:
+    """(row, product ids) per row of table, merging two cursors sorted the same way."""
+    rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {key}")
+    # Walks the (key, Product_Id) index; the join drops links to missing rows
+    links = groupby(
+        _batches(conn.execute(
+            f"SELECT l.{key}, l.Product_Id FROM {link_table} l JOIN {table} t ON t.{key} = l.{key} "
+            f"ORDER BY l.{key}, l.Product_Id"
+        ), batch_size),
+        key=lambda r: r[0],
+    )
+    pending = next(links, None)
+    for row in _batches(rows, batch_size):
+        if pending is not None and pending[0] == row[0]:
+            yield row, [pid for _, pid in pending[1]]
+            pending = next(links, None)
+        else:
+            yield row, []
+
+# Tables read in storage (rowid) order: a sequential scan, unlike id order
+_PLAIN = {
+    "products": ("Products", PRODUCT_COLUMNS),
+    "images": ("Images", IMAGE_COLUMNS),
+    "product_detail": ("Product_Detail", DETAIL_COLUMNS),
+}
+
+def iter_rows(conn: sqlite3.Connection, table: str, batch_size: int = BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield every row of an export table (see TABLES) as a dict.
+
+    suppliers and categories come in id order; the other tables in storage order.
+    """
+    if table in ("products", "images"):
+        source, columns = _PLAIN[table]
+        names = [c.lower() for c in columns]
+        cur = conn.execute(f"SELECT {', '.join(columns)} FROM {source}")
+        return (dict(zip(names, row)) for row in _batches(cur, batch_size))
+    if table == "suppliers":
+        return (Supplier(*row, product_ids=pids).to_dict() for row, pids in _with_product_ids(
+            conn, "Suppliers", "Supplier_Id", SUPPLIER_COLUMNS, "Product_Supplier", batch_size))
+    if table == "categories":
+        return (Category(*row, product_ids=pids).to_dict() for row, pids in _with_product_ids(
+            conn, "Category", "Category_Id", CATEGORY_COLUMNS, "Product_Category", batch_size))
+    if table == "product_detail":
+        cur = conn.execute(f"SELECT {', '.join(DETAIL_COLUMNS)} FROM Product_Detail")
+        return (_detail_dict(row) for row in _batches(cur, batch_size))
+    raise ValueError(f"unknown table {table!r}; choose from {', '.join(TABLES)}")
+
+def iter_json_lines(conn: sqlite3.Connection, table: str, batch_size: int = BATCH_SIZE) -> Iterator[Any]:
+    """Like iter_rows, but tables without Python-side joins come back as
+    JSON text built by SQLite, which saves decoding and re-encoding each row."""
+    if table not in _PLAIN:
+        return iter_rows(conn, table, batch_size)
+    source, columns = _PLAIN[table]
+    binary = getattr(conn, "binary_ids", False)
+    pairs = []
+    for name, kind in zip(columns, (kind for _, kind in TABLES[table])):
+        value = _id_text(name, binary) if name.endswith("_Id") else name
+        pairs.append(f"'{name.lower()}', {'json(' + value + ')' if kind == 'json' else value}")
+    cur = conn.execute(f"SELECT json_object({', '.join(pairs)}) FROM {source}")
+    return (row[0] for row in _batches(cur, batch_size))
+
+# Writers. Each takes (binary file, table, rows, batch_size) and returns the row count.
+def write_jsonl(f: Any, table: str, rows: Iterator[Dict[str, Any]], batch_size: int) -> int:
+    out = io.TextIOWrapper(f, encoding="utf-8", newline="\n", write_through=True)
+    n = 0
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    lines: List[str] = []
+    for row in rows:
+        lines.append(row if row.__class__ is str else dumps(row))
+        n += 1
+        if len(lines) >= batch_size:
+            out.write("\n".join(lines) + "\n")
+            lines = []
+    if lines:
+        out.write("\n".join(lines) + "\n")
+    out.detach()
+    return n
+
+def write_csv(f: Any, table: str, rows: Iterator[Dict[str, Any]], batch_size: int) -> int:
+    out = io.TextIOWrapper(f, encoding="utf-8", newline="", write_through=True)
+    columns = TABLES[table]
+    writer = csv.writer(out)
+    writer.writerow([name for name, _ in columns])
+    json_cols = [name for name, kind in columns if kind == "json"]
+    n = 0
+    for row in rows:
+        for name in json_cols:
+            row[name] = json.dumps(row[name], separators=(",", ":"))
+        writer.writerow(row.values())
+        n += 1
+    out.detach()
+    return n
+
+def _chunks(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Columnar format (.invcol): b"INVCOL1\n", then length-prefixed JSON headers
+# (u32 little-endian), each followed by its data:
+#   file header   {"table", "columns": [[name, kind], ...], "byteorder"}
+#   chunk header  {"rows": n, "columns": [{"nbytes", "nulls": [row, ...]}, ...]}
+#                 followed by one zlib-compressed buffer per column
+#   end           a zero-length header
+# Buffers: int -> int64 array, float -> float64 array (nulls stored as 0),
+# str/json -> uint32 offsets (rows + 1) then the UTF-8 bytes.
+MAGIC = b"INVCOL1\n"
+_LEN = struct.Struct("<I")
+_TYPECODES = {"int": "q", "float": "d"}
+
+def _header(f: Any, obj: Any) -> None:
+    data = json.dumps(obj, separators=(",", ":")).encode()
+    f.write(_LEN.pack(len(data)) + data)
+
+def _encode_column(values: List[Any], kind: str) -> Tuple[bytes, List[int]]:
+    nulls = [i for i, v in enumerate(values) if v is None]
+    if kind in _TYPECODES:
+        return array(_TYPECODES[kind], (0 if v is None else v for v in values)).tobytes(), nulls
+    if kind == "json":
+        values = [None if v is None else json.dumps(v, separators=(",", ":")) for v in values]
+    encoded = [b"" if v is None else v.encode() for v in values]
+    offsets = array("I", [0])
+    total = 0
+    for b in encoded:
+        total += len(b)
+        offsets.append(total)
+    return offsets.tobytes() + b"".join(encoded), nulls
+
+def write_columnar(f: Any, table: str, rows: Iterator[Dict[str, Any]], batch_size: int) -> int:
+    columns = TABLES[table]
+    f.write(MAGIC)
+    _header(f, {"table": table, "columns": [list(c) for c in columns], "byteorder": sys.byteorder})
+    n = 0
+    for chunk in _chunks(rows, batch_size):
+        buffers, meta = [], []
+        for name, kind in columns:
+            data, nulls = _encode_column([row[name] for row in chunk], kind)
+            data = zlib.compress(data, 1)
+            buffers.append(data)
+            meta.append({"nbytes": len(data), "nulls": nulls})
+        _header(f, {"rows": len(chunk), "columns": meta})
+        for data in buffers:
+            f.write(data)
+        n += len(chunk)
+    f.write(_LEN.pack(0))
+    return n
+
+def read_columnar(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the rows of a .invcol file as dicts (json columns decoded)."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a columnar export")
+
+        def header() -> Optional[Dict[str, Any]]:
+            size = _LEN.unpack(f.read(_LEN.size))[0]
+            return json.loads(f.read(size)) if size else None
+
+        info = header()
+        columns = info["columns"]
+        swap = info["byteorder"] != sys.byteorder
+        while True:
+            chunk = header()
+            if chunk is None:
+                return
+            rows = chunk["rows"]
+            decoded = []
+            for (name, kind), meta in zip(columns, chunk["columns"]):
+                data = zlib.decompress(f.read(meta["nbytes"]))
+                if kind in _TYPECODES:
+                    values: List[Any] = array(_TYPECODES[kind])
+                    values.frombytes(data)
+                    if swap:
+                        values.byteswap()
+                    values = values.tolist()
+                else:
+                    offsets = array("I")
+                    offsets.frombytes(data[:(rows + 1) * 4])
+                    if swap:
+                        offsets.byteswap()
+                    text = data[(rows + 1) * 4:]
+                    values = [text[offsets[i]:offsets[i + 1]].decode() for i in range(rows)]
+                    if kind == "json":
+                        values = [json.loads(v) for v in values]
+                for i in meta["nulls"]:
+                    values[i] = None
+                decoded.append(values)
+            names = [name for name, _ in columns]
+            for i in range(rows):
+                yield {name: col[i] for name, col in zip(names, decoded)}
+
+def write_parquet(f: Any, table: str, rows: Iterator[Dict[str, Any]], batch_size: int) -> int:
+    if pyarrow is None:
+        raise ValueError("parquet output needs pyarrow (pip install pyarrow)")
+    types = {"int": pyarrow.int64(), "float": pyarrow.float64(), "str": pyarrow.string(), "json": pyarrow.string()}
+    columns = TABLES[table]
+    schema = pyarrow.schema([(name, types[kind]) for name, kind in columns])
+    n = 0
+    with pyarrow.parquet.ParquetWriter(f, schema) as writer:
+        for chunk in _chunks(rows, batch_size):
+            data = {}
+            for name, kind in columns:
+                values = [row[name] for row in chunk]
+                if kind == "json":
+                    values = [None if v is None else json.dumps(v, separators=(",", ":")) for v in values]
+                data[name] = values
+            writer.write_table(pyarrow.Table.from_pydict(data, schema=schema))
+            n += len(chunk)
+    return n
+
+WRITERS: Dict[str, Callable[..., int]] = {
+    "jsonl": write_jsonl, "csv": write_csv, "columnar": write_columnar, "parquet": write_parquet,
+}
+
+def export(
+    path: str,
+    out_dir: str,
+    tables: Optional[List[str]] = None,
+    fmt: str = "jsonl",
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, Dict[str, Any]]:
+    """Write each table to out_dir/<table>.<ext> from one snapshot of the
+    database at path. Returns {table: {rows, bytes, seconds, rows_per_sec, mb_per_sec}}.
+
+    An older database is brought up to the current schema first, like every
+    other entry point does; the export itself only reads.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    if batch_size <= 0:
+        raise ValueError("batch_size must be > 0")
+    tables = list(tables or TABLES)
+    for table in tables:
+        if table not in TABLES:
+            raise ValueError(f"unknown table {table!r}; choose from {', '.join(TABLES)}")
+    if not os.path.exists(path):
+        raise ValueError(f"{path} does not exist")
+    writer = db.connect(path)
+    try:
+        ensure_schema(writer)
+    finally:
+        writer.close()
+    os.makedirs(out_dir, exist_ok=True)
+    conn = db.connect(path, readonly=True)
+    report: Dict[str, Dict[str, Any]] = {}
+    try:
+        conn.execute("BEGIN")  # the snapshot: every table below sees the same commit
+        for table in tables:
+            target = os.path.join(out_dir, f"{table}.{EXTENSIONS[fmt]}")
+            t0 = time.perf_counter()
+            with open(target + ".tmp", "wb") as f:
+                source = iter_json_lines if fmt == "jsonl" else iter_rows
+                rows = WRITERS[fmt](f, table, source(conn, table, batch_size), batch_size)
+            os.replace(target + ".tmp", target)
+            seconds = time.perf_counter() - t0
+            size = os.path.getsize(target)
+            report[table] = {
+                "path": target,
+                "rows": rows,
+                "bytes": size,
+                "seconds": round(seconds, 3),
+                "rows_per_sec": round(rows / seconds) if seconds else None,
+                "mb_per_sec": round(size / seconds / 1e6, 1) if seconds else None,
+            }
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return report
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Export the catalogue from a consistent snapshot")
+    ap.add_argument("out_dir")
+    ap.add_argument("--db", default="inventory.db")
+    ap.add_argument("--format", choices=FORMATS, default="jsonl")
+    ap.add_argument("--tables", default=",".join(t for t in TABLES if t != "product_detail"),
+                    help=f"comma-separated, from: {', '.join(TABLES)}")
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per fetch / columnar chunk")
+    args = ap.parse_args(argv)
+
+    try:
+        report = export(args.db, args.out_dir, args.tables.split(","), args.format, args.batch_size)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for table, r in report.items():
+        print(f"{table:<15} {r['rows']:>10,} rows  {r['bytes'] / 1e6:>8.1f} MB  {r['seconds']:>7.2f} s  "
+              f"{r['rows_per_sec'] or 0:>9,} rows/s  {r['mb_per_sec'] or 0:>6} MB/s  -> {r['path']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,42 @@
-import re 
+from supplier import UUID_RX, _uuid_bytes, _uuid_str
+
 class Image:
-    def __init__(self, image_id, product_id, image_url):
-        self.image_id = image_id
-        self.product_id = product_id
+    # No per-instance __dict__; both ids may be held as 16 bytes (compact_id=True)
+    __slots__ = ("_image_id", "_product_id", "image_url")
+
+    def __init__(self, image_id, product_id, image_url, compact_id=False):
+        self._image_id = _uuid_bytes(image_id) if compact_id else image_id
+        self._product_id = _uuid_bytes(product_id) if compact_id else product_id
         self.image_url = image_url
+
+    @classmethod
+    def from_row(cls, row, compact_id=False):
+        # Fast path for (Image_Id, Product_Id, Image_URL) rows
+        self = cls.__new__(cls)
+        self._image_id, self._product_id, self.image_url = row
+        if compact_id:
+            self._image_id = _uuid_bytes(self._image_id)
+            self._product_id = _uuid_bytes(self._product_id)
+        return self
+
+    @property
+    def image_id(self):
+        return _uuid_str(self._image_id)
+
+    @image_id.setter
+    def image_id(self, id):
+        self._image_id = id
+
+    @property
+    def product_id(self):
+        return _uuid_str(self._product_id)
+
+    @product_id.setter
+    def product_id(self, id):
+        self._product_id = id
     
     def isUUID(self,id):
-        UUID_Check = re.compile(
-            r'^[0-9a-fA-F]{8}-'
-            r'[0-9a-fA-F]{4}-'
-            r'[1-5][0-9a-fA-F]{3}-'
-            r'[89ABab][0-9a-fA-F]{3}-'
-            r'[0-9a-fA-F]{12}$'
-        )
-        return bool(UUID_Check.fullmatch(id))
+        return bool(UUID_RX.fullmatch(id or ""))
     
     def set_image_id(self,id):
         # Id must be a UUID
@@ -38,5 +61,16 @@ class Image:
     def get_image_url(self):
         return self.image_url
     
+    def to_dict(self):
+        return {
+            "image_id": self.image_id,
+            "product_id": self.product_id,
+            "image_url": self.image_url,
+        }
+
     def __str__(self):
-            return f"Image: Id='{self.image_id}', Product Id='{self.product_id}', Url='{self.image_url}', "
\ No newline at end of file
+            return f"Image: Id='{self.image_id}', Product Id='{self.product_id}', Url='{self.image_url}', "
+
+def row_factory(cursor, row):
+    """sqlite3 row_factory for SELECTs of the three Images columns."""
+    return Image.from_row(row)
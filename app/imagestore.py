@@ -0,0 +1,272 @@
+from __future__ import annotations
+import argparse, hashlib, json, os, sqlite3, sys, tempfile, threading, urllib.request
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import db
+from schema import ensure_schema
+
+# Image URLs and the bytes behind them.
+#
+# images_for_products() returns the images of a whole page of products,
+# with whatever Image_Store knows about each URL, in one query per 500
+# products instead of one query per product.
+#
+# BlobCache keeps fetched bytes on local disk, one file per SHA-256 of the
+# content, and records url -> content hash in Image_Store. A URL used by
+# any number of products is fetched once, and different URLs that serve
+# the same bytes share one file. Images rows still carry their own URL:
+# Image_Store deduplicates what is fetched and stored, not the URL text.
+#
+# The directory is bounded by max_bytes and evicts the least recently used
+# file first; recency survives restarts via file mtimes. Files that a
+# get_many call is about to return are pinned until it finishes, so
+# neither it nor a concurrent call evicts them. Use one cache directory
+# per process: each instance keeps its own size accounting.
+
+FETCH_TIMEOUT = 10.0
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+_IMAGE_COLUMNS = ("i.Product_Id", "i.Image_Id", "i.Image_URL", "s.Content_Hash", "s.Content_Type", "s.Size")
+_NAMES = [c.split(".", 1)[1].lower() for c in _IMAGE_COLUMNS[1:]]
+
+def images_for_products(conn: sqlite3.Connection, product_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """product_id -> its images in Image_Id order ([] if none), with stored metadata once fetched."""
+    ids = list(dict.fromkeys(product_ids))
+    images: Dict[str, List[Dict[str, Any]]] = {pid: [] for pid in ids}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        for row in conn.execute(
+            f"SELECT {', '.join(_IMAGE_COLUMNS)} FROM Images i "
+            "LEFT JOIN Image_Store s ON s.Image_URL = i.Image_URL "
+            f"WHERE i.Product_Id IN ({', '.join('?' * len(chunk))}) ORDER BY i.Product_Id, i.Image_Id",
+            chunk,
+        ):
+            images.setdefault(row[0], []).append(dict(zip(_NAMES, row[1:])))
+    return images
+
+def store_stats(conn: sqlite3.Connection) -> Dict[str, int]:
+    """How far image URLs and stored bytes are shared."""
+    images, urls = conn.execute("SELECT count(*), count(DISTINCT Image_URL) FROM Images").fetchone()
+    stored, blobs = conn.execute("SELECT count(*), count(DISTINCT Content_Hash) FROM Image_Store").fetchone()
+    return {"images": images, "distinct_urls": urls, "stored_urls": stored, "distinct_blobs": blobs}
+
+def gc(conn: sqlite3.Connection) -> int:
+    """Drop Image_Store rows for URLs no image uses any more. Returns the count."""
+    with conn:
+        return conn.execute(
+            "DELETE FROM Image_Store WHERE Image_URL NOT IN (SELECT Image_URL FROM Images)"
+        ).rowcount
+
+def http_get(url: str, timeout: float = FETCH_TIMEOUT) -> Tuple[bytes, Optional[str]]:
+    """(bytes, content type) of url."""
+    with urllib.request.urlopen(url, timeout=timeout) as r:
+        data = r.read(MAX_IMAGE_BYTES + 1)
+        if len(data) > MAX_IMAGE_BYTES:
+            raise ValueError(f"{url} is larger than {MAX_IMAGE_BYTES} bytes")
+        return data, r.headers.get_content_type()
+
+class BlobCache:
+    """Size-bounded on-disk LRU of image bytes, addressed by content hash."""
+
+    def __init__(self, directory: str, max_bytes: int,
+                 fetch: Callable[[str], Tuple[bytes, Optional[str]]] = http_get) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be > 0")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fetch = fetch
+        self.hits = self.misses = self.evictions = 0
+        self.failures: Dict[str, str] = {}
+        self.size = 0
+        self._files: "OrderedDict[str, int]" = OrderedDict()  # content hash -> size, least recent first
+        self._pins: "Counter[str]" = Counter()  # content hashes in use by a get_many call
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        found = []
+        for sub in os.scandir(directory):
+            if sub.is_dir():
+                found += [(f.stat().st_mtime, f.name, f.stat().st_size)
+                          for f in os.scandir(sub.path) if not f.name.endswith(".tmp")]
+        for _, content_hash, size in sorted(found):
+            self._files[content_hash] = size
+            self.size += size
+
+    def path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, content_hash[:2], content_hash)
+
+    def get(self, conn: sqlite3.Connection, url: str) -> str:
+        """Local path of url's bytes, fetching them on a miss. ValueError if the fetch fails."""
+        paths = self.get_many(conn, [url], workers=1)
+        if url not in paths:
+            raise ValueError(f"Could not fetch {url}: {self.failures[url]}")
+        return paths[url]
+
+    def get_many(self, conn: sqlite3.Connection, urls: Iterable[str], workers: int = 8) -> Dict[str, str]:
+        """url -> local path for each of urls, fetching misses on up to workers threads.
+
+        URLs that cannot be fetched are left out, with the reason in
+        self.failures. conn must be writable: fetches are recorded in
+        Image_Store, all in one transaction.
+        """
+        urls = list(dict.fromkeys(urls))
+        known: Dict[str, Optional[str]] = {}
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            known.update(conn.execute(
+                f"SELECT Image_URL, Content_Hash FROM Image_Store WHERE Image_URL IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall())
+        paths: Dict[str, str] = {}
+        misses: List[str] = []
+        pinned: List[str] = []
+        try:
+            for url in urls:
+                content_hash = known.get(url)
+                if content_hash and self._touch(content_hash, pin=True):
+                    pinned.append(content_hash)
+                    paths[url] = self.path(content_hash)
+                else:
+                    misses.append(url)
+            if misses:
+                self._fetch_misses(conn, misses, workers, paths, pinned)
+        finally:
+            self._release(pinned)
+        return paths
+
+    def _fetch_misses(self, conn: sqlite3.Connection, misses: List[str], workers: int,
+                      paths: Dict[str, str], pinned: List[str]) -> None:
+        def fetch(url: str) -> Tuple[str, Any, Any, Any]:
+            try:
+                data, content_type = self.fetch(url)
+            except (OSError, ValueError) as e:
+                return url, None, None, e
+            content_hash = self._store(data)
+            pinned.append(content_hash)
+            return url, content_hash, content_type, len(data)
+
+        with ThreadPoolExecutor(max(1, min(workers, len(misses)))) as pool:
+            results = list(pool.map(fetch, misses))
+        fetched = [r for r in results if r[1] is not None]
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO Image_Store (Image_URL, Content_Hash, Content_Type, Size, Fetched_At) "
+                "VALUES (?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))",
+                fetched,
+            )
+        with self._lock:
+            self.misses += len(misses)
+        for url, content_hash, _, size_or_error in results:
+            if content_hash is None:
+                self.failures[url] = str(size_or_error)
+            else:
+                self.failures.pop(url, None)
+                paths[url] = self.path(content_hash)
+
+    def _touch(self, content_hash: str, hit: bool = True, pin: bool = False) -> bool:
+        with self._lock:
+            if content_hash not in self._files:
+                return False
+            self._files.move_to_end(content_hash)
+            if pin:
+                self._pins[content_hash] += 1
+        try:
+            os.utime(self.path(content_hash))
+        except FileNotFoundError:
+            # Removed behind our back
+            with self._lock:
+                self.size -= self._files.pop(content_hash, 0)
+                if pin:
+                    self._unpin(content_hash)
+            return False
+        if hit:
+            with self._lock:
+                self.hits += 1
+        return True
+
+    def _store(self, data: bytes) -> str:
+        """Write data (pinned; the caller releases it) and return its content hash."""
+        content_hash = hashlib.sha256(data).hexdigest()
+        if self._touch(content_hash, hit=False, pin=True):
+            return content_hash  # same bytes as another URL
+        path = self.path(content_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if content_hash not in self._files:
+                self._files[content_hash] = len(data)
+                self.size += len(data)
+            self._files.move_to_end(content_hash)
+            self._pins[content_hash] += 1
+        return content_hash
+
+    def _unpin(self, content_hash: str) -> None:
+        self._pins[content_hash] -= 1
+        if self._pins[content_hash] <= 0:
+            del self._pins[content_hash]
+
+    def _release(self, pinned: List[str]) -> None:
+        """Evict down to max_bytes, skipping every pinned file, then unpin pinned."""
+        with self._lock:
+            # Pinned files stay even if they alone are over the limit
+            for old in [h for h in self._files if h not in self._pins]:
+                if self.size <= self.max_bytes:
+                    break
+                self.size -= self._files.pop(old)
+                self.evictions += 1
+                try:
+                    os.remove(self.path(old))
+                except FileNotFoundError:
+                    pass
+            for content_hash in pinned:
+                self._unpin(content_hash)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"files": len(self._files), "bytes": self.size, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Image URL store and blob cache")
+    ap.add_argument("--db", default="inventory.db")
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="how far image URLs and bytes are shared")
+    sub.add_parser("gc", help="forget stored URLs no image uses")
+    pr = sub.add_parser("products", help="print the images of products")
+    pr.add_argument("product_ids", nargs="+")
+    fe = sub.add_parser("fetch", help="fetch every image URL into a blob cache")
+    fe.add_argument("--cache-dir", required=True)
+    fe.add_argument("--max-mb", type=float, default=1024)
+    fe.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args(argv)
+
+    conn = db.connect(args.db)
+    ensure_schema(conn)
+    try:
+        if args.command == "stats":
+            print(json.dumps(store_stats(conn), indent=2))
+        elif args.command == "gc":
+            print(f"Removed {gc(conn)} unused URLs")
+        elif args.command == "products":
+            print(json.dumps(images_for_products(conn, args.product_ids), indent=2))
+        else:
+            cache = BlobCache(args.cache_dir, int(args.max_mb * 1024 * 1024))
+            urls = [r[0] for r in conn.execute("SELECT DISTINCT Image_URL FROM Images")]
+            for i in range(0, len(urls), 1000):
+                cache.get_many(conn, urls[i:i + 1000], args.workers)
+            for url, reason in cache.failures.items():
+                print(f"Failed: {url}: {reason}", file=sys.stderr)
+            print(json.dumps(cache.stats(), indent=2))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
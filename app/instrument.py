@@ -0,0 +1,321 @@
+from __future__ import annotations
+import atexit, json, logging, os, sqlite3, threading, time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+# Per-statement SQL metrics.
+#
+# A QueryStats attached to a connection (db.connect(stats=...), or enable()
+# for every connection opened afterwards) times each statement from execute
+# until its cursor is exhausted, closed or re-executed, so the time spent
+# fetching rows counts too. fetchone() is taken as a single-row lookup and
+# reports at the first call. A cursor dropped before any of that happens is
+# not reported: nothing runs from a finalizer, which could fire on any
+# thread. Statements slower than slow_ms are logged to the "inventory.sql"
+# logger with their EXPLAIN QUERY PLAN.
+#
+# INVENTORY_SQL_STATS=<path> turns it on for the whole process and writes a
+# dump at exit (.json -> snapshot(), anything else -> Prometheus text);
+# INVENTORY_SLOW_QUERY_MS sets the slow-query threshold.
+
+log = logging.getLogger("inventory.sql")
+
+SAMPLES = 2048          # latencies kept per statement for percentiles (most recent)
+MAX_STATEMENTS = 2000   # distinct statements tracked; the rest share one "(other)" entry
+QUANTILES = (0.5, 0.95, 0.99)
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+
+@lru_cache(maxsize=4096)
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+class StatementStats:
+    __slots__ = ("count", "errors", "slow", "total", "max", "rows", "samples", "plan")
+
+    def __init__(self, samples: int) -> None:
+        self.count = self.errors = self.slow = self.rows = 0
+        self.total = self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=samples)
+        self.plan: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        s = sorted(self.samples)
+        out: Dict[str, Any] = {
+            "count": self.count,
+            "errors": self.errors,
+            "slow": self.slow,
+            "rows": self.rows,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 4) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+        for q in QUANTILES:
+            out[f"p{int(q * 100)}_ms"] = round(_quantile(s, q) * 1000, 4)
+        return out
+
+class QueryStats:
+    """Thread-safe per-statement counters, latency percentiles and rows touched."""
+
+    def __init__(self, slow_ms: Optional[float] = None, samples: int = SAMPLES,
+                 max_statements: int = MAX_STATEMENTS) -> None:
+        self.slow_ms = slow_ms
+        self.samples = samples
+        self.max_statements = max_statements
+        self._stmts: Dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, seconds: float, rows: int, error: bool = False,
+               conn: Optional[sqlite3.Connection] = None, params: Any = ()) -> None:
+        key = _normalize(sql)
+        with self._lock:
+            st = self._stmts.get(key)
+            if st is None:
+                if len(self._stmts) >= self.max_statements:
+                    key = "(other)"
+                st = self._stmts.setdefault(key, StatementStats(self.samples))
+            st.count += 1
+            st.total += seconds
+            st.rows += rows
+            st.samples.append(seconds)
+            if seconds > st.max:
+                st.max = seconds
+            if error:
+                st.errors += 1
+            slow = self.slow_ms is not None and seconds * 1000 >= self.slow_ms
+            if slow:
+                st.slow += 1
+            need_plan = slow and st.plan is None
+        if slow:
+            if need_plan and conn is not None:
+                st.plan = _explain(conn, sql, params)
+            log.warning("slow query: %.1f ms, %d rows: %s\n%s", seconds * 1000, rows, key, st.plan or "(no plan)")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stmts.clear()
+
+    # Export
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """{statement: counters}, slowest total time first."""
+        with self._lock:
+            items = [(sql, st.to_dict(), st.plan) for sql, st in self._stmts.items()]
+        items.sort(key=lambda item: item[1]["total_ms"], reverse=True)
+        out: Dict[str, Dict[str, Any]] = {}
+        for sql, d, plan in items:
+            if plan is not None:
+                d["plan"] = plan
+            out[sql] = d
+        return out
+
+    def to_prometheus(self, prefix: str = "inventory_sql") -> str:
+        """Prometheus text exposition format, one label set per statement."""
+        with self._lock:
+            items = [(sql, st.count, st.errors, st.slow, st.rows, st.total, sorted(st.samples))
+                     for sql, st in self._stmts.items()]
+        lines = [
+            f"# HELP {prefix}_duration_seconds Statement time from execute until the cursor is exhausted.",
+            f"# TYPE {prefix}_duration_seconds summary",
+        ]
+        for sql, count, _, _, _, total, samples in items:
+            label = _label(sql)
+            for q in QUANTILES:
+                lines.append(f'{prefix}_duration_seconds{{statement="{label}",quantile="{q}"}} {_quantile(samples, q):.9f}')
+            lines.append(f'{prefix}_duration_seconds_sum{{statement="{label}"}} {total:.9f}')
+            lines.append(f'{prefix}_duration_seconds_count{{statement="{label}"}} {count}')
+        for name, help_text, idx in (
+            ("rows_total", "Rows returned or changed.", 4),
+            ("errors_total", "Statements that raised.", 2),
+            ("slow_total", "Statements over the slow-query threshold.", 3),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for item in items:
+                lines.append(f'{prefix}_{name}{{statement="{_label(item[0])}"}} {item[idx]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """Write snapshot() as JSON if path ends in .json, else Prometheus text."""
+        text = (json.dumps(self.snapshot(), indent=2) + "\n") if path.endswith(".json") else self.to_prometheus()
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+def _label(sql: str) -> str:
+    return sql.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _explain(conn: sqlite3.Connection, sql: str, params: Any) -> Optional[str]:
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        # Plain (uninstrumented) cursor so the EXPLAIN isn't recorded itself
+        rows = conn.cursor(conn.explain_cursor_class).execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    except sqlite3.Error as e:
+        return f"(EXPLAIN failed: {e})"
+    if not rows:
+        return None
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return "\n".join(lines)
+
+# Cursor and connection mixins (combined with db.py's classes by instrumented())
+class InstrumentedCursor:
+    """Times statements for connection.query_stats; see module comment."""
+
+    _pending: Optional[list] = None  # [sql, seconds so far, rows so far, params]
+
+    def _finish(self) -> None:
+        p = self._pending
+        if p is not None:
+            self._pending = None
+            self.connection.query_stats.record(p[0], p[1], p[2], conn=self.connection, params=p[3])
+
+    def execute(self, sql: str, parameters: Any = ()) -> Any:
+        self._finish()
+        t0 = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except BaseException:
+            self.connection.query_stats.record(sql, time.perf_counter() - t0, 0, error=True)
+            raise
+        elapsed = time.perf_counter() - t0
+        if self.description is None:
+            self.connection.query_stats.record(sql, elapsed, max(self.rowcount, 0), conn=self.connection, params=parameters)
+        else:
+            self._pending = [sql, elapsed, 0, parameters]
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> Any:
+        self._finish()
+        first: List[Any] = []
+
+        def remember_first(seq: Iterable[Any]) -> Iterator[Any]:
+            for params in seq:
+                if not first:
+                    first.append(params)
+                yield params
+
+        t0 = time.perf_counter()
+        try:
+            super().executemany(sql, remember_first(seq_of_parameters))
+        except BaseException:
+            self.connection.query_stats.record(sql, time.perf_counter() - t0, 0, error=True)
+            raise
+        self.connection.query_stats.record(sql, time.perf_counter() - t0, max(self.rowcount, 0),
+                                           conn=self.connection, params=first[0] if first else ())
+        return self
+
+    def fetchone(self) -> Any:
+        p = self._pending
+        if p is None:
+            return super().fetchone()
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        p[1] += time.perf_counter() - t0
+        if row is not None:
+            p[2] += 1
+        self._finish()
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Any]:
+        size = self.arraysize if size is None else size
+        p = self._pending
+        if p is None:
+            return super().fetchmany(size)
+        t0 = time.perf_counter()
+        rows = super().fetchmany(size)
+        p[1] += time.perf_counter() - t0
+        p[2] += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        p = self._pending
+        if p is None:
+            return super().fetchall()
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        p[1] += time.perf_counter() - t0
+        p[2] += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self) -> Any:
+        p = self._pending
+        if p is None:
+            return super().__next__()
+        t0 = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            p[1] += time.perf_counter() - t0
+            self._finish()
+            raise
+        p[1] += time.perf_counter() - t0
+        p[2] += 1
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+class InstrumentedConnection:
+    """Routes every statement, including conn.execute, through an InstrumentedCursor."""
+
+    query_stats: Optional[QueryStats] = None
+
+    def cursor(self, factory: Any = None) -> Any:
+        return super().cursor(factory or self.cursor_class)
+
+    def execute(self, sql: str, parameters: Any = ()) -> Any:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> Any:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+_classes: Dict[type, type] = {}
+
+def instrumented(conn_class: type) -> type:
+    """Connection class that behaves like conn_class and reports to query_stats."""
+    cls = _classes.get(conn_class)
+    if cls is None:
+        base_cursor = conn_class.cursor_class
+        cursor_class = type(f"Instrumented{base_cursor.__name__}", (InstrumentedCursor, base_cursor), {})
+        cls = _classes[conn_class] = type(
+            f"Instrumented{conn_class.__name__}", (InstrumentedConnection, conn_class),
+            {"cursor_class": cursor_class, "explain_cursor_class": base_cursor},
+        )
+    return cls
+
+# Process-wide default, used by db.connect when no stats are passed
+_default: Optional[QueryStats] = None
+
+def enable(slow_ms: Optional[float] = None, dump_path: Optional[str] = None) -> QueryStats:
+    """Instrument every connection opened from now on; optionally dump at exit."""
+    global _default
+    _default = QueryStats(slow_ms)
+    if dump_path:
+        atexit.register(_default.dump, dump_path)
+    return _default
+
+def disable() -> None:
+    global _default
+    _default = None
+
+def default_stats() -> Optional[QueryStats]:
+    return _default
+
+if os.environ.get("INVENTORY_SQL_STATS"):
+    _path = os.environ["INVENTORY_SQL_STATS"]
+    _slow = os.environ.get("INVENTORY_SLOW_QUERY_MS")
+    enable(float(_slow) if _slow else None, None if _path == "1" else _path)
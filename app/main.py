@@ -1,70 +1,254 @@
-import uuid 
-import sqlite3
-import product
-import image
-import supplier
-import category
-from supplier import (
-    create_supplier, read_supplier, update_supplier,
-    delete_supplier, add_product_to_supplier, remove_product_from_supplier, _load_json_list, _dump_json_list
-)
-conn = sqlite3.connect("inventory.db")
-cur = conn.cursor()
-
-## Create Product table
-cur.execute("""
-    CREATE TABLE IF NOT EXISTS Products (
-        Product_Id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
-        Product_Name TEXT NOT NULL,
-        Product_Description TEXT,
-        Product_Quantity INTEGER NOT NULL CHECK (Product_Quantity >= 0),
-        Product_Price REAL NOT NULL CHECK (Product_Price > 0),
-        Supplier_Ids TEXT DEFAULT '[]',   -- store JSON array
-        Category_Ids TEXT DEFAULT '[]',
-        Image_Ids TEXT DEFAULT '[]'
-    )
-""")
-
-
-## Create Supplier table 
-cur.execute("""
-    CREATE TABLE IF NOT EXISTS Suppliers (
-        Supplier_Id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
-        Supplier_Name TEXT NOT NULL,
-        Supplier_Contact TEXT NOT NULL,
-        Product_Ids TEXT DEFAULT '[]'  -- store JSON array of UUIDs
-    )
-""")
-
-
-## Create Category data 
-cur.execute("""
-    CREATE TABLE IF NOT EXISTS Category (
-        Category_Id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
-        Category_Name TEXT NOT NULL,
-        Category_Description TEXT,
-        Product_Ids TEXT  -- you can store JSON array of UUIDs here
-    )
-""")
-
-## Create Image data 
-cur.execute("""
-    CREATE TABLE IF NOT EXISTS Images (
-        Image_Id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
-        Product_Id TEXT NOT NULL,
-        Image_URL TEXT NOT NULL
+from __future__ import annotations
+import argparse, io, json, re, shlex, sys, time
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+import db
+from schema import ensure_schema
+
+# Inventory command line. With no command it runs the interactive menu;
+# otherwise it runs one command, e.g.
+#
+#     python main.py product create --name Widget --quantity 5 --price 2.50
+#     python main.py supplier link <supplier_id> <product_id>
+#
+# or, with "script", a file (default: stdin) of such commands, one per line,
+# all in one process and one transaction. A line "name = <command>" saves
+# the command's result (e.g. a new id) for later lines to use as $name:
+#
+#     w = product create --name Widget --quantity 5 --price 2.50
+#     s = supplier create --name Acme --contact sales@acme.example
+#     supplier link $s $w
+#
+# If any line fails, nothing the script did is saved. Modules are imported
+# by the commands that use them, and the schema is only touched when its
+# version is out of date (see schema.ensure_schema).
+#
+# "snapshot PATH [--every SECONDS]" keeps a copy of the database at PATH for
+# read-only service processes (service.py --snapshot).
+
+# Command line option -> repository field, per entity
+FIELDS: Dict[str, Dict[str, tuple]] = {
+    "product": {"name": ("product_name", str), "description": ("product_description", str),
+                "quantity": ("product_quantity", int), "price": ("product_price", float)},
+    "supplier": {"name": ("supplier_name", str), "contact": ("supplier_contact", str)},
+    "category": {"name": ("category_name", str), "description": ("category_description", str)},
+    "image": {"product": ("product_id", str), "url": ("image_url", str)},
+}
+_REPOSITORIES = {"product": "ProductRepository", "supplier": "SupplierRepository",
+                 "category": "CategoryRepository", "image": "ImageRepository"}
+
+def _repository(conn: db.InventoryConnection, entity: str) -> Any:
+    import repository
+    return getattr(repository, _REPOSITORIES[entity])(conn)
+
+def _values(args: argparse.Namespace) -> Dict[str, Any]:
+    values = {field: getattr(args, opt) for opt, (field, _) in FIELDS[args.entity].items()
+              if getattr(args, opt) is not None}
+    if getattr(args, "products", None):
+        values["product_ids"] = args.products
+    return values
+
+# Commands: fn(conn, args) -> result to print (None prints nothing)
+def _create(conn: db.InventoryConnection, args: argparse.Namespace) -> Any:
+    return _repository(conn, args.entity).create(**_values(args))
+
+def _read(conn: db.InventoryConnection, args: argparse.Namespace) -> Any:
+    return _repository(conn, args.entity).read(args.id).to_dict()
+
+def _update(conn: db.InventoryConnection, args: argparse.Namespace) -> Any:
+    values = _values(args)
+    if not values:
+        raise ValueError("no updates given")
+    _repository(conn, args.entity).update(args.id, **values)
+
+def _delete(conn: db.InventoryConnection, args: argparse.Namespace) -> Any:
+    repo = _repository(conn, args.entity)
+    # One transaction: a missing id deletes nothing, not just itself
+    with conn.batch():
+        missing = [rid for rid in dict.fromkeys(args.ids) if not repo.exists(rid)]
+        if missing:
+            raise KeyError(f"{repo.label} {missing[0]} not found")
+        repo.delete_many(args.ids)
+
+def _link(conn: db.InventoryConnection, args: argparse.Namespace) -> Any:
+    if args.entity == "supplier":
+        from supplier import add_product_to_supplier, remove_product_from_supplier
+        (add_product_to_supplier if args.link else remove_product_from_supplier)(conn, args.id, args.product_id)
+    else:
+        repo = _repository(conn, "category")
+        (repo.add_product if args.link else repo.remove_product)(args.id, args.product_id)
+
+def _adjust(conn: db.InventoryConnection, args: argparse.Namespace) -> Any:
+    from stock import adjust_stock, NOT_FOUND
+    failed = adjust_stock(conn, {args.id: args.delta})
+    if failed.get(args.id) == NOT_FOUND:
+        raise KeyError(f"Product {args.id} not found")
+    if failed:
+        raise ValueError(f"Not enough stock of {args.id}")
+
+def _search(conn: db.InventoryConnection, args: argparse.Namespace) -> Any:
+    from search import search_products
+    return search_products(conn, args.text, args.category, args.supplier, args.limit)
+
+class _ScriptParser(argparse.ArgumentParser):
+    """Raises ValueError instead of exiting, so a bad script line can be reported."""
+
+    def error(self, message: str) -> None:
+        raise ValueError(message)
+
+def build_parser(script: bool = False) -> argparse.ArgumentParser:
+    """The command parser; script=True builds the one used for script lines."""
+    ap = (_ScriptParser if script else argparse.ArgumentParser)(
+        prog="main.py", description="Inventory command line (no command: interactive menu)")
+    if not script:
+        ap.add_argument("--db", default="inventory.db")
+    commands = ap.add_subparsers(dest="entity")
+    for entity, fields in FIELDS.items():
+        actions = commands.add_parser(entity).add_subparsers(dest="action", required=True)
+        for action in ("create", "update"):
+            p = actions.add_parser(action)
+            if action == "update":
+                p.add_argument("id")
+            for opt, (_, kind) in fields.items():
+                p.add_argument(f"--{opt}", type=kind)
+            if entity == "category":
+                p.add_argument("--product", dest="products", action="append", help="linked product id (repeatable)")
+            p.set_defaults(fn=_create if action == "create" else _update)
+        p = actions.add_parser("read")
+        p.add_argument("id")
+        p.set_defaults(fn=_read)
+        p = actions.add_parser("delete")
+        p.add_argument("ids", nargs="+")
+        p.set_defaults(fn=_delete)
+        if entity in ("supplier", "category"):
+            for action in ("link", "unlink"):
+                p = actions.add_parser(action, help=f"{action} a product")
+                p.add_argument("id")
+                p.add_argument("product_id")
+                p.set_defaults(fn=_link, link=action == "link")
+        if entity == "product":
+            p = actions.add_parser("adjust", help="change the quantity by delta")
+            p.add_argument("id")
+            p.add_argument("delta", type=int)
+            p.set_defaults(fn=_adjust)
+    p = commands.add_parser("search")
+    p.add_argument("text")
+    p.add_argument("--category")
+    p.add_argument("--supplier")
+    p.add_argument("--limit", type=int, default=20)
+    p.set_defaults(fn=_search)
+    if not script:
+        p = commands.add_parser("script", help="run commands from a file (default: stdin) in one transaction")
+        p.add_argument("file", nargs="?", type=argparse.FileType("r"), default=sys.stdin)
+        p = commands.add_parser("snapshot", help="copy the database for read-only serving (service.py --snapshot)")
+        p.add_argument("path")
+        p.add_argument("--every", type=float, metavar="SECONDS", help="keep refreshing the copy")
+    return ap
+
+def _print(result: Any, out: TextIO) -> None:
+    if result is None:
+        return
+    print(result if isinstance(result, str) else json.dumps(result), file=out)
+
+_ASSIGN = re.compile(r"(\w+)\s*=\s*(.*)")
+
+def run_script(conn: db.InventoryConnection, lines: Iterable[str], out: TextIO = sys.stdout) -> int:
+    """Run script lines in one transaction; any failure rolls all of them back.
+
+    Returns the number of commands run. Errors are raised as ValueError or
+    KeyError with the line number prepended. Results are written to out
+    only once the transaction has committed.
+    """
+    parser = build_parser(script=True)
+    names: Dict[str, Any] = {}
+    count = 0
+    buffered = io.StringIO()
+    with conn.batch():
+        for n, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            target = None
+            m = _ASSIGN.fullmatch(line)
+            if m:
+                target, line = m.groups()
+            try:
+                tokens = [names[t[1:]] if t.startswith("$") and t[1:] in names else t for t in shlex.split(line)]
+                unknown = [t for t in tokens if t.startswith("$")]
+                if unknown:
+                    raise ValueError(f"{unknown[0]} is not set")
+                args = parser.parse_args(tokens)
+                if args.entity is None:
+                    raise ValueError("no command given")
+                result = args.fn(conn, args)
+            except (ValueError, KeyError) as e:
+                raise type(e)(f"line {n}: {e.args[0] if e.args else e}") from e
+            if target:
+                names[target] = result
+            _print(result, buffered)
+            count += 1
+    out.write(buffered.getvalue())
+    return count
+
+def snapshot(path: str, snapshot_path: str, every: Optional[float] = None) -> None:
+    """Copy path to snapshot_path, then again every `every` seconds if given."""
+    while True:
+        t0 = time.monotonic()
+        db.copy_snapshot(path, snapshot_path)
+        elapsed = time.monotonic() - t0
+        print(f"Snapshot written to {snapshot_path} in {elapsed:.2f}s", file=sys.stderr)
+        if not every:
+            return
+        time.sleep(max(0.0, every - elapsed))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    conn = db.connect(args.db)
+    try:
+        ensure_schema(conn)
+        if args.entity is None:
+            try:
+                interactive(conn)
+            except (EOFError, KeyboardInterrupt):
+                print()
+        elif args.entity == "script":
+            n = run_script(conn, args.file)
+            print(f"{n} commands committed", file=sys.stderr)
+        elif args.entity == "snapshot":
+            try:
+                snapshot(args.db, args.path, args.every)
+            except KeyboardInterrupt:
+                pass
+        else:
+            _print(args.fn(conn, args), sys.stdout)
+    except (ValueError, KeyError) as e:
+        print(f"Error: {e.args[0] if e.args else e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+# Interactive menu
+def interactive(conn: db.InventoryConnection) -> None:
+    from supplier import (
+        create_supplier, read_supplier, update_supplier,
+        delete_supplier, add_product_to_supplier, remove_product_from_supplier
     )
-""")
+    from repository import ProductRepository, CategoryRepository, ImageRepository
+    from query import iter_categories, iter_images
+    from search import search_products
+    from stock import adjust_stock, NOT_FOUND
+    products = ProductRepository(conn)
+    categories = CategoryRepository(conn)
+    images = ImageRepository(conn)
 
-# CLI Loop
-if __name__ == "__main__":
     print("\n************************************ CLI RUNNING ************************************\n")
     while True:
-        class_to_create  = str(input("What would you like to add? (Product, Image, Supplier, or Category): "))
+        class_to_create  = str(input("What would you like to add? (Product, Image, Supplier, Category, or Search): "))
         class_to_create = class_to_create.replace(" ", "").lower()
         
         if class_to_create == "product":
-            command = input("Product Class: Create, Read, Update, Delete: ")
+            command = input("Product Class: Create, Read, Update, Delete, Adjust: ")
 
             try:
                 if command == "Create":
@@ -80,36 +264,22 @@ if __name__ == "__main__":
                         print("Price must be > 0")
                         continue
                     
-                    product_id = str(uuid.uuid4())
-                    cur.execute("""
-                        INSERT INTO Products (Product_Id, Product_Name, Product_Description, Product_Quantity, Product_Price, Supplier_Ids, Category_Ids, Image_Ids)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (product_id, name, desc, quantity, price, "[]", "[]", "[]"))
-                    conn.commit()
+                    product_id = products.create(
+                        product_name=name, product_description=desc,
+                        product_quantity=quantity, product_price=price,
+                    )
                     print(f"Created Product with ID: {product_id}")
                 elif command == "Read":
                     product_id = input("Product Id (UUID): ").strip()
                     if product_id:
-                        cur.execute("SELECT * FROM Products WHERE Product_Id = ?", (product_id,))
-                        output = cur.fetchone()
-                        if output:
-                            print({
-                                "product_id": output[0],
-                                "product_name": output[1],
-                                "product_description": output[2],
-                                "product_quantity": output[3],
-                                "product_price": output[4],
-                                "supplier_ids": output[5],
-                                "category_ids": output[6],
-                                "image_ids": output[7],
-                            })
+                        if products.exists(product_id):
+                            print(products.read(product_id).to_dict())
                         else:
                             print("Product Id not found")
                 elif command == "Update":
                     product_id = input("Product Id (UUID): ").strip()
 
-                    cur.execute("SELECT * FROM Products WHERE Product_Id = ?", (product_id,))
-                    if not cur.fetchone():
+                    if not products.exists(product_id):
                         print("Product Id does not exist")
                         continue
                     
@@ -118,16 +288,13 @@ if __name__ == "__main__":
                     quantity = input("New Product Quantity (leave blank if no change): ").strip()
                     price = input("New Product Price (leaeve blank if no change): ").strip()
 
-                    updates = []
-                    values = []
+                    updates = {}
 
                     if name:
-                        updates.append("Product_Name = ?")
-                        values.append(name)
+                        updates["product_name"] = name
 
                     if desc:
-                        updates.append("Product_Description = ?")
-                        values.append(desc)
+                        updates["product_description"] = desc
                     
                     if quantity:
                         try:
@@ -135,8 +302,7 @@ if __name__ == "__main__":
                             if quantity < 0:
                                 print("Quantity must be >= 0")
                                 continue
-                            updates.append("Product_Quantity = ?")
-                            values.append(quantity)
+                            updates["product_quantity"] = quantity
                         except ValueError:
                             print("Quantity must be an integer")
                             continue
@@ -147,45 +313,32 @@ if __name__ == "__main__":
                             if price <= 0:
                                 print("Price must be > 0")
                                 continue
-                            updates.append("Product_Price = ?")
-                            values.append(price)
+                            updates["product_price"] = price
                         except ValueError:
                             print("Price must be a float")
                             continue
                         
                     if updates:
-                        values.append(product_id)
-                        sql = f"UPDATE Products SET {', '.join(updates)} WHERE Product_Id = ?"
-                        cur.execute(sql, tuple(values))
-                        conn.commit()
+                        products.update(product_id, **updates)
                         print("Product updated")
                     else:
                         print("No updates provided")
+                elif command == "Adjust":
+                    product_id = input("Product Id (UUID): ").strip()
+                    delta = int(input("Change in quantity (e.g. -3 or 10): ").strip())
+                    failed = adjust_stock(conn, {product_id: delta})
+                    if not failed:
+                        print("Quantity updated")
+                    elif failed[product_id] == NOT_FOUND:
+                        print("Product Id does not exist")
+                    else:
+                        print("Not enough stock")
                 elif command == "Delete":
                     product_id = input("Product Id (UUID): ").strip()
-                    cur.execute("SELECT Supplier_Id, Product_Ids FROM Suppliers")
-                    for sid, plist in cur.fetchall():
-                        lst = _load_json_list(plist)
-                        if product_id in lst:
-                            lst.remove(product_id)
-                            cur.execute("UPDATE Suppliers SET Product_Ids = ? WHERE Supplier_Id = ?", (_dump_json_list(lst), sid))
-                    
-                    cur.execute("SELECT Category_Id, Product_Ids FROM Category")
-                    for cid, plist in cur.fetchall():
-                        lst = _load_json_list(plist)
-                        if product_id in lst:
-                            lst.remove(product_id)
-                            if lst:
-                                cur.execute("UPDATE Category SET Product_Ids = ? WHERE Category_Id = ?", (_dump_json_list(lst), cid))
-
-                    cur.execute("DELETE FROM Images WHERE Product_Id = ?", (product_id,))
-                    cur.execute("DELETE FROM Products WHERE Product_Id = ?", (product_id,))
-                    conn.commit()
-
-                    if cur.rowcount == 0:
+                    if products.delete_many([product_id]) == 0:
                         print("Product not found")
                 else:
-                    print("Please choose: Create, Read, Update, Delete")
+                    print("Please choose: Create, Read, Update, Delete, Adjust")
 
             except (ValueError, KeyError) as e:
                 print(f"Error: {e}")
@@ -240,165 +393,140 @@ if __name__ == "__main__":
             command = input("Category Class: Create, Read, Update, Delete: ")
             command = command.replace(" ", "").lower()
 
-            if command == "create":
-                items = input("Enter your category_name, category_desc, and product id. (Can leave null): ")
-
-                parts = [p.strip() for p in items.split(",")]
+            try:
+                if command == "create":
+                    items = input("Enter your category_name, category_desc, and product id. (Can leave null): ")
 
-                while len(parts) < 3:
-                    parts.append("")
-                name, desc, product_ids = parts
+                    parts = [p.strip() for p in items.split(",")]
 
-                # Verify product_id exists in product table 
-                if product_ids:
-                    cur.execute("SELECT Product_Id FROM Products where Product_Id = ? ",(product_ids,))
-                    res = cur.fetchone()
+                    while len(parts) < 3:
+                        parts.append("")
+                    name, desc, product_ids = parts
 
-                    if not res:
+                    # Verify product_id exists in product table 
+                    if product_ids and not products.exists(product_ids):
                         print("Product Id does not exist. Cannot create image.")
                         continue
 
-                new_id = str(uuid.uuid4())
-                cur.execute("INSERT INTO Category (Category_Id,Category_Name,Category_Description,Product_Ids) VALUES (?,?,?,?)", (new_id,name,desc,product_ids))
-                conn.commit()
-                print(f"ID of created Category: {new_id}")
-
-            elif command == "read":
-                cur.execute("SELECT * FROM Category")
-                rows = cur.fetchall()
-                for row in rows:
-                    print(row)
+                    new_id = categories.create(
+                        category_name=name, category_description=desc,
+                        product_ids=[product_ids] if product_ids else [],
+                    )
+                    print(f"ID of created Category: {new_id}")
 
-            elif command == "update":
-                cat_id = input("Enter the Category Id: ").strip()
+                elif command == "read":
+                    for row in iter_categories(conn):
+                        print(row)
 
-                name = input("Enter new Category Name (leave blank to keep current): ").strip()
-                desc = input("Enter new Category Description (leave blank to keep current): ").strip()
-                product_ids = input("Enter new Product Ids (comma-separated, leave blank to keep current): ").strip()
+                elif command == "update":
+                    cat_id = input("Enter the Category Id: ").strip()
 
-                updates = []
-                values = []
+                    name = input("Enter new Category Name (leave blank to keep current): ").strip()
+                    desc = input("Enter new Category Description (leave blank to keep current): ").strip()
+                    product_ids = input("Enter new Product Ids (comma-separated, leave blank to keep current): ").strip()
 
-                if name:
-                    updates.append("Category_Name = ?")
-                    values.append(name)
+                    updates = {}
 
-                if desc:
-                    updates.append("Category_Description = ?")
-                    values.append(desc)
+                    if name:
+                        updates["category_name"] = name
 
-                if product_ids:
-                    updates.append("Product_Ids = ?")
-                    values.append(product_ids)
+                    if desc:
+                        updates["category_description"] = desc
 
-                if updates:
-                    values.append(cat_id)
-                    sql = f"UPDATE Category SET {', '.join(updates)} WHERE Category_Id = ?"
-                    cur.execute(sql, tuple(values))
-                    conn.commit()
+                    if product_ids:
+                        updates["product_ids"] = [p.strip() for p in product_ids.split(",") if p.strip()]
 
-                    if cur.rowcount == 0:
+                    if not categories.exists(cat_id):
                         print("Category Id does not exist")
-                    else:
+                    elif updates:
+                        categories.update(cat_id, **updates)
                         print(f"Category {cat_id} updated")
-                else:
-                    print("No updates provided")
+                    else:
+                        print("No updates provided")
 
 
-            elif command == "delete":
-                id = input("Enter the Category Id: ")
-                cur.execute(f"DELETE FROM Category WHERE Category_Id = ? ",(id,))
-                conn.commit()
-                
-                if cur.rowcount == 0:
-                    print("Category Id does not exist")
-                else:
-                    print(f"Category with Id {id} Deleted")
-                    # Delete from products as well 
-                    cur.execute("""
-                        DELETE FROM Products
-                        WHERE ',' || Product_Id || ',' LIKE '%,' || ? || ',%'
-                    """, (id,))
-                    conn.commit()
+                elif command == "delete":
+                    id = input("Enter the Category Id: ")
+
+                    # Also unlinks it from its products
+                    if categories.delete_many([id]) == 0:
+                        print("Category Id does not exist")
+                    else:
+                        print(f"Category with Id {id} Deleted")
 
-            else:
-                print("Please select a valid command")
+                else:
+                    print("Please select a valid command")
+            except (ValueError, KeyError) as e:
+                print(f"Error: {e}")
 
         elif class_to_create == "image":
 
             command = input("Category Class: Create, Read, Update, Delete: ")
             command = command.replace(" ", "").lower()
 
-            if command == "create":
-                product_id = input("Enter Product Id: ").strip()
-                image_url = input("Enter Image URL: ").strip()
-
-                # Verify product_id exists in product table 
-                cur.execute("SELECT Product_Id FROM Products where Product_Id = ? ",(product_id,))
-                res = cur.fetchone()
-
-                if not res:
-                    print("Product Id does not exist. Cannot create image.")
-                    continue
-                image_id = str(uuid.uuid4())  # or let SQLite default generate it
-                cur.execute("""
-                    INSERT INTO Images (Image_Id, Product_Id, Image_URL)
-                    VALUES (?, ?, ?)
-                """, (image_id, product_id, image_url))
-                conn.commit()
-                print("Created Image with ID:", image_id)
-            elif command == "read":
-                    cur.execute("SELECT * FROM Images")
-                    rows = cur.fetchall()
-                    for row in rows:
-                        print(row)
-            elif command == "update":
-                    image_id = input("Enter Image Id to update: ").strip()
-                    new_url = input("Enter new Image URL: ").strip()
-                    new_product_id = input("Enter new product Id: ").strip()
+            try:
+                if command == "create":
+                    product_id = input("Enter Product Id: ").strip()
+                    image_url = input("Enter Image URL: ").strip()
 
                     # Verify product_id exists in product table 
-                    if new_product_id:
-                        cur.execute("SELECT Product_Id FROM Products where Product_Id = ? ",(new_product_id,))
-                        res = cur.fetchone()
-
-                        if not res:
+                    if not products.exists(product_id):
+                        print("Product Id does not exist. Cannot create image.")
+                        continue
+                    image_id = images.create(product_id=product_id, image_url=image_url)
+                    print("Created Image with ID:", image_id)
+                elif command == "read":
+                        for row in iter_images(conn):
+                            print(row)
+                elif command == "update":
+                        image_id = input("Enter Image Id to update: ").strip()
+                        new_url = input("Enter new Image URL: ").strip()
+                        new_product_id = input("Enter new product Id: ").strip()
+
+                        # Verify product_id exists in product table 
+                        if new_product_id and not products.exists(new_product_id):
                             print("Product Id does not exist. Cannot create image.")
                             continue
-                        
-                        cur.execute("UPDATE Images SET Image_URL = ?,Product_Id=? WHERE Image_Id = ?", (new_url,new_product_id, image_id))
-                        conn.commit()
-                        if cur.rowcount == 0:
+
+                        updates = {}
+                        if new_url:
+                            updates["image_url"] = new_url
+                        if new_product_id:
+                            updates["product_id"] = new_product_id
+
+                        if not images.exists(image_id):
                             print("Image Id not found")
                         else:
+                            images.update(image_id, **updates)
                             print("Image updated")
-                        continue
 
-                    cur.execute("UPDATE Images SET Image_URL = ? WHERE Image_Id = ?", (new_url, image_id))
-                    conn.commit()
-                    if cur.rowcount == 0:
-                        print("Image Id not found")
-                    else:
-                        print("Image updated")
-                          
-            elif command == "delete":
-                    image_id = input("Enter Image Id to delete: ").strip()
-                    cur.execute("DELETE FROM Images WHERE Image_Id = ?", (image_id,))
-                    conn.commit()
-                    # Also make sure it gets deleted from products 
-
-                    if cur.rowcount == 0:
-                        print("Image Id not found")
-                    else:
-                        print("Image deleted")
-                        # Delete from products as well 
-                        cur.execute("""
-                            DELETE FROM Products
-                            WHERE ',' || Image_Ids || ',' LIKE '%,' || ? || ',%'
-                        """, (image_id,))
-                        conn.commit()
-            else:
-                print("Please select a valid command")
+                elif command == "delete":
+                        image_id = input("Enter Image Id to delete: ").strip()
+
+                        if images.delete_many([image_id]) == 0:
+                            print("Image Id not found")
+                        else:
+                            print("Image deleted")
+                else:
+                    print("Please select a valid command")
+            except (ValueError, KeyError) as e:
+                print(f"Error: {e}")
+
+        elif class_to_create == "search":
+            text = input("Search products (name or description): ").strip()
+            category_id = input("Only in Category Id (leave blank for any): ").strip()
+            supplier_id = input("Only from Supplier Id (leave blank for any): ").strip()
+            try:
+                rows = search_products(conn, text, category_id or None, supplier_id or None)
+                for row in rows:
+                    print(f"{row['product_id']}  {row['product_name']}  ${row['product_price']:.2f}")
+                if not rows:
+                    print("No matching products")
+            except ValueError as e:
+                print(f"Error: {e}")
 
         else:
-            print("Please select an option from (Product, Image, Supplier, or Category)")
+            print("Please select an option from (Product, Image, Supplier, Category, or Search)")
+
+if __name__ == "__main__":
+    sys.exit(main())
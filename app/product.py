@@ -1,6 +1,12 @@
+from supplier import UUID_RX, _uuid_bytes, _uuid_str
+
 class Product:
-    def __init__(self, product_id, product_name, product_description, product_quantity, product_price, supplier_ids=None, category_ids=None, image_ids=None):
-        self.product_id = product_id
+    # No per-instance __dict__; product_id may be held as 16 bytes (compact_id=True)
+    __slots__ = ("_product_id", "product_name", "product_description", "product_quantity", "product_price",
+                 "supplier_ids", "category_ids", "image_ids")
+
+    def __init__(self, product_id, product_name, product_description, product_quantity, product_price, supplier_ids=None, category_ids=None, image_ids=None, compact_id=False):
+        self._product_id = _uuid_bytes(product_id) if compact_id else product_id
         self.product_name = product_name
         self.product_description = product_description
         self.product_quantity = product_quantity
@@ -9,15 +15,34 @@ class Product:
         self.category_ids = category_ids or []
         self.image_ids = image_ids or []
 
+    @classmethod
+    def from_row(cls, row, compact_id=False):
+        # Fast path for (Product_Id, Product_Name, Product_Description, Product_Quantity, Product_Price) rows
+        self = cls.__new__(cls)
+        self._product_id, self.product_name, self.product_description, self.product_quantity, self.product_price = row
+        if compact_id:
+            self._product_id = _uuid_bytes(self._product_id)
+        # Shared empty tuples until something is added; see _list()
+        self.supplier_ids = self.category_ids = self.image_ids = ()
+        return self
+
+    def _list(self, attr):
+        ids = getattr(self, attr)
+        if ids.__class__ is not list:
+            ids = list(ids)
+            setattr(self, attr, ids)
+        return ids
+
+    @property
+    def product_id(self):
+        return _uuid_str(self._product_id)
+
+    @product_id.setter
+    def product_id(self, id):
+        self._product_id = id
+
     def isUUID(self,id):
-        UUID_Check = re.compile(
-            r'^[0-9a-fA-F]{8}-'
-            r'[0-9a-fA-F]{4}-'
-            r'[1-5][0-9a-fA-F]{3}-'
-            r'[89ABab][0-9a-fA-F]{3}-'
-            r'[0-9a-fA-F]{12}$'
-        )
-        return bool(UUID_Check.fullmatch(id))
+        return bool(UUID_RX.fullmatch(id or ""))
 
     def set_product_id(self,id):
         # Id must be a UUID
@@ -54,24 +79,38 @@ class Product:
         self.product_price = price
     
     def add_supplier(self, supplier_id):
-        self.supplier_ids.append(supplier_id)
+        self._list("supplier_ids").append(supplier_id)
     
     def remove_supplier(self, supplier_id):
-        self.supplier_ids.remove(supplier_id)
+        self._list("supplier_ids").remove(supplier_id)
 
     def add_category(self, category_id):
-        self.category_ids.append(category_id)
+        self._list("category_ids").append(category_id)
 
     def remove_category(self, category_id):
-        self.category_ids.remove(category_id)
+        self._list("category_ids").remove(category_id)
 
     def add_image(self, image_id):
-        self.image_ids.append(image_id)
+        self._list("image_ids").append(image_id)
 
     def remove_image(self, image_id):
-        self.image_ids.remove(image_id)
+        self._list("image_ids").remove(image_id)
+
+    def to_dict(self):
+        return {
+            "product_id": self.product_id,
+            "product_name": self.product_name,
+            "product_description": self.product_description,
+            "product_quantity": self.product_quantity,
+            "product_price": self.product_price,
+            "supplier_ids": list(self.supplier_ids),
+            "category_ids": list(self.category_ids),
+            "image_ids": list(self.image_ids),
+        }
 
     def __str__(self):
         return f"Product: Id='{self.product_id}', Name='{self.product_name}', Description='{self.product_description}', Quantity='{self.product_quantity}', Price='{self.product_price}' "
 
-    
\ No newline at end of file
+def row_factory(cursor, row):
+    """sqlite3 row_factory for SELECTs of the five Products columns."""
+    return Product.from_row(row)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+import sqlite3
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+
+from product import Product
+from category import Category
+from image import Image
+from supplier import Supplier
+
+# Read APIs. Every iterator pages through its table by primary key
+# (WHERE key > last ORDER BY key LIMIT batch_size), so memory stays at one
+# batch and no cursor is held open between batches.
+
+PRODUCT_COLUMNS = ("Product_Id", "Product_Name", "Product_Description", "Product_Quantity", "Product_Price")
+SUPPLIER_COLUMNS = ("Supplier_Id", "Supplier_Name", "Supplier_Contact")
+CATEGORY_COLUMNS = ("Category_Id", "Category_Name", "Category_Description")
+IMAGE_COLUMNS = ("Image_Id", "Product_Id", "Image_URL")
+
+def _prefix_pattern(prefix: str) -> str:
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+def _iter_keyset(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    where: List[str],
+    args: List[Any],
+    batch_size: int,
+    model: Optional[Callable[[tuple], Any]] = None,
+    key: Optional[str] = None,
+) -> Iterator[Any]:
+    if batch_size <= 0:
+        raise ValueError("batch_size must be > 0")
+    key = key or columns[0]
+    names = [c.rsplit(".", 1)[-1].lower() for c in columns]
+    filters = "".join(f" AND {w}" for w in where)
+    sql = (
+        f"SELECT {', '.join(columns)} FROM {table} "
+        f"WHERE {key} > ?{filters} ORDER BY {key} LIMIT ?"
+    )
+    last = ""
+    while True:
+        rows = conn.execute(sql, [last, *args, batch_size]).fetchall()
+        if model is not None:
+            yield from map(model, rows)
+        else:
+            for row in rows:
+                yield dict(zip(names, row))
+        if len(rows) < batch_size:
+            return
+        last = rows[-1][0]
+
+def iter_products(
+    conn: sqlite3.Connection,
+    name_prefix: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_quantity: Optional[int] = None,
+    max_quantity: Optional[int] = None,
+    batch_size: int = 1000,
+    as_models: bool = False,
+) -> Iterator[Any]:
+    """Yield products in Product_Id order as dicts, or Product objects (without
+    link ids) when as_models is set. Price and quantity bounds are inclusive."""
+    where: List[str] = []
+    args: List[Any] = []
+    if name_prefix:
+        where.append("Product_Name LIKE ? ESCAPE '\\'")
+        args.append(_prefix_pattern(name_prefix))
+    for cond, value in (
+        ("Product_Price >= ?", min_price),
+        ("Product_Price <= ?", max_price),
+        ("Product_Quantity >= ?", min_quantity),
+        ("Product_Quantity <= ?", max_quantity),
+    ):
+        if value is not None:
+            where.append(cond)
+            args.append(value)
+    return _iter_keyset(conn, "Products", PRODUCT_COLUMNS, where, args, batch_size,
+                        Product.from_row if as_models else None)
+
+def iter_suppliers(
+    conn: sqlite3.Connection, name_prefix: Optional[str] = None, batch_size: int = 1000,
+    as_models: bool = False,
+) -> Iterator[Any]:
+    """Yield suppliers in Supplier_Id order (without their product ids)."""
+    where: List[str] = []
+    args: List[Any] = []
+    if name_prefix:
+        where.append("Supplier_Name LIKE ? ESCAPE '\\'")
+        args.append(_prefix_pattern(name_prefix))
+    return _iter_keyset(conn, "Suppliers", SUPPLIER_COLUMNS, where, args, batch_size,
+                        (lambda row: Supplier(*row)) if as_models else None)
+
+def iter_categories(
+    conn: sqlite3.Connection, name_prefix: Optional[str] = None, batch_size: int = 1000,
+    as_models: bool = False,
+) -> Iterator[Any]:
+    """Yield categories in Category_Id order (without their product ids)."""
+    where: List[str] = []
+    args: List[Any] = []
+    if name_prefix:
+        where.append("Category_Name LIKE ? ESCAPE '\\'")
+        args.append(_prefix_pattern(name_prefix))
+    return _iter_keyset(conn, "Category", CATEGORY_COLUMNS, where, args, batch_size,
+                        Category.from_row if as_models else None)
+
+def iter_images(
+    conn: sqlite3.Connection, product_id: Optional[str] = None, batch_size: int = 1000,
+    as_models: bool = False,
+) -> Iterator[Any]:
+    """Yield images in Image_Id order, optionally only those of one product."""
+    where: List[str] = []
+    args: List[Any] = []
+    if product_id:
+        where.append("Product_Id = ?")
+        args.append(product_id)
+    return _iter_keyset(conn, "Images", IMAGE_COLUMNS, where, args, batch_size,
+                        Image.from_row if as_models else None)
+
+# Reverse lookups. Each walks an index on the owning id (see schema.LINK_TABLES
+# and schema.INDEXES), so a call costs O(matches) whatever the table size.
+def _iter_linked_products(
+    conn: sqlite3.Connection, link_table: str, column: str, value: str, batch_size: int, as_models: bool,
+) -> Iterator[Any]:
+    return _iter_keyset(
+        conn,
+        f"{link_table} l JOIN Products p ON p.Product_Id = l.Product_Id",
+        [f"p.{c}" for c in PRODUCT_COLUMNS],
+        [f"l.{column} = ?"],
+        [value],
+        batch_size,
+        Product.from_row if as_models else None,
+        key="l.Product_Id",
+    )
+
+def products_for_supplier(
+    conn: sqlite3.Connection, supplier_id: str, batch_size: int = 1000, as_models: bool = False,
+) -> Iterator[Any]:
+    """Yield the products linked to supplier_id, in Product_Id order."""
+    return _iter_linked_products(conn, "Product_Supplier", "Supplier_Id", supplier_id, batch_size, as_models)
+
+def products_in_category(
+    conn: sqlite3.Connection, category_id: str, batch_size: int = 1000, as_models: bool = False,
+) -> Iterator[Any]:
+    """Yield the products linked to category_id, in Product_Id order."""
+    return _iter_linked_products(conn, "Product_Category", "Category_Id", category_id, batch_size, as_models)
+
+def images_for_product(
+    conn: sqlite3.Connection, product_id: str, batch_size: int = 1000, as_models: bool = False,
+) -> Iterator[Any]:
+    """Yield the images of product_id, in Image_Id order."""
+    if not product_id:
+        raise ValueError("product_id is required")
+    return iter_images(conn, product_id, batch_size, as_models)
@@ -0,0 +1,449 @@
+from __future__ import annotations
+import sqlite3, uuid
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from product import Product
+from category import Category
+from image import Image
+from supplier import (
+    Supplier, _require_uuid, _require_email,
+    create_supplier, read_supplier, update_supplier, delete_supplier,
+    _supplier_product_ids, _require_all_exist,
+)
+from cache import cached, invalidate
+from cascade import _delete_products
+
+Params = Dict[str, Any]
+
+# Validation
+def _require_text(value: Any, label: str, max_len: int) -> str:
+    if not isinstance(value, str) or not value or len(value) > max_len:
+        raise ValueError(f"{label} is required and must be ≤ {max_len} chars")
+    return value
+
+def _optional_text(value: Any, label: str, max_len: int) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str) or len(value) > max_len:
+        raise ValueError(f"{label} must be ≤ {max_len} chars")
+    return value
+
+def _quantity(value: Any) -> int:
+    try:
+        quantity = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("product_quantity must be an integer")
+    if quantity < 0:
+        raise ValueError("product_quantity must be >= 0")
+    return quantity
+
+def _price(value: Any) -> float:
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("product_price must be a float")
+    if price <= 0:
+        raise ValueError("product_price must be > 0")
+    return price
+
+class _Repository:
+    """CRUD for one table. Subclasses describe the table; SQL is built once per class.
+
+    Single-row methods and each *_many batch run in one transaction (`with conn:`).
+    exists() and read() go through the entity cache (cache.py); every write
+    invalidates the rows it touches.
+    """
+
+    table = ""
+    key = ""        # primary key column
+    label = ""      # used in KeyError messages
+    # attribute name -> (column, validator). Validators raise ValueError.
+    fields: Dict[str, Tuple[str, Any]] = {}
+    required: Tuple[str, ...] = ()
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    # SQL, built once and reused so sqlite3's statement cache always hits
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _insert_sql(cls) -> str:
+        cols = [cls.key] + [col for col, _ in cls.fields.values()]
+        return f"INSERT INTO {cls.table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _select_sql(cls) -> str:
+        cols = [cls.key] + [col for col, _ in cls.fields.values()]
+        return f"SELECT {', '.join(cols)} FROM {cls.table} WHERE {cls.key} = ?"
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _update_sql(cls, attrs: Tuple[str, ...]) -> str:
+        sets = ", ".join(f"{cls.fields[a][0]} = ?" for a in attrs)
+        return f"UPDATE {cls.table} SET {sets} WHERE {cls.key} = ?"
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _delete_sql(cls) -> str:
+        return f"DELETE FROM {cls.table} WHERE {cls.key} = ?"
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _exists_sql(cls) -> str:
+        return f"SELECT 1 FROM {cls.table} WHERE {cls.key} = ? LIMIT 1"
+
+    # Validation
+    def _values(self, values: Params, partial: bool) -> Dict[str, Any]:
+        unknown = set(values) - set(self.fields) - set(self._link_fields())
+        if unknown:
+            raise ValueError(f"unknown field(s): {', '.join(sorted(unknown))}")
+        out: Dict[str, Any] = {}
+        for attr, (_, check) in self.fields.items():
+            if attr in values:
+                out[attr] = check(values[attr])
+            elif not partial:
+                # Required fields raise their own "required" error here
+                out[attr] = check(None) if attr in self.required else None
+        return out
+
+    def _link_fields(self) -> Tuple[str, ...]:
+        return ()
+
+    def _new_id(self, values: Params) -> str:
+        rid = values.pop(self.key.lower(), None) or str(uuid.uuid4())
+        _require_uuid(rid, self.key.lower())
+        return rid
+
+    # Hooks for subclasses with link tables
+    def _write_links(self, rid: str, values: Params, replace: bool) -> None:
+        pass
+
+    def _links(self, rid: str) -> Tuple[Tuple[str, ...], ...]:
+        """Link id tuples passed to _to_model after the row."""
+        return ()
+
+    def _to_model(self, row: tuple, *links: Tuple[str, ...]) -> Any:
+        raise NotImplementedError
+
+    def _invalidate(self, ids: List[str]) -> None:
+        """Drop cached state for ids. Writes call it before and after changing them."""
+        invalidate(self.conn, self.table, ids)
+
+    def _load(self, rid: str) -> Optional[tuple]:
+        # Immutable state for the cache: (row, *links), or None if missing
+        row = self.conn.execute(self._select_sql(), (rid,)).fetchone()
+        return None if row is None else (row, *self._links(rid))
+
+    def exists(self, rid: str) -> bool:
+        return cached(self.conn, (self.table, rid, "exists"),
+                      lambda: self.conn.execute(self._exists_sql(), (rid,)).fetchone() is not None)
+
+    def _require_exists(self, rid: str) -> None:
+        if not self.exists(rid):
+            raise KeyError(f"{self.label} {rid} not found")
+
+    # Single-row API
+    def create(self, **values: Any) -> str:
+        return self.create_many([values])[0]
+
+    def read(self, rid: str) -> Any:
+        state = cached(self.conn, (self.table, rid, "read"), lambda: self._load(rid))
+        if state is None:
+            raise KeyError(f"{self.label} {rid} not found")
+        return self._to_model(*state)
+
+    def update(self, rid: str, **values: Any) -> None:
+        self.update_many([(rid, values)])
+
+    def delete(self, rid: str) -> None:
+        if self.delete_many([rid]) == 0:
+            raise KeyError(f"{self.label} {rid} not found")
+
+    # Batch API: each call is one transaction; any invalid row aborts the whole batch
+    def create_many(self, rows: Iterable[Params]) -> List[str]:
+        prepared: List[Tuple[str, Dict[str, Any], Params]] = []
+        for row in rows:
+            row = dict(row)
+            rid = self._new_id(row)
+            prepared.append((rid, self._values(row, partial=False), row))
+        ids = [rid for rid, _, _ in prepared]
+        with self.conn:
+            self.conn.executemany(
+                self._insert_sql(),
+                ([rid, *(vals[a] for a in self.fields)] for rid, vals, _ in prepared),
+            )
+            for rid, _, row in prepared:
+                self._write_links(rid, row, replace=False)
+            self._invalidate(ids)
+        return ids
+
+    def update_many(self, updates: Iterable[Tuple[str, Params]]) -> int:
+        """Apply (id, {field: value}) updates. Raises KeyError, and changes nothing, if any id is missing."""
+        groups: Dict[Tuple[str, ...], List[list]] = {}
+        links: List[Tuple[str, Params]] = []
+        ids: List[str] = []
+        for rid, values in updates:
+            vals = self._values(values, partial=True)
+            ids.append(rid)
+            if vals:
+                attrs = tuple(vals)
+                groups.setdefault(attrs, []).append([*vals.values(), rid])
+            if any(f in values for f in self._link_fields()):
+                links.append((rid, values))
+        with self.conn:
+            unique = list(dict.fromkeys(ids))
+            missing = [rid for rid in unique if not self.exists(rid)]
+            if missing:
+                raise KeyError(f"{self.label} {missing[0]} not found")
+            self._invalidate(unique)
+            for attrs, params in groups.items():
+                self.conn.executemany(self._update_sql(attrs), params)
+            for rid, values in links:
+                self._write_links(rid, values, replace=True)
+            self._invalidate(unique)
+        return len(ids)
+
+    def delete_many(self, ids: Iterable[str]) -> int:
+        """Delete rows by id in one transaction; returns how many existed."""
+        ids = list(dict.fromkeys(ids))
+        with self.conn:
+            self._invalidate(ids)
+            deleted = self._delete_many(ids)
+            self._invalidate(ids)
+        return deleted
+
+    def _delete_many(self, ids: List[str]) -> int:
+        return self.conn.executemany(self._delete_sql(), ((rid,) for rid in ids)).rowcount
+
+class ProductRepository(_Repository):
+    table = "Products"
+    key = "Product_Id"
+    label = "Product"
+    fields = {
+        "product_name": ("Product_Name", lambda v: _require_text(v, "product_name", 2000)),
+        "product_description": ("Product_Description", lambda v: _optional_text(v, "product_description", 10000)),
+        "product_quantity": ("Product_Quantity", _quantity),
+        "product_price": ("Product_Price", _price),
+    }
+    required = ("product_name", "product_quantity", "product_price")
+
+    def _link_fields(self) -> Tuple[str, ...]:
+        return ("supplier_ids", "category_ids")
+
+    def _write_links(self, rid: str, values: Params, replace: bool) -> None:
+        for attr, link_table, col, target in (
+            ("supplier_ids", "Product_Supplier", "Supplier_Id", SupplierRepository),
+            ("category_ids", "Product_Category", "Category_Id", CategoryRepository),
+        ):
+            if attr not in values:
+                continue
+            ids = list(dict.fromkeys(values[attr] or []))
+            targets = target(self.conn)
+            for tid in ids:
+                targets._require_exists(tid)
+            touched = list(ids)
+            if replace:
+                touched += [r[0] for r in self.conn.execute(
+                    f"DELETE FROM {link_table} WHERE Product_Id = ? RETURNING {col}", (rid,)
+                ).fetchall()]
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO {link_table} (Product_Id, {col}) VALUES (?, ?)",
+                ((rid, tid) for tid in ids),
+            )
+            invalidate(self.conn, target.table, touched)
+
+    def _links(self, rid: str) -> Tuple[Tuple[str, ...], ...]:
+        cur = self.conn.cursor()
+        return (
+            tuple(r[0] for r in cur.execute("SELECT Supplier_Id FROM Product_Supplier WHERE Product_Id = ?", (rid,))),
+            tuple(r[0] for r in cur.execute("SELECT Category_Id FROM Product_Category WHERE Product_Id = ?", (rid,))),
+            tuple(r[0] for r in cur.execute("SELECT Image_Id FROM Images WHERE Product_Id = ?", (rid,))),
+        )
+
+    def _to_model(self, row: tuple, supplier_ids: Tuple[str, ...] = (), category_ids: Tuple[str, ...] = (),
+                  image_ids: Tuple[str, ...] = ()) -> Product:
+        p = Product.from_row(row)
+        p.supplier_ids = list(supplier_ids)
+        p.category_ids = list(category_ids)
+        p.image_ids = list(image_ids)
+        return p
+
+    def _delete_many(self, ids: List[str]) -> int:
+        # Deleted products take their links and images with them, and any
+        # category they leave empty is deleted too (as in delete_supplier).
+        return _delete_products(self.conn, ids, drop_empty_categories=True)
+
+class CategoryRepository(_Repository):
+    table = "Category"
+    key = "Category_Id"
+    label = "Category"
+    fields = {
+        "category_name": ("Category_Name", lambda v: _require_text(v, "category_name", 2000)),
+        "category_description": ("Category_Description", lambda v: _optional_text(v, "category_description", 10000)),
+    }
+    required = ("category_name",)
+
+    def _link_fields(self) -> Tuple[str, ...]:
+        return ("product_ids",)
+
+    def _write_links(self, rid: str, values: Params, replace: bool) -> None:
+        if "product_ids" not in values:
+            return
+        ids = list(dict.fromkeys(values["product_ids"] or []))
+        products = ProductRepository(self.conn)
+        for pid in ids:
+            products._require_exists(pid)
+        touched = list(ids)
+        if replace:
+            touched += [r[0] for r in self.conn.execute(
+                "DELETE FROM Product_Category WHERE Category_Id = ? RETURNING Product_Id", (rid,)
+            ).fetchall()]
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO Product_Category (Product_Id, Category_Id) VALUES (?, ?)",
+            ((pid, rid) for pid in ids),
+        )
+        invalidate(self.conn, ProductRepository.table, touched)
+
+    def _links(self, rid: str) -> Tuple[Tuple[str, ...], ...]:
+        return (tuple(r[0] for r in self.conn.execute(
+            "SELECT Product_Id FROM Product_Category WHERE Category_Id = ?", (rid,)
+        )),)
+
+    def _to_model(self, row: tuple, product_ids: Tuple[str, ...] = ()) -> Category:
+        c = Category.from_row(row)
+        c.product_ids = list(product_ids)
+        return c
+
+    def _delete_many(self, ids: List[str]) -> int:
+        unlinked: List[str] = []
+        for cid in ids:
+            unlinked += [r[0] for r in self.conn.execute(
+                "DELETE FROM Product_Category WHERE Category_Id = ? RETURNING Product_Id", (cid,)
+            ).fetchall()]
+        invalidate(self.conn, ProductRepository.table, unlinked)
+        return self.conn.executemany(self._delete_sql(), ((cid,) for cid in ids)).rowcount
+
+    def add_product(self, category_id: str, product_id: str) -> None:
+        with self.conn:
+            self._require_exists(category_id)
+            ProductRepository(self.conn)._require_exists(product_id)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO Product_Category (Product_Id, Category_Id) VALUES (?, ?)",
+                (product_id, category_id),
+            )
+            self._invalidate_link(category_id, product_id)
+
+    def remove_product(self, category_id: str, product_id: str) -> None:
+        with self.conn:
+            self._require_exists(category_id)
+            self.conn.execute(
+                "DELETE FROM Product_Category WHERE Product_Id = ? AND Category_Id = ?",
+                (product_id, category_id),
+            )
+            self._invalidate_link(category_id, product_id)
+
+    def link_many(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Link every (category_id, product_id) pair. Returns the number of new links.
+
+        All ids are checked first; a missing one raises and nothing is linked.
+        """
+        links = sorted({(cid, pid) for cid, pid in pairs}, key=lambda p: (p[1], p[0]))
+        with self.conn:
+            _require_all_exist(self.conn, links, self.table, self.key, self.label)
+            added = self.conn.executemany(
+                "INSERT OR IGNORE INTO Product_Category (Product_Id, Category_Id) VALUES (?, ?)",
+                ((pid, cid) for cid, pid in links),
+            ).rowcount if links else 0
+            self._invalidate_links(links)
+        return added
+
+    def unlink_many(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Remove every (category_id, product_id) link. Returns the number removed.
+
+        Like remove_product, only the categories have to exist.
+        """
+        links = sorted({(cid, pid) for cid, pid in pairs}, key=lambda p: (p[1], p[0]))
+        with self.conn:
+            _require_all_exist(self.conn, links, self.table, self.key, self.label, products=False)
+            removed = self.conn.executemany(
+                "DELETE FROM Product_Category WHERE Product_Id = ? AND Category_Id = ?",
+                ((pid, cid) for cid, pid in links),
+            ).rowcount if links else 0
+            self._invalidate_links(links)
+        return removed
+
+    def _invalidate_link(self, category_id: str, product_id: str) -> None:
+        self._invalidate([category_id])
+        invalidate(self.conn, ProductRepository.table, [product_id])
+
+    def _invalidate_links(self, links: List[Tuple[str, str]]) -> None:
+        self._invalidate(list({cid for cid, _ in links}))
+        invalidate(self.conn, ProductRepository.table, list({pid for _, pid in links}))
+
+class ImageRepository(_Repository):
+    table = "Images"
+    key = "Image_Id"
+    label = "Image"
+    fields = {
+        "product_id": ("Product_Id", lambda v: (_require_uuid(v, "product_id"), v)[1]),
+        "image_url": ("Image_URL", lambda v: _require_text(v, "image_url", 10000)),
+    }
+    required = ("product_id", "image_url")
+
+    def _values(self, values: Params, partial: bool) -> Dict[str, Any]:
+        out = super()._values(values, partial)
+        if out.get("product_id") is not None:
+            ProductRepository(self.conn)._require_exists(out["product_id"])
+        return out
+
+    def _to_model(self, row: tuple) -> Image:
+        return Image.from_row(row)
+
+    def _invalidate(self, ids: List[str]) -> None:
+        # Product reads list their image ids
+        super()._invalidate(ids)
+        invalidate(self.conn, ProductRepository.table, [
+            r[0] for rid in ids
+            for r in self.conn.execute("SELECT Product_Id FROM Images WHERE Image_Id = ?", (rid,))
+        ])
+
+class SupplierRepository(_Repository):
+    """Batch variants for suppliers; single-row calls go through supplier.py."""
+
+    table = "Suppliers"
+    key = "Supplier_Id"
+    label = "Supplier"
+    fields = {
+        "supplier_name": ("Supplier_Name", lambda v: _require_text(v, "supplier_name", 2000)),
+        "supplier_contact": ("Supplier_Contact", lambda v: (_require_email(v), v)[1]),
+    }
+    required = ("supplier_name", "supplier_contact")
+
+    def create(self, **values: Any) -> str:
+        return create_supplier(self.conn, values.get("supplier_name"), values.get("supplier_contact"), values.get("supplier_id"))
+
+    def read(self, rid: str) -> Supplier:
+        return read_supplier(self.conn, rid)
+
+    def update(self, rid: str, **values: Any) -> None:
+        update_supplier(self.conn, rid, **values)
+
+    def delete(self, rid: str) -> None:
+        delete_supplier(self.conn, rid)
+
+    def _links(self, rid: str) -> Tuple[Tuple[str, ...], ...]:
+        return (tuple(_supplier_product_ids(self.conn.cursor(), rid)),)
+
+    def _to_model(self, row: tuple, product_ids: Tuple[str, ...] = ()) -> Supplier:
+        return Supplier(*row, product_ids=list(product_ids))
+
+    def _delete_many(self, ids: List[str]) -> int:
+        # Same cascade as delete_supplier: every linked product goes too,
+        # and so does any category those products leave empty.
+        product_ids: List[str] = []
+        for sid in ids:
+            product_ids.extend(_supplier_product_ids(self.conn.cursor(), sid))
+        _delete_products(self.conn, product_ids, drop_empty_categories=True)
+        return super()._delete_many(ids)
@@ -0,0 +1,664 @@
+from __future__ import annotations
+import argparse, os, sqlite3, sys, time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import db
+from supplier import _load_json_list, _dump_json_list, _is_uuid, _uuid_bytes
+
+# Bumped whenever a migration is added below. Stored in PRAGMA user_version.
+SCHEMA_VERSION = 7
+
+# Id column types. Text ids default to a random version-4 UUID string so
+# rows inserted without an id still pass _is_uuid. Binary ids (16-byte
+# blobs, see db.BinaryIdConnection) are always supplied by the caller.
+_UUID4_SQL = (
+    "lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2))) || '-4' || "
+    "substr(lower(hex(randomblob(2))), 2) || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) || "
+    "substr(lower(hex(randomblob(2))), 2) || '-' || lower(hex(randomblob(6)))"
+)
+ID_TYPES = {
+    False: {"pk": f"TEXT PRIMARY KEY DEFAULT ({_UUID4_SQL})", "ref": "TEXT NOT NULL"},
+    True: {"pk": "UUID BLOB NOT NULL PRIMARY KEY", "ref": "UUID BLOB NOT NULL"},
+}
+
+# Base tables ({pk}/{ref} are filled from ID_TYPES)
+TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS Products (
+        Product_Id {pk},
+        Product_Name TEXT NOT NULL,
+        Product_Description TEXT,
+        Product_Quantity INTEGER NOT NULL CHECK (Product_Quantity >= 0),
+        Product_Price REAL NOT NULL CHECK (Product_Price > 0),
+        Supplier_Ids TEXT DEFAULT '[]',   -- legacy JSON array, see Product_Supplier
+        Category_Ids TEXT DEFAULT '[]',   -- legacy JSON array, see Product_Category
+        Image_Ids TEXT DEFAULT '[]'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Suppliers (
+        Supplier_Id {pk},
+        Supplier_Name TEXT NOT NULL,
+        Supplier_Contact TEXT NOT NULL,
+        Product_Ids TEXT DEFAULT '[]'  -- legacy JSON array, see Product_Supplier
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Category (
+        Category_Id {pk},
+        Category_Name TEXT NOT NULL,
+        Category_Description TEXT,
+        Product_Ids TEXT  -- legacy JSON array, see Product_Category
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Images (
+        Image_Id {pk},
+        Product_Id {ref},
+        Image_URL TEXT NOT NULL
+    )
+    """,
+)
+
+# Link tables. The primary key answers "suppliers/categories of a product",
+# the secondary index answers the reverse direction.
+LINK_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS Product_Supplier (
+        Product_Id {ref},
+        Supplier_Id {ref},
+        PRIMARY KEY (Product_Id, Supplier_Id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_product_supplier_supplier ON Product_Supplier (Supplier_Id, Product_Id)",
+    """
+    CREATE TABLE IF NOT EXISTS Product_Category (
+        Product_Id {ref},
+        Category_Id {ref},
+        PRIMARY KEY (Product_Id, Category_Id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_product_category_category ON Product_Category (Category_Id, Product_Id)",
+)
+
+# (Product_Id, Image_Id) lists a product's images in id order straight from
+# the index, so keyset pages over one product never touch other rows.
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_images_product_image ON Images (Product_Id, Image_Id)",
+)
+
+def _parse_id_list(s: Optional[str]) -> List[str]:
+    """Decode a legacy link column: a JSON array, or the comma-separated text the old CLI wrote."""
+    if not s:
+        return []
+    lst = _load_json_list(s)
+    if lst or s.strip().startswith("["):
+        return [str(x) for x in lst]
+    return [p.strip() for p in s.split(",") if p.strip()]
+
+# JSON link columns -> Product_Supplier / Product_Category, as backfills
+# (see run_backfills): each chunk links the ids its rows list, where both
+# sides exist, then clears the rows' JSON.
+_LINK_INSERTS = {
+    "Product_Supplier": (
+        "INSERT OR IGNORE INTO Product_Supplier (Product_Id, Supplier_Id) SELECT ?1, ?2 "
+        "WHERE EXISTS (SELECT 1 FROM Products WHERE Product_Id = ?1) "
+        "AND EXISTS (SELECT 1 FROM Suppliers WHERE Supplier_Id = ?2)"
+    ),
+    "Product_Category": (
+        "INSERT OR IGNORE INTO Product_Category (Product_Id, Category_Id) SELECT ?1, ?2 "
+        "WHERE EXISTS (SELECT 1 FROM Products WHERE Product_Id = ?1) "
+        "AND EXISTS (SELECT 1 FROM Category WHERE Category_Id = ?2)"
+    ),
+}
+
+def _backfill_product_links(conn: sqlite3.Connection, rows: List[tuple]) -> None:
+    ps: List[Tuple[str, str]] = []
+    pc: List[Tuple[str, str]] = []
+    for _, pid, s_json, c_json in rows:
+        ps.extend((pid, sid) for sid in _parse_id_list(s_json))
+        pc.extend((pid, cid) for cid in _parse_id_list(c_json))
+    conn.executemany(_LINK_INSERTS["Product_Supplier"], ps)
+    conn.executemany(_LINK_INSERTS["Product_Category"], pc)
+    empty = _dump_json_list([])
+    conn.execute(
+        "UPDATE Products SET Supplier_Ids = ?1, Category_Ids = ?1 WHERE rowid BETWEEN ?2 AND ?3 "
+        "AND (Supplier_Ids IS NOT ?1 OR Category_Ids IS NOT ?1)",
+        (empty, rows[0][0], rows[-1][0]),
+    )
+
+def _backfill_linked_products(table: str, link_table: str) -> Callable[[sqlite3.Connection, List[tuple]], None]:
+    def step(conn: sqlite3.Connection, rows: List[tuple]) -> None:
+        conn.executemany(_LINK_INSERTS[link_table],
+                         [(pid, rid) for _, rid, p_json in rows for pid in _parse_id_list(p_json)])
+        empty = _dump_json_list([])
+        conn.execute(
+            f"UPDATE {table} SET Product_Ids = ?1 WHERE rowid BETWEEN ?2 AND ?3 AND Product_Ids IS NOT ?1",
+            (empty, rows[0][0], rows[-1][0]),
+        )
+    return step
+
+def _migrate_json_links(conn: sqlite3.Connection) -> None:
+    """Queue the move of the JSON link columns into Product_Supplier / Product_Category."""
+    for name in ("json_links_products", "json_links_suppliers", "json_links_categories"):
+        start_backfill(conn, name)
+
+# Full-text index over product names and descriptions. External content:
+# the text lives only in Products; triggers keep the index in step and only
+# fire when the indexed columns change.
+PRODUCT_SEARCH = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS Products_FTS USING fts5(
+        Product_Name, Product_Description,
+        content = 'Products', content_rowid = 'rowid',
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON Products BEGIN
+        INSERT INTO Products_FTS (rowid, Product_Name, Product_Description)
+        VALUES (new.rowid, new.Product_Name, new.Product_Description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON Products BEGIN
+        INSERT INTO Products_FTS (Products_FTS, rowid, Product_Name, Product_Description)
+        VALUES ('delete', old.rowid, old.Product_Name, old.Product_Description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF Product_Name, Product_Description ON Products BEGIN
+        INSERT INTO Products_FTS (Products_FTS, rowid, Product_Name, Product_Description)
+        VALUES ('delete', old.rowid, old.Product_Name, old.Product_Description);
+        INSERT INTO Products_FTS (rowid, Product_Name, Product_Description)
+        VALUES (new.rowid, new.Product_Name, new.Product_Description);
+    END
+    """,
+)
+
+def _add_product_search(conn: sqlite3.Connection) -> None:
+    """Create the product search index and fill it from the existing rows."""
+    for ddl in PRODUCT_SEARCH:
+        conn.execute(ddl)
+    conn.execute("INSERT INTO Products_FTS (Products_FTS) VALUES ('rebuild')")
+
+def _replace_images_index(conn: sqlite3.Connection) -> None:
+    """Drop the single-column Images index; idx_images_product_image covers it."""
+    conn.execute("DROP INDEX IF EXISTS idx_images_product")
+    conn.execute("ANALYZE Images")
+
+# Product detail read model: one row per product with its supplier names,
+# category names and image URLs as JSON arrays, so a catalogue page is one
+# primary-key lookup. Triggers on every table it draws from recompute just
+# the affected part of the affected rows; a section update for a product
+# that is already gone matches no row and costs nothing.
+def _id_text(col: str, binary: bool) -> str:
+    """SQL for an id column as its UUID string (JSON can't hold blobs)."""
+    if not binary:
+        return col
+    h = f"lower(hex({col}))"
+    return (
+        f"CASE WHEN typeof({col}) = 'blob' THEN substr({h}, 1, 8) || '-' || substr({h}, 9, 4) || '-' || "
+        f"substr({h}, 13, 4) || '-' || substr({h}, 17, 4) || '-' || substr({h}, 21) ELSE {col} END"
+    )
+
+def _detail_sections(pid: str, binary: bool) -> Dict[str, str]:
+    """Column -> SQL computing it for the product whose id is the expression pid."""
+    return {
+        "Suppliers": (
+            "(SELECT json_group_array(json_object('supplier_id', id, 'supplier_name', name)) FROM ("
+            f"SELECT {_id_text('s.Supplier_Id', binary)} AS id, s.Supplier_Name AS name "
+            "FROM Product_Supplier l JOIN Suppliers s ON s.Supplier_Id = l.Supplier_Id "
+            f"WHERE l.Product_Id = {pid} ORDER BY s.Supplier_Name))"
+        ),
+        "Categories": (
+            "(SELECT json_group_array(json_object('category_id', id, 'category_name', name)) FROM ("
+            f"SELECT {_id_text('c.Category_Id', binary)} AS id, c.Category_Name AS name "
+            "FROM Product_Category l JOIN Category c ON c.Category_Id = l.Category_Id "
+            f"WHERE l.Product_Id = {pid} ORDER BY c.Category_Name))"
+        ),
+        "Images": (
+            "(SELECT json_group_array(json_object('image_id', id, 'image_url', url)) FROM ("
+            f"SELECT {_id_text('i.Image_Id', binary)} AS id, i.Image_URL AS url "
+            f"FROM Images i WHERE i.Product_Id = {pid} ORDER BY i.Image_Id))"
+        ),
+    }
+
+DETAIL_PRODUCT_COLUMNS = ("Product_Name", "Product_Description", "Product_Quantity", "Product_Price")
+
+def product_detail_select(binary: bool, where: str = "") -> str:
+    """SELECT producing Product_Detail rows from the base tables."""
+    sections = _detail_sections("p.Product_Id", binary)
+    return (
+        f"SELECT p.Product_Id, {', '.join('p.' + c for c in DETAIL_PRODUCT_COLUMNS)}, "
+        f"{', '.join(sections.values())} FROM Products p {where}"
+    )
+
+def _product_detail_ddl(binary: bool) -> List[str]:
+    ref = ID_TYPES[binary]["ref"]
+    insert = f"INSERT OR REPLACE INTO Product_Detail {product_detail_select(binary, 'WHERE p.Product_Id = new.Product_Id')};"
+
+    def refresh(section: str, where: str) -> str:
+        return (f"UPDATE Product_Detail SET {section} = {_detail_sections('Product_Detail.Product_Id', binary)[section]} "
+                f"WHERE {where};")
+
+    def linked(link_table: str, col: str, value: str) -> str:
+        return f"Product_Id IN (SELECT Product_Id FROM {link_table} WHERE {col} = {value})"
+
+    def trigger(name: str, event: str, body: str) -> str:
+        return f"CREATE TRIGGER IF NOT EXISTS product_detail_{name} AFTER {event} BEGIN {body} END"
+
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS Product_Detail (
+            Product_Id {ref} PRIMARY KEY,
+            Product_Name TEXT NOT NULL,
+            Product_Description TEXT,
+            Product_Quantity INTEGER NOT NULL,
+            Product_Price REAL NOT NULL,
+            Suppliers TEXT NOT NULL DEFAULT '[]',   -- [{{supplier_id, supplier_name}}] by name
+            Categories TEXT NOT NULL DEFAULT '[]',  -- [{{category_id, category_name}}] by name
+            Images TEXT NOT NULL DEFAULT '[]'       -- [{{image_id, image_url}}] by id
+        )
+        """,
+        trigger("product_insert", "INSERT ON Products", insert),
+        trigger(
+            "product_update",
+            f"UPDATE OF {', '.join(DETAIL_PRODUCT_COLUMNS)} ON Products",
+            f"UPDATE Product_Detail SET {', '.join(f'{c} = new.{c}' for c in DETAIL_PRODUCT_COLUMNS)} "
+            "WHERE Product_Id = new.Product_Id;",
+        ),
+        trigger("product_delete", "DELETE ON Products", "DELETE FROM Product_Detail WHERE Product_Id = old.Product_Id;"),
+        trigger("supplier_link", "INSERT ON Product_Supplier", refresh("Suppliers", "Product_Id = new.Product_Id")),
+        trigger("supplier_unlink", "DELETE ON Product_Supplier", refresh("Suppliers", "Product_Id = old.Product_Id")),
+        trigger("category_link", "INSERT ON Product_Category", refresh("Categories", "Product_Id = new.Product_Id")),
+        trigger("category_unlink", "DELETE ON Product_Category", refresh("Categories", "Product_Id = old.Product_Id")),
+        trigger("image_insert", "INSERT ON Images", refresh("Images", "Product_Id = new.Product_Id")),
+        trigger("image_delete", "DELETE ON Images", refresh("Images", "Product_Id = old.Product_Id")),
+        trigger("image_update", "UPDATE OF Product_Id, Image_URL ON Images",
+                refresh("Images", "Product_Id IN (old.Product_Id, new.Product_Id)")),
+        trigger(
+            "supplier_rename", "UPDATE OF Supplier_Name ON Suppliers",
+            refresh("Suppliers", linked("Product_Supplier", "Supplier_Id", "new.Supplier_Id")),
+        ),
+        trigger(
+            "supplier_delete", "DELETE ON Suppliers",
+            refresh("Suppliers", linked("Product_Supplier", "Supplier_Id", "old.Supplier_Id")),
+        ),
+        trigger(
+            "category_rename", "UPDATE OF Category_Name ON Category",
+            refresh("Categories", linked("Product_Category", "Category_Id", "new.Category_Id")),
+        ),
+        trigger(
+            "category_delete", "DELETE ON Category",
+            refresh("Categories", linked("Product_Category", "Category_Id", "old.Category_Id")),
+        ),
+    ]
+
+def rebuild_product_details(conn: sqlite3.Connection) -> int:
+    """Recompute every Product_Detail row inside the caller's transaction. Returns the row count."""
+    conn.execute("DELETE FROM Product_Detail")
+    return conn.execute(
+        f"INSERT INTO Product_Detail {product_detail_select(getattr(conn, 'binary_ids', False))}"
+    ).rowcount
+
+def _backfill_product_details(conn: sqlite3.Connection, rows: List[tuple]) -> None:
+    conn.execute(
+        f"INSERT OR REPLACE INTO Product_Detail "
+        f"{product_detail_select(getattr(conn, 'binary_ids', False), 'WHERE p.rowid BETWEEN ? AND ?')}",
+        (rows[0][0], rows[-1][0]),
+    )
+
+def _add_product_detail(conn: sqlite3.Connection) -> None:
+    """Create the product detail read model and queue filling it.
+
+    Until the backfill reaches a product, that product has no row; the
+    triggers keep every row already written current.
+    """
+    for ddl in _product_detail_ddl(getattr(conn, "binary_ids", False)):
+        conn.execute(ddl)
+    start_backfill(conn, "product_details")
+
+# Change log: one row per insert, update, delete, link and unlink on the
+# entity tables, written by triggers so every code path is covered. Seq is
+# AUTOINCREMENT, so it only grows and is never reused after a prune. Only
+# one writer commits at a time and a rollback also rolls back the sequence,
+# so a reader that has seen Seq n will never later see a committed row with
+# Seq <= n appear. Links and unlinks are logged against the supplier or
+# category, with the product as Related_Id.
+CHANGE_ENTITIES = {
+    # table -> (entity, id column, related id column, columns whose change is an update)
+    "Products": ("product", "Product_Id", None,
+                 ("Product_Name", "Product_Description", "Product_Quantity", "Product_Price")),
+    "Suppliers": ("supplier", "Supplier_Id", None, ("Supplier_Name", "Supplier_Contact")),
+    "Category": ("category", "Category_Id", None, ("Category_Name", "Category_Description")),
+    "Images": ("image", "Image_Id", "Product_Id", ("Product_Id", "Image_URL")),
+}
+CHANGE_LINKS = {
+    # link table -> (entity, id column)
+    "Product_Supplier": ("supplier", "Supplier_Id"),
+    "Product_Category": ("category", "Category_Id"),
+}
+
+def _change_log_ddl(binary: bool) -> List[str]:
+    id_type = "UUID BLOB" if binary else "TEXT"
+
+    def log(name: str, event: str, values: str, when: str = "") -> str:
+        return (f"CREATE TRIGGER IF NOT EXISTS change_log_{name} AFTER {event} {when} BEGIN "
+                f"INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ({values}); END")
+
+    ddl = [
+        f"""
+        CREATE TABLE IF NOT EXISTS Change_Log (
+            Seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            Entity TEXT NOT NULL,   -- product | supplier | category | image
+            Op TEXT NOT NULL,       -- insert | update | delete | link | unlink
+            Entity_Id {id_type} NOT NULL,
+            Related_Id {id_type},    -- an image's product; the product linked or unlinked
+            Changed_At TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+        )
+        """,
+    ]
+    for table, (entity, key, related, columns) in CHANGE_ENTITIES.items():
+        name = table.lower()
+
+        def values(op: str, row: str) -> str:
+            return f"'{entity}', '{op}', {row}.{key}, {f'{row}.{related}' if related else 'NULL'}"
+
+        changed = " OR ".join(f"old.{c} IS NOT new.{c}" for c in columns)
+        ddl += [
+            log(f"{name}_insert", f"INSERT ON {table}", values("insert", "new")),
+            log(f"{name}_update", f"UPDATE ON {table}", values("update", "new"), f"WHEN {changed}"),
+            log(f"{name}_delete", f"DELETE ON {table}", values("delete", "old")),
+        ]
+    for table, (entity, key) in CHANGE_LINKS.items():
+        name = table.lower()
+        ddl += [
+            log(f"{name}_link", f"INSERT ON {table}", f"'{entity}', 'link', new.{key}, new.Product_Id"),
+            log(f"{name}_unlink", f"DELETE ON {table}", f"'{entity}', 'unlink', old.{key}, old.Product_Id"),
+        ]
+    return ddl
+
+def _add_change_log(conn: sqlite3.Connection) -> None:
+    """Create the change log. Rows that already exist are not logged."""
+    for ddl in _change_log_ddl(getattr(conn, "binary_ids", False)):
+        conn.execute(ddl)
+
+# Image store: one row per distinct image URL, however many Images rows
+# (products) use it, with what was last fetched from it. Content_Hash is
+# the SHA-256 of the bytes, which name the file in the blob cache (see
+# imagestore.py), so URLs serving identical bytes share one file. Rows are
+# added when a URL is first fetched.
+IMAGE_STORE = """
+    CREATE TABLE IF NOT EXISTS Image_Store (
+        Image_URL TEXT PRIMARY KEY,
+        Content_Hash TEXT,
+        Content_Type TEXT,
+        Size INTEGER,
+        Fetched_At TEXT
+    ) WITHOUT ROWID
+"""
+
+def _add_image_store(conn: sqlite3.Connection) -> None:
+    conn.execute(IMAGE_STORE)
+
+# Backfills: data rewrites too big for one transaction on a large database.
+# A migration only does the DDL and calls start_backfill(); run_backfills()
+# then walks the named table in rowid order, chunk_rows rows per write
+# transaction, and records how far it got in Schema_Backfill. Readers and
+# other writers get in between chunks, and an interrupted run resumes
+# from the last committed chunk. Rows added while a backfill runs are
+# picked up by later chunks (their rowids are higher). Don't VACUUM while a
+# backfill is pending: it can renumber rowids.
+#
+# name -> (table, columns passed to step, step(conn, [(rowid, *columns)]))
+BACKFILLS: Dict[str, Tuple[str, Tuple[str, ...], Callable[[sqlite3.Connection, List[tuple]], None]]] = {
+    "json_links_products": ("Products", ("Product_Id", "Supplier_Ids", "Category_Ids"), _backfill_product_links),
+    "json_links_suppliers": ("Suppliers", ("Supplier_Id", "Product_Ids"),
+                             _backfill_linked_products("Suppliers", "Product_Supplier")),
+    "json_links_categories": ("Category", ("Category_Id", "Product_Ids"),
+                              _backfill_linked_products("Category", "Product_Category")),
+    "product_details": ("Products", ("Product_Id",), _backfill_product_details),
+}
+BACKFILL_CHUNK_ROWS = 5000
+
+BACKFILL_TABLE = """
+    CREATE TABLE IF NOT EXISTS Schema_Backfill (
+        Name TEXT PRIMARY KEY,
+        Position INTEGER NOT NULL DEFAULT 0,  -- last rowid done
+        Done INTEGER NOT NULL DEFAULT 0,
+        Seq INTEGER NOT NULL                  -- backfills run in the order they were started
+    )
+"""
+
+def start_backfill(conn: sqlite3.Connection, name: str) -> None:
+    """Queue backfill name (a BACKFILLS key), from the start of its table."""
+    if name not in BACKFILLS:
+        raise ValueError(f"Unknown backfill {name}")
+    conn.execute(BACKFILL_TABLE)
+    conn.execute(
+        "INSERT OR REPLACE INTO Schema_Backfill (Name, Seq) "
+        "VALUES (?, (SELECT coalesce(max(Seq), 0) + 1 FROM Schema_Backfill))",
+        (name,),
+    )
+
+def pending_backfills(conn: sqlite3.Connection) -> List[str]:
+    """Names of backfills not yet finished, in the order they will run."""
+    return [r[0] for r in conn.execute("SELECT Name FROM Schema_Backfill WHERE NOT Done ORDER BY Seq")]
+
+def _backfill_chunk(conn: sqlite3.Connection, name: str, chunk_rows: int) -> int:
+    table, columns, step = BACKFILLS[name]
+    with conn:
+        # Read the position under the write lock, so concurrent runners take turns
+        position = conn.execute(
+            "SELECT Position FROM Schema_Backfill WHERE Name = ? AND NOT Done", (name,)
+        ).fetchone()
+        if position is None:
+            return 0
+        rows = conn.execute(
+            f"SELECT rowid, {', '.join(columns)} FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (position[0], chunk_rows),
+        ).fetchall()
+        if rows:
+            step(conn, rows)
+        conn.execute(
+            "UPDATE Schema_Backfill SET Position = ?, Done = ? WHERE Name = ?",
+            (rows[-1][0] if rows else position[0], len(rows) < chunk_rows, name),
+        )
+    return len(rows)
+
+def run_backfills(
+    conn: sqlite3.Connection,
+    chunk_rows: int = BACKFILL_CHUNK_ROWS,
+    pause_ms: float = 0.0,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, int]:
+    """Run pending backfills to completion, one chunk per transaction.
+
+    pause_ms sleeps between chunks to leave the write lock to other
+    writers; progress(name, rows_so_far) is called after each chunk.
+    Returns rows processed per backfill.
+    """
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows must be > 0")
+    done: Dict[str, int] = {}
+    for name in pending_backfills(conn):
+        done[name] = 0
+        while True:
+            n = _backfill_chunk(conn, name, chunk_rows)
+            done[name] += n
+            if progress is not None:
+                progress(name, done[name])
+            if n < chunk_rows:
+                break
+            if pause_ms:
+                time.sleep(pause_ms / 1000)
+    return done
+
+def _add_schema_backfill(conn: sqlite3.Connection) -> None:
+    conn.execute(BACKFILL_TABLE)
+
+# Ordered (target_version, migration) pairs. Each runs once, inside one
+# transaction, so it should be DDL or small; row rewrites go in a backfill.
+MIGRATIONS: Tuple = (
+    (1, _migrate_json_links),
+    (2, _add_product_search),
+    (3, _replace_images_index),
+    (4, _add_product_detail),
+    (5, _add_change_log),
+    (6, _add_schema_backfill),
+    (7, _add_image_store),
+)
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def ensure_schema(conn: sqlite3.Connection, backfill: bool = True) -> None:
+    """Create missing tables and bring an existing inventory.db up to SCHEMA_VERSION.
+
+    Pending backfills then run in chunks unless backfill is False (run them
+    later with run_backfills, e.g. "schema.py backfill"). A database that
+    is already current costs two small reads: no DDL and no write lock.
+    """
+    if schema_version(conn) == SCHEMA_VERSION:
+        if backfill and pending_backfills(conn):
+            run_backfills(conn)
+        return
+    id_types = ID_TYPES[getattr(conn, "binary_ids", False)]
+    with conn:
+        for ddl in TABLES + LINK_TABLES + INDEXES:
+            conn.execute(ddl.format(**id_types))
+        current = schema_version(conn)
+        for version, migrate in MIGRATIONS:
+            if current < version:
+                migrate(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+                current = version
+    if backfill:
+        run_backfills(conn)
+
+# Binary id migration
+# table -> id columns to convert; every other column is copied unchanged.
+ID_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "Products": ("Product_Id",),
+    "Suppliers": ("Supplier_Id",),
+    "Category": ("Category_Id",),
+    "Images": ("Image_Id", "Product_Id"),
+    "Product_Supplier": ("Product_Id", "Supplier_Id"),
+    "Product_Category": ("Product_Id", "Category_Id"),
+    "Image_Store": (),
+}
+
+def _uuid_blob(x):
+    # Ids that are not canonical UUIDs (e.g. old hex defaults) are kept as text.
+    return _uuid_bytes(x) if isinstance(x, str) and _is_uuid(x) else x
+
+def migrate_to_binary_ids(src_path: str, dst_path: str) -> Dict[str, int]:
+    """Copy src_path into a new database at dst_path that stores ids as 16-byte blobs.
+
+    The source is first brought up to SCHEMA_VERSION. Returns rows copied per table.
+    """
+    if os.path.exists(dst_path):
+        raise ValueError(f"{dst_path} already exists")
+    src = db.connect(src_path, binary_ids=False)
+    ensure_schema(src)
+    src.close()
+
+    dst = db.connect(dst_path, binary_ids=True)
+    ensure_schema(dst)
+    # Plain (non-encoding) connection for the copy itself; ids go through uuid_blob().
+    dst.close()
+    conn = sqlite3.connect(dst_path)
+    conn.create_function("uuid_blob", 1, _uuid_blob, deterministic=True)
+    conn.execute("ATTACH DATABASE ? AS src", (src_path,))
+    copied: Dict[str, int] = {}
+    with conn:
+        for table, id_cols in ID_COLUMNS.items():
+            cols = [r[1] for r in conn.execute(f"PRAGMA src.table_info({table})")]
+            exprs = [f"uuid_blob({c})" if c in id_cols else c for c in cols]
+            copied[table] = conn.execute(
+                f"INSERT INTO main.{table} ({', '.join(cols)}) SELECT {', '.join(exprs)} FROM src.{table}"
+            ).rowcount
+        # The copy itself fired the change log triggers; keep the source's log instead
+        conn.execute("DELETE FROM main.Change_Log")
+        copied["Change_Log"] = conn.execute(
+            "INSERT INTO main.Change_Log (Seq, Entity, Op, Entity_Id, Related_Id, Changed_At) "
+            "SELECT Seq, Entity, Op, uuid_blob(Entity_Id), uuid_blob(Related_Id), Changed_At FROM src.Change_Log"
+        ).rowcount
+        conn.execute(
+            "UPDATE main.sqlite_sequence SET seq = coalesce((SELECT seq FROM src.sqlite_sequence "
+            "WHERE name = 'Change_Log'), 0) WHERE name = 'Change_Log'"
+        )
+    conn.execute("DETACH DATABASE src")
+    conn.execute("VACUUM")
+    conn.close()
+    return copied
+
+def dump_schema(binary: bool = False) -> str:
+    """The DDL ensure_schema creates, as one SQL script (what sqlSchema/schema.sql holds)."""
+    conn = db.connect(":memory:", binary_ids=binary)
+    ensure_schema(conn)
+    rows = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' "
+        "AND name NOT LIKE 'Products_FTS_%' ORDER BY rowid"
+    ).fetchall()
+    conn.close()
+    header = f"-- Generated by `python app/schema.py dump` (schema version {SCHEMA_VERSION}); edit app/schema.py instead.\n\n"
+    return header + "".join(f"{sql};\n\n" for sql, in rows)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="inventory.db schema tools")
+    sub = ap.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("upgrade", help="create missing tables and run pending migrations and backfills")
+    up.add_argument("db", nargs="?", default="inventory.db")
+    up.add_argument("--no-backfill", action="store_true", help="leave backfills for a later 'backfill' run")
+    bf = sub.add_parser("backfill", help="run pending backfills in chunks; safe to interrupt and rerun")
+    bf.add_argument("db", nargs="?", default="inventory.db")
+    bf.add_argument("--chunk-rows", type=int, default=BACKFILL_CHUNK_ROWS)
+    bf.add_argument("--pause-ms", type=float, default=10.0, help="sleep between chunks so other writers get in")
+    dump = sub.add_parser("dump", help="print the schema a new database gets")
+    dump.add_argument("--binary-ids", action="store_true")
+    tb = sub.add_parser("to-binary", help="copy a database into a new file with 16-byte ids")
+    tb.add_argument("src")
+    tb.add_argument("dst")
+    args = ap.parse_args(argv)
+
+    if args.command == "upgrade":
+        conn = db.connect(args.db)
+        ensure_schema(conn, backfill=not args.no_backfill)
+        pending = pending_backfills(conn)
+        print(f"{args.db} is at schema version {schema_version(conn)}"
+              + (f"; pending backfills: {', '.join(pending)}" if pending else ""))
+        conn.close()
+    elif args.command == "backfill":
+        conn = db.connect(args.db)
+        ensure_schema(conn, backfill=False)
+        t0 = time.perf_counter()
+
+        def progress(name: str, rows: int) -> None:
+            print(f"\r{name}: {rows:,} rows ({time.perf_counter() - t0:.1f}s)", end="", file=sys.stderr)
+
+        try:
+            done = run_backfills(conn, args.chunk_rows, args.pause_ms, progress)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        finally:
+            conn.close()
+        print(file=sys.stderr)
+        print(f"{len(done)} backfills finished" if done else "No pending backfills")
+    elif args.command == "dump":
+        sys.stdout.write(dump_schema(args.binary_ids))
+    else:
+        try:
+            copied = migrate_to_binary_ids(args.src, args.dst)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        for table, n in copied.items():
+            print(f"{table}: {n} rows")
+        print(f"{args.src} ({os.path.getsize(args.src):,} bytes) -> {args.dst} ({os.path.getsize(args.dst):,} bytes)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
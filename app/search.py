@@ -0,0 +1,123 @@
+from __future__ import annotations
+import argparse, re, sqlite3, sys
+from typing import Any, List, Optional
+
+import db
+from product import Product
+from query import PRODUCT_COLUMNS
+from schema import ensure_schema
+
+# Ranked product search over Products_FTS (see schema.PRODUCT_SEARCH).
+# Name matches weigh more than description matches.
+
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+MAX_LIMIT = 1000
+
+_TERM_RX = re.compile(r"\w+", re.UNICODE)
+
+def match_expression(text: str, prefix: bool = True) -> str:
+    """FTS5 MATCH expression for free text: every word must appear.
+
+    Words are quoted, so FTS5 operators and punctuation in user input are
+    treated as plain text. With prefix, the last word also matches longer
+    words ("cord dri" finds "cordless drill").
+    """
+    terms = _TERM_RX.findall(text)
+    if not terms:
+        raise ValueError("search text must contain at least one word")
+    quoted = [f'"{t}"' for t in terms]
+    if prefix:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+def search_products(
+    conn: sqlite3.Connection,
+    text: str,
+    category_id: Optional[str] = None,
+    supplier_id: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    prefix: bool = True,
+    as_models: bool = False,
+) -> List[Any]:
+    """Best matches first, as dicts with a "rank" key (lower is better), or
+    Product objects (without link ids) when as_models is set.
+
+    category_id / supplier_id keep only products linked to them.
+    """
+    if not 0 < limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be 1..{MAX_LIMIT}")
+    if offset < 0:
+        raise ValueError("offset must be >= 0")
+    # Rank and cut inside the index, then fetch only the rows returned.
+    # Filters join the link tables by product; FTS5 checks each candidate
+    # with a rowid lookup instead of ranking every match first.
+    joins, where = [], ["Products_FTS MATCH ?"]
+    args: List[Any] = [match_expression(text, prefix)]
+    for i, (link_table, col, value) in enumerate((
+        ("Product_Category", "Category_Id", category_id),
+        ("Product_Supplier", "Supplier_Id", supplier_id),
+    )):
+        if value:
+            joins.append(f"JOIN {link_table} l{i} ON l{i}.Product_Id = f.Product_Id AND l{i}.{col} = ?")
+            args.insert(len(joins) - 1, value)
+    if joins:
+        joins.insert(0, "JOIN Products f ON f.rowid = Products_FTS.rowid")
+    sql = (
+        f"SELECT {', '.join('p.' + c for c in PRODUCT_COLUMNS)}, m.rank FROM ("
+        f"SELECT Products_FTS.rowid AS rowid, bm25(Products_FTS, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}) AS rank "
+        f"FROM Products_FTS {' '.join(joins)} WHERE {' AND '.join(where)} ORDER BY rank LIMIT ? OFFSET ?"
+        ") m JOIN Products p ON p.rowid = m.rowid ORDER BY m.rank"
+    )
+    rows = conn.execute(sql, [*args, limit, offset]).fetchall()
+    if as_models:
+        return [Product.from_row(row[:-1]) for row in rows]
+    names = [c.lower() for c in PRODUCT_COLUMNS] + ["rank"]
+    return [dict(zip(names, row)) for row in rows]
+
+def rebuild_index(conn: sqlite3.Connection) -> int:
+    """Re-read every product into the search index. Returns the product count."""
+    with conn:
+        conn.execute("INSERT INTO Products_FTS (Products_FTS) VALUES ('rebuild')")
+    return conn.execute("SELECT COUNT(*) FROM Products").fetchone()[0]
+
+def optimize_index(conn: sqlite3.Connection) -> None:
+    """Merge the index segments; worth running after large imports."""
+    with conn:
+        conn.execute("INSERT INTO Products_FTS (Products_FTS) VALUES ('optimize')")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Search products by name and description")
+    ap.add_argument("text", nargs="?")
+    ap.add_argument("--db", default="inventory.db")
+    ap.add_argument("--category")
+    ap.add_argument("--supplier")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--exact", action="store_true", help="don't prefix-match the last word")
+    ap.add_argument("--rebuild", action="store_true", help="rebuild the index from Products")
+    ap.add_argument("--optimize", action="store_true", help="merge index segments")
+    args = ap.parse_args(argv)
+
+    conn = db.connect(args.db)
+    ensure_schema(conn)
+    if args.rebuild:
+        print(f"Indexed {rebuild_index(conn)} products")
+    if args.optimize:
+        optimize_index(conn)
+    if args.text:
+        try:
+            rows = search_products(conn, args.text, args.category, args.supplier, args.limit,
+                                   prefix=not args.exact)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        for row in rows:
+            print(f"{row['product_id']}  {row['product_name']}  (rank {row['rank']:.3f})")
+        if not rows:
+            print("No matches")
+    conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+from __future__ import annotations
+import argparse, asyncio, json, sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import instrument
+from changelog import tail
+from db import ConnectionPool, run_batch
+from detail import product_detail
+from imagestore import images_for_products
+from query import iter_products, iter_suppliers, iter_categories, iter_images
+from repository import ProductRepository, CategoryRepository, ImageRepository, SupplierRepository
+from schema import ensure_schema
+from search import search_products
+from stock import adjust_stock, reserve, release
+from supplier import add_product_to_supplier, remove_product_from_supplier, link_many, unlink_many
+
+Params = Dict[str, Any]
+
+_KINDS = {int: "an integer", float: "a number", str: "a string"}
+
+def _param(p: Params, key: str, convert: Callable[[Any], Any], default: Any = None) -> Any:
+    """p[key] converted (default if absent). ValueError, so a 400, if it doesn't convert."""
+    if key not in p:
+        return default
+    try:
+        return convert(p[key])
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be {_KINDS.get(convert, 'valid')}") from None
+
+def _required(p: Params, key: str, kind: type) -> Any:
+    """A required body field of JSON type kind (list or dict)."""
+    if key not in p:
+        raise ValueError(f"{key} is required")
+    if not isinstance(p[key], kind):
+        raise ValueError(f"{key} must be {'a list' if kind is list else 'an object'}")
+    return p[key]
+
+def _pairs(p: Params, owner: str) -> List[Tuple[str, str]]:
+    """The body's "pairs" as (owner_id, product_id) tuples, checked for shape."""
+    pairs = _required(p, "pairs", list)
+    for i, pair in enumerate(pairs):
+        if not (isinstance(pair, list) and len(pair) == 2 and all(isinstance(x, str) for x in pair)):
+            raise ValueError(f"pairs[{i}] must be a [{owner}, product_id] list of two id strings")
+    return [(a, b) for a, b in pairs]
+
+def _list(iterate: Callable[..., Any], filters: Dict[str, Callable[[Any], Any]]) -> Callable[[sqlite3.Connection, Params], List[Params]]:
+    def run(conn: sqlite3.Connection, p: Params) -> List[Params]:
+        limit = _param(p, "limit", int, 100)
+        if limit <= 0:
+            raise ValueError("limit must be > 0")
+        limit = min(limit, 1000)
+        kwargs = {k: _param(p, k, convert) for k, convert in filters.items() if k in p}
+        return list(islice(iterate(conn, **kwargs, batch_size=limit), limit))
+    return run
+
+# Routes: (method, path pattern, "read" | "write", handler(conn, *path_ids, params), success status)
+READ, WRITE = "read", "write"
+
+def _crud(prefix: str, repo: Callable[[sqlite3.Connection], Any], key: str, list_fn: Callable[..., Any],
+          filters: Dict[str, Callable[[Any], Any]]) -> List[Tuple[str, str, str, Callable[..., Any], int]]:
+    return [
+        ("GET", prefix, READ, _list(list_fn, filters), 200),
+        ("POST", prefix, WRITE, lambda conn, p: {key: repo(conn).create(**p)}, 201),
+        ("GET", f"{prefix}/{{}}", READ, lambda conn, rid, p: repo(conn).read(rid).to_dict(), 200),
+        ("PATCH", f"{prefix}/{{}}", WRITE, lambda conn, rid, p: repo(conn).update(rid, **p), 204),
+        ("DELETE", f"{prefix}/{{}}", WRITE, lambda conn, rid, p: repo(conn).delete(rid), 204),
+    ]
+
+def _product_images(conn: sqlite3.Connection, p: Params) -> Dict[str, List[Params]]:
+    if not p.get("ids"):
+        raise ValueError("ids is required")
+    ids = p["ids"].split(",")
+    if len(ids) > 1000:
+        raise ValueError("at most 1000 ids")
+    return images_for_products(conn, ids)
+
+def _search(conn: sqlite3.Connection, p: Params) -> List[Params]:
+    if not p.get("q"):
+        raise ValueError("q is required")
+    return search_products(conn, p["q"], p.get("category_id"), p.get("supplier_id"),
+                           _param(p, "limit", int, 20), _param(p, "offset", int, 0))
+
+ROUTES: List[Tuple[str, str, str, Callable[..., Any], int]] = [
+    # Before products/{} so "search" and "images" aren't taken for ids
+    ("GET", "products/search", READ, _search, 200),
+    ("GET", "products/images", READ, _product_images, 200),  # ?ids=<id>,<id>,...
+    ("GET", "products/{}/detail", READ, lambda conn, pid, p: product_detail(conn, pid), 200),
+    *_crud("products", ProductRepository, "product_id", iter_products,
+           {"name_prefix": str, "min_price": float, "max_price": float, "min_quantity": int, "max_quantity": int}),
+    *_crud("suppliers", SupplierRepository, "supplier_id", iter_suppliers, {"name_prefix": str}),
+    ("PUT", "suppliers/{}/products/{}", WRITE, lambda conn, sid, pid, p: add_product_to_supplier(conn, sid, pid), 204),
+    ("DELETE", "suppliers/{}/products/{}", WRITE, lambda conn, sid, pid, p: remove_product_from_supplier(conn, sid, pid), 204),
+    # Body {"pairs": [[supplier_id, product_id], ...]}; all or nothing
+    ("POST", "suppliers/links", WRITE, lambda conn, p: {"linked": link_many(conn, _pairs(p, "supplier_id"))}, 200),
+    ("POST", "suppliers/unlinks", WRITE, lambda conn, p: {"unlinked": unlink_many(conn, _pairs(p, "supplier_id"))}, 200),
+    *_crud("categories", CategoryRepository, "category_id", iter_categories, {"name_prefix": str}),
+    ("PUT", "categories/{}/products/{}", WRITE, lambda conn, cid, pid, p: CategoryRepository(conn).add_product(cid, pid), 204),
+    ("DELETE", "categories/{}/products/{}", WRITE, lambda conn, cid, pid, p: CategoryRepository(conn).remove_product(cid, pid), 204),
+    ("POST", "categories/links", WRITE, lambda conn, p: {"linked": CategoryRepository(conn).link_many(_pairs(p, "category_id"))}, 200),
+    ("POST", "categories/unlinks", WRITE, lambda conn, p: {"unlinked": CategoryRepository(conn).unlink_many(_pairs(p, "category_id"))}, 200),
+    *_crud("images", ImageRepository, "image_id", iter_images, {"product_id": str}),
+    # Body {"lines": {product_id: n}}; returns {"failed": {product_id: reason}}
+    ("POST", "stock/adjust", WRITE, lambda conn, p: {"failed": adjust_stock(conn, _required(p, "lines", dict), bool(p.get("atomic")))}, 200),
+    ("POST", "stock/reserve", WRITE, lambda conn, p: {"failed": reserve(conn, _required(p, "lines", dict))}, 200),
+    ("POST", "stock/release", WRITE, lambda conn, p: {"failed": release(conn, _required(p, "lines", dict))}, 200),
+    # ?since=<seq>&limit=<n>; the next call passes the last change's seq as since
+    ("GET", "changes", READ, lambda conn, p: tail(conn, _param(p, "since", int, 0), min(_param(p, "limit", int, 500), 1000)), 200),
+    ("GET", "stats/sql", READ, lambda conn, p: conn.query_stats.snapshot() if conn.query_stats else {}, 200),
+]
+
+def _match(method: str, path: str) -> Tuple[Optional[Tuple[str, str, str, Callable[..., Any], int]], List[str], bool]:
+    """Return (route, path ids, path_exists)."""
+    parts = [s for s in path.split("/") if s]
+    found = False
+    for route in ROUTES:
+        pattern = route[1].split("/")
+        if len(pattern) != len(parts):
+            continue
+        ids = [part for pat, part in zip(pattern, parts) if pat == "{}"]
+        if all(pat == "{}" or pat == part for pat, part in zip(pattern, parts)):
+            found = True
+            if route[0] == method:
+                return route, ids, True
+    return None, [], found
+
+# Service core
+class InventoryService:
+    """Runs inventory operations for asyncio callers.
+
+    Reads run on a thread pool, each thread with its own read connection.
+    Writes are queued and executed by one writer thread in batches: every
+    write queued while the previous batch was committing goes into the next
+    batch, each in its own savepoint, and the whole batch shares a single
+    commit. A write's awaitable resolves only after that commit.
+
+    snapshot=True serves reads only, from a copy kept fresh with
+    db.copy_snapshot (e.g. `main.py snapshot --every 60`); write routes
+    answer 405. Any number of such processes can serve the same snapshot,
+    sharing one port with reuse_port.
+    """
+
+    def __init__(
+        self,
+        path: str = "inventory.db",
+        read_workers: int = 8,
+        max_batch: int = 256,
+        max_delay_ms: float = 0.0,
+        snapshot: bool = False,
+    ) -> None:
+        self.pool = ConnectionPool(path, snapshot=snapshot)
+        self.snapshot = snapshot
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._read_executor = ThreadPoolExecutor(read_workers, thread_name_prefix="inventory-read")
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="inventory-write")
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        if not snapshot:
+            self.pool.write(ensure_schema)
+
+    async def read(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, self.pool.read, fn, *args)
+
+    async def write(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.get_running_loop().create_task(self._run_batcher())
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((fn, args, fut))
+        return await fut
+
+    async def _run_batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            items = [first]
+            deadline = loop.time() + self.max_delay
+            while len(items) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    self._queue.put_nowait(None)
+                    break
+                items.append(item)
+
+            ops = [(fn, args) for fn, args, _ in items]
+            outcomes = await loop.run_in_executor(self._write_executor, self._execute_batch, ops)
+            for (_, _, fut), (ok, value) in zip(items, outcomes):
+                if fut.done():
+                    continue
+                if ok:
+                    fut.set_result(value)
+                else:
+                    fut.set_exception(value)
+
+    def _execute_batch(self, ops: List[Tuple[Callable[..., Any], tuple]]) -> List[Tuple[bool, Any]]:
+        try:
+            with self.pool.writer() as conn:
+                return run_batch(conn, ops)
+        except Exception as e:
+            # No writer connection: fail the batch rather than the batcher
+            return [(False, e)] * len(ops)
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        url = urlsplit(target)
+        route, ids, path_exists = _match(method, url.path)
+        if route is None:
+            return (405, {"error": "method not allowed"}) if path_exists else (404, {"error": "not found"})
+        _, _, kind, handler, status = route
+        if kind == WRITE and self.snapshot:
+            return 405, {"error": "read-only snapshot"}
+        try:
+            params: Params = dict(parse_qsl(url.query))
+            if body:
+                params.update(json.loads(body))
+        except (ValueError, TypeError):
+            return 400, {"error": "body must be a JSON object"}
+
+        run = self.read if kind == READ else self.write
+        try:
+            result = await run(handler, *ids, params)
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except KeyError as e:
+            return 404, {"error": e.args[0] if e.args else "not found"}
+        except sqlite3.IntegrityError as e:
+            return 409, {"error": str(e)}
+        return status, result
+
+    # HTTP/1.1 front-end (JSON in, JSON out, keep-alive)
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, target, _ = line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+
+                try:
+                    status, payload = await self.dispatch(method.upper(), target, body)
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                data = b"" if payload is None or status == 204 else json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080,
+                    reuse_port: bool = False) -> asyncio.AbstractServer:
+        self._server = await asyncio.start_server(self._handle_client, host, port, reuse_port=reuse_port)
+        return self._server
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            await self._queue.put(None)
+            await self._batcher
+            self._batcher = None
+        self._read_executor.shutdown()
+        self._write_executor.shutdown()
+        self.pool.close()
+
+_REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 409: "Conflict", 500: "Internal Server Error"}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Serve the inventory over HTTP/JSON")
+    ap.add_argument("--db", default="inventory.db")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--max-batch", type=int, default=256)
+    ap.add_argument("--sql-stats", metavar="PATH", help="record per-statement SQL metrics and write them here on exit "
+                                                      "(.json for a snapshot, otherwise Prometheus text)")
+    ap.add_argument("--slow-query-ms", type=float, help="log statements slower than this with their query plan")
+    ap.add_argument("--snapshot", action="store_true", help="serve reads only; --db is a snapshot copy "
+                                                           "(see main.py snapshot)")
+    ap.add_argument("--reuse-port", action="store_true", help="let several processes listen on the same port")
+    args = ap.parse_args(argv)
+    if args.sql_stats or args.slow_query_ms is not None:
+        instrument.enable(args.slow_query_ms, args.sql_stats)
+
+    async def serve() -> None:
+        svc = InventoryService(args.db, max_batch=args.max_batch, snapshot=args.snapshot)
+        server = await svc.start(args.host, args.port, args.reuse_port)
+        print(f"Serving {args.db}{' (read-only snapshot)' if args.snapshot else ''} on http://{args.host}:{args.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await svc.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
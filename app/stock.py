@@ -0,0 +1,87 @@
+from __future__ import annotations
+import sqlite3
+from typing import Dict, Iterable, Mapping
+
+from cache import invalidate
+
+# Stock changes. Every line is one conditional UPDATE, so the check and the
+# change happen under SQLite's write lock and concurrent writers can never
+# take Product_Quantity below zero (or lose each other's updates, as a
+# read-then-write would). Results map product id -> reason for the lines
+# that were not applied; an empty dict means everything went through.
+
+NOT_FOUND = "not_found"
+INSUFFICIENT = "insufficient"
+
+_DECREMENT = (
+    "UPDATE Products SET Product_Quantity = Product_Quantity - ? "
+    "WHERE Product_Id = ? AND Product_Quantity >= ?"
+)
+_INCREMENT = "UPDATE Products SET Product_Quantity = Product_Quantity + ? WHERE Product_Id = ?"
+
+class _Abort(Exception):
+    """Raised inside the transaction to roll back an atomic batch."""
+
+def _check(lines: Mapping[str, int], positive: bool) -> None:
+    if not isinstance(lines, Mapping):
+        raise ValueError("lines must map product ids to quantities")
+    for pid, n in lines.items():
+        if not isinstance(n, int) or isinstance(n, bool):
+            raise ValueError(f"quantity for {pid} must be an integer")
+        if positive and n <= 0:
+            raise ValueError(f"quantity for {pid} must be > 0")
+
+def _apply(cur: sqlite3.Cursor, pid: str, delta: int) -> bool:
+    if delta < 0:
+        return cur.execute(_DECREMENT, (-delta, pid, -delta)).rowcount == 1
+    return cur.execute(_INCREMENT, (delta, pid)).rowcount == 1
+
+def adjust_stock(conn: sqlite3.Connection, deltas: Mapping[str, int], atomic: bool = False) -> Dict[str, str]:
+    """Add deltas[pid] to each product's quantity in one transaction.
+
+    Negative deltas only apply if enough stock is left. With atomic, any
+    failed line rolls the whole batch back; otherwise the other lines are
+    still applied. Returns {product_id: NOT_FOUND | INSUFFICIENT} for the
+    failed lines.
+    """
+    _check(deltas, positive=False)
+    failed: Dict[str, str] = {}
+    applied = []
+    try:
+        with conn:
+            cur = conn.cursor()
+            # Sorted so a retried batch touches rows in the same order
+            for pid in sorted(deltas):
+                if _apply(cur, pid, deltas[pid]):
+                    applied.append(pid)
+                    continue
+                exists = cur.execute("SELECT 1 FROM Products WHERE Product_Id = ?", (pid,)).fetchone()
+                failed[pid] = INSUFFICIENT if exists else NOT_FOUND
+            if atomic and failed:
+                raise _Abort
+            invalidate(conn, "Products", applied)
+    except _Abort:
+        pass
+    return failed
+
+def reserve(conn: sqlite3.Connection, lines: Mapping[str, int]) -> Dict[str, str]:
+    """Take lines[pid] units of each product, all or nothing (an order)."""
+    _check(lines, positive=True)
+    return adjust_stock(conn, {pid: -n for pid, n in lines.items()}, atomic=True)
+
+def release(conn: sqlite3.Connection, lines: Mapping[str, int]) -> Dict[str, str]:
+    """Put back units taken by reserve, all or nothing."""
+    _check(lines, positive=True)
+    return adjust_stock(conn, lines, atomic=True)
+
+def stock_levels(conn: sqlite3.Connection, product_ids: Iterable[str]) -> Dict[str, int]:
+    """Current quantity of each of product_ids that exists."""
+    ids = list(product_ids)
+    levels: Dict[str, int] = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        levels.update(conn.execute(
+            f"SELECT Product_Id, Product_Quantity FROM Products WHERE Product_Id IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        ).fetchall())
+    return levels
@@ -1,7 +1,10 @@
 from __future__ import annotations
 import re, sqlite3, uuid, json
 from dataclasses import dataclass, field
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Set, Tuple
+
+from cache import cached, invalidate
+from cascade import _delete_products
 
 # Validation 
 UUID_RX = re.compile(
@@ -16,6 +19,23 @@ EMAIL_RX = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
 def _is_uuid(x: str) -> bool:
     return bool(UUID_RX.fullmatch(x or ""))
 
+def _uuid_bytes(x) -> bytes:
+    """Compact 16-byte form of a UUID string (bytes pass through)."""
+    return x if x.__class__ is bytes else bytes.fromhex(x.replace("-", ""))
+
+def _uuid_str(x) -> str:
+    """Canonical string form of a UUID held as 16 bytes (strings pass through).
+
+    Other bytes are TEXT values (e.g. legacy ids the binary migration kept
+    as text) and are decoded unchanged.
+    """
+    if x.__class__ is not bytes:
+        return x
+    if len(x) != 16:
+        return x.decode()
+    h = x.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
 def _require_uuid(x: str, label: str = "id") -> None:
     if not _is_uuid(x):
         raise ValueError(f"{label} must be a UUID string")
@@ -36,7 +56,7 @@ def _load_json_list(s: Optional[str]) -> List[str]:
 def _dump_json_list(lst: List[str]) -> str:
     return json.dumps(lst, separators=(",", ":"))
 
-@dataclass
+@dataclass(slots=True)
 class Supplier:
     supplier_id: str
     supplier_name: str
@@ -53,63 +73,35 @@ class Supplier:
 
 # Internal helpers 
 def _supplier_exists(cur: sqlite3.Cursor, supplier_id: str) -> bool:
-    return cur.execute(
+    return cached(cur.connection, ("Suppliers", supplier_id, "exists"), lambda: cur.execute(
         "SELECT 1 FROM Suppliers WHERE Supplier_Id = ? LIMIT 1", (supplier_id,)
-    ).fetchone() is not None
+    ).fetchone() is not None)
 
 def _product_exists(cur: sqlite3.Cursor, product_id: str) -> bool:
-    return cur.execute(
+    return cached(cur.connection, ("Products", product_id, "exists"), lambda: cur.execute(
         "SELECT 1 FROM Products WHERE Product_Id = ? LIMIT 1", (product_id,)
-    ).fetchone() is not None
+    ).fetchone() is not None)
 
 def _fetch_supplier(cur: sqlite3.Cursor, supplier_id: str) -> Supplier:
     row = cur.execute(
-        "SELECT Supplier_Id, Supplier_Name, Supplier_Contact, Product_Ids FROM Suppliers WHERE Supplier_Id = ?",
+        "SELECT Supplier_Id, Supplier_Name, Supplier_Contact FROM Suppliers WHERE Supplier_Id = ?",
         (supplier_id,),
     ).fetchone()
     if not row:
         raise KeyError(f"Supplier {supplier_id} not found")
 
-    sid, name, email, prod_json = row
+    sid, name, email = row
     return Supplier(
         supplier_id=sid,
         supplier_name=name,
         supplier_contact=email,
-        product_ids=_load_json_list(prod_json),
+        product_ids=_supplier_product_ids(cur, sid),
     )
 
-def _delete_product_cascade(conn: sqlite3.Connection, product_id: str) -> None:
-    """Delete a product and clean up images, categories, and other suppliers' lists."""
-    cur = conn.cursor()
-
-    # Remove product from all suppliers' Product_Ids
-    for sid, plist in cur.execute("SELECT Supplier_Id, Product_Ids FROM Suppliers").fetchall():
-        lst = _load_json_list(plist)
-        if product_id in lst:
-            lst.remove(product_id)
-            conn.execute(
-                "UPDATE Suppliers SET Product_Ids = ? WHERE Supplier_Id = ?",
-                (_dump_json_list(lst), sid),
-            )
-
-    # Remove product from all categories; delete category if now empty
-    for cid, plist in cur.execute("SELECT Category_Id, Product_Ids FROM Category").fetchall():
-        lst = _load_json_list(plist)
-        if product_id in lst:
-            lst.remove(product_id)
-            if lst:
-                conn.execute(
-                    "UPDATE Category SET Product_Ids = ? WHERE Category_Id = ?",
-                    (_dump_json_list(lst), cid),
-                )
-            else:
-                conn.execute("DELETE FROM Category WHERE Category_Id = ?", (cid,))
-
-    # Delete images belonging to this product
-    conn.execute("DELETE FROM Images WHERE Product_Id = ?", (product_id,))
-
-    # Finally delete the product itself
-    conn.execute("DELETE FROM Products WHERE Product_Id = ?", (product_id,))
+def _supplier_product_ids(cur: sqlite3.Cursor, supplier_id: str) -> List[str]:
+    return [r[0] for r in cur.execute(
+        "SELECT Product_Id FROM Product_Supplier WHERE Supplier_Id = ?", (supplier_id,)
+    )]
 
 # Public API (CRUD) 
 def create_supplier(
@@ -128,11 +120,24 @@ def create_supplier(
             "INSERT INTO Suppliers (Supplier_Id, Supplier_Name, Supplier_Contact, Product_Ids) VALUES (?, ?, ?, ?)",
             (sid, supplier_name, supplier_contact, "[]"),
         )
+        invalidate(conn, "Suppliers", [sid])
     return sid
 
+def _load_supplier(conn: sqlite3.Connection, supplier_id: str) -> Optional[tuple]:
+    # Immutable form for the cache; None when the supplier does not exist
+    try:
+        s = _fetch_supplier(conn.cursor(), supplier_id)
+    except KeyError:
+        return None
+    return (s.supplier_id, s.supplier_name, s.supplier_contact, tuple(s.product_ids))
+
 def read_supplier(conn: sqlite3.Connection, supplier_id: str) -> Supplier:
     _require_uuid(supplier_id, "supplier_id")
-    return _fetch_supplier(conn.cursor(), supplier_id)
+    state = cached(conn, ("Suppliers", supplier_id, "read"), lambda: _load_supplier(conn, supplier_id))
+    if state is None:
+        raise KeyError(f"Supplier {supplier_id} not found")
+    sid, name, email, product_ids = state
+    return Supplier(sid, name, email, list(product_ids))
 
 def update_supplier(
     conn: sqlite3.Connection,
@@ -159,29 +164,32 @@ def update_supplier(
         cur = conn.execute(f"UPDATE Suppliers SET {', '.join(sets)} WHERE Supplier_Id = ?", args)
         if cur.rowcount == 0:
             raise KeyError(f"Supplier {supplier_id} not found")
+        invalidate(conn, "Suppliers", [supplier_id])
 
 def delete_supplier(conn: sqlite3.Connection, supplier_id: str) -> None:
     """Delete supplier, then delete every product that references it, cascading to images/categories."""
     _require_uuid(supplier_id, "supplier_id")
     cur = conn.cursor()
-    row = cur.execute(
-        "SELECT Product_Ids FROM Suppliers WHERE Supplier_Id = ?", (supplier_id,)
-    ).fetchone()
-    if not row:
+    if not _supplier_exists(cur, supplier_id):
         raise KeyError(f"Supplier {supplier_id} not found")
-    product_ids = _load_json_list(row[0])
+    product_ids = _supplier_product_ids(cur, supplier_id)
 
     with conn:
-        # For each linked product, delete it and cascade
-        for pid in product_ids:
-            _delete_product_cascade(conn, pid)
+        # Delete every linked product in one cascade pass
+        _delete_products(conn, product_ids)
 
         # Delete the supplier itself
         cur = conn.execute("DELETE FROM Suppliers WHERE Supplier_Id = ?", (supplier_id,))
         if cur.rowcount == 0:
             raise KeyError(f"Supplier {supplier_id} not found")
+        invalidate(conn, "Suppliers", [supplier_id])
+
+# Link management (Product_Supplier junction table)
+def _invalidate_link(conn: sqlite3.Connection, supplier_id: str, product_id: str) -> None:
+    # Both sides list the link (Supplier.product_ids, Product.supplier_ids)
+    invalidate(conn, "Suppliers", [supplier_id])
+    invalidate(conn, "Products", [product_id])
 
-# Link management (bidirectional via JSON lists) 
 def add_product_to_supplier(
     conn: sqlite3.Connection, supplier_id: str, product_id: str
 ) -> None:
@@ -194,35 +202,11 @@ def add_product_to_supplier(
         if not _product_exists(cur, product_id):
             raise KeyError(f"Product {product_id} not found")
 
-        s_row = cur.execute(
-            "SELECT Product_Ids FROM Suppliers WHERE Supplier_Id = ?", (supplier_id,)
-        ).fetchone()
-        p_row = cur.execute(
-            "SELECT Supplier_Ids FROM Products WHERE Product_Id = ?", (product_id,)
-        ).fetchone()
-
-        s_products = _load_json_list(s_row[0]) if s_row else []
-        p_suppliers = _load_json_list(p_row[0]) if p_row else []
-
-        changed = False
-        if product_id not in s_products:
-            s_products.append(product_id)
-            changed = True
-        if supplier_id not in p_suppliers:
-            p_suppliers.append(supplier_id)
-            changed = True
-
-        if not changed:
-            return
-
         conn.execute(
-            "UPDATE Suppliers SET Product_Ids = ? WHERE Supplier_Id = ?",
-            (_dump_json_list(s_products), supplier_id),
-        )
-        conn.execute(
-            "UPDATE Products SET Supplier_Ids = ? WHERE Product_Id = ?",
-            (_dump_json_list(p_suppliers), product_id),
+            "INSERT OR IGNORE INTO Product_Supplier (Product_Id, Supplier_Id) VALUES (?, ?)",
+            (product_id, supplier_id),
         )
+        _invalidate_link(conn, supplier_id, product_id)
 
 def remove_product_from_supplier(
     conn: sqlite3.Connection, supplier_id: str, product_id: str
@@ -236,32 +220,73 @@ def remove_product_from_supplier(
         if not _product_exists(cur, product_id):
             raise KeyError(f"Product {product_id} not found")
 
-        s_row = cur.execute(
-            "SELECT Product_Ids FROM Suppliers WHERE Supplier_Id = ?", (supplier_id,)
-        ).fetchone()
-        p_row = cur.execute(
-            "SELECT Supplier_Ids FROM Products WHERE Product_Id = ?", (product_id,)
-        ).fetchone()
-
-        s_products = _load_json_list(s_row[0]) if s_row else []
-        p_suppliers = _load_json_list(p_row[0]) if p_row else []
-
-        changed = False
-        if product_id in s_products:
-            s_products.remove(product_id)
-            changed = True
-        if supplier_id in p_suppliers:
-            p_suppliers.remove(supplier_id)
-            changed = True
-
-        if not changed:
-            return
-
-        conn.execute(
-            "UPDATE Suppliers SET Product_Ids = ? WHERE Supplier_Id = ?",
-            (_dump_json_list(s_products), supplier_id),
-        )
         conn.execute(
-            "UPDATE Products SET Supplier_Ids = ? WHERE Product_Id = ?",
-            (_dump_json_list(p_suppliers), product_id),
+            "DELETE FROM Product_Supplier WHERE Product_Id = ? AND Supplier_Id = ?",
+            (product_id, supplier_id),
         )
+        _invalidate_link(conn, supplier_id, product_id)
+
+# Bulk link management: each call checks every id up front with a few IN
+# queries, then writes all its links in one statement batch and one
+# transaction, invalidating each affected row once.
+def _unique_pairs(pairs: Iterable[Tuple[str, str]], labels: Tuple[str, str]) -> List[Tuple[str, str]]:
+    """Distinct (owner_id, product_id) pairs sorted by product (the link tables' key order)."""
+    unique = sorted({(a, b) for a, b in pairs}, key=lambda p: (p[1], p[0]))
+    for x in {a for a, _ in unique}:
+        _require_uuid(x, labels[0])
+    for x in {b for _, b in unique}:
+        _require_uuid(x, labels[1])
+    return unique
+
+def _first_missing(conn: sqlite3.Connection, table: str, key: str, ids: Iterable[str]) -> Optional[str]:
+    """The first of ids with no row in table, or None."""
+    ids = list(dict.fromkeys(ids))
+    found: Set[str] = set()
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        found.update(r[0] for r in conn.execute(
+            f"SELECT {key} FROM {table} WHERE {key} IN ({', '.join('?' * len(chunk))})", chunk
+        ))
+    if getattr(conn, "binary_ids", False):
+        # Binary databases hand ids back in lower case; text ones match exactly
+        found = {x for x in ids if x.lower() in found}
+    return next((x for x in ids if x not in found), None)
+
+def _require_all_exist(conn: sqlite3.Connection, pairs: List[Tuple[str, str]], table: str, key: str,
+                       label: str, products: bool = True) -> None:
+    missing = _first_missing(conn, table, key, (a for a, _ in pairs))
+    if missing is not None:
+        raise KeyError(f"{label} {missing} not found")
+    if products:
+        missing = _first_missing(conn, "Products", "Product_Id", (b for _, b in pairs))
+        if missing is not None:
+            raise KeyError(f"Product {missing} not found")
+
+def link_many(conn: sqlite3.Connection, pairs: Iterable[Tuple[str, str]]) -> int:
+    """Link every (supplier_id, product_id) pair. Returns the number of new links.
+
+    All ids are checked first; an invalid or missing one raises and nothing is linked.
+    """
+    links = _unique_pairs(pairs, ("supplier_id", "product_id"))
+    with conn:
+        _require_all_exist(conn, links, "Suppliers", "Supplier_Id", "Supplier")
+        added = conn.executemany(
+            "INSERT OR IGNORE INTO Product_Supplier (Product_Id, Supplier_Id) VALUES (?, ?)",
+            ((pid, sid) for sid, pid in links),
+        ).rowcount if links else 0
+        invalidate(conn, "Suppliers", list({sid for sid, _ in links}))
+        invalidate(conn, "Products", list({pid for _, pid in links}))
+    return added
+
+def unlink_many(conn: sqlite3.Connection, pairs: Iterable[Tuple[str, str]]) -> int:
+    """Remove every (supplier_id, product_id) link. Returns the number removed; checked like link_many."""
+    links = _unique_pairs(pairs, ("supplier_id", "product_id"))
+    with conn:
+        _require_all_exist(conn, links, "Suppliers", "Supplier_Id", "Supplier")
+        removed = conn.executemany(
+            "DELETE FROM Product_Supplier WHERE Product_Id = ? AND Supplier_Id = ?",
+            ((pid, sid) for sid, pid in links),
+        ).rowcount if links else 0
+        invalidate(conn, "Suppliers", list({sid for sid, _ in links}))
+        invalidate(conn, "Products", list({pid for _, pid in links}))
+    return removed
@@ -0,0 +1,147 @@
+"""Text vs binary (16-byte) id benchmark.
+
+Seeds a text-id database with products, suppliers, categories and images,
+copies it with schema.migrate_to_binary_ids, then compares file size, index
+sizes and the time for primary-key lookups, supplier joins and reverse link
+scans. Prints JSON.
+
+Each query is timed twice: "engine" runs on a plain sqlite3 connection with
+ids already in storage form (what SQLite itself costs), "api" goes through
+db.connect so it includes the string <-> blob conversion callers pay.
+
+    python benchmarks/binary_ids_bench.py --products 100000
+"""
+from __future__ import annotations
+import argparse, json, os, random, sqlite3, sys, tempfile, time, uuid
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import db  # noqa: E402
+from supplier import _uuid_bytes  # noqa: E402
+from schema import ensure_schema, migrate_to_binary_ids  # noqa: E402
+
+def _seed(path: str, products: int, suppliers: int, categories: int, seed: int) -> Dict[str, List[str]]:
+    rnd = random.Random(seed)
+    ids = {
+        "products": [str(uuid.UUID(int=rnd.getrandbits(128), version=4)) for _ in range(products)],
+        "suppliers": [str(uuid.UUID(int=rnd.getrandbits(128), version=4)) for _ in range(suppliers)],
+        "categories": [str(uuid.UUID(int=rnd.getrandbits(128), version=4)) for _ in range(categories)],
+    }
+    conn = db.connect(path, binary_ids=False)
+    ensure_schema(conn)
+    with conn:
+        conn.executemany(
+            "INSERT INTO Products (Product_Id, Product_Name, Product_Quantity, Product_Price) VALUES (?, ?, ?, ?)",
+            ((pid, f"product {i}", i % 100, 1.0 + i % 50) for i, pid in enumerate(ids["products"])),
+        )
+        conn.executemany(
+            "INSERT INTO Suppliers (Supplier_Id, Supplier_Name, Supplier_Contact) VALUES (?, ?, ?)",
+            ((sid, f"supplier {i}", f"s{i}@example.com") for i, sid in enumerate(ids["suppliers"])),
+        )
+        conn.executemany(
+            "INSERT INTO Category (Category_Id, Category_Name) VALUES (?, ?)",
+            ((cid, f"category {i}") for i, cid in enumerate(ids["categories"])),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO Product_Supplier (Product_Id, Supplier_Id) VALUES (?, ?)",
+            ((pid, rnd.choice(ids["suppliers"])) for pid in ids["products"] for _ in range(2)),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO Product_Category (Product_Id, Category_Id) VALUES (?, ?)",
+            ((pid, rnd.choice(ids["categories"])) for pid in ids["products"]),
+        )
+        conn.executemany(
+            "INSERT INTO Images (Image_Id, Product_Id, Image_URL) VALUES (?, ?, ?)",
+            ((str(uuid.UUID(int=rnd.getrandbits(128), version=4)), pid, f"https://img.example.com/{i}.jpg")
+             for i, pid in enumerate(ids["products"])),
+        )
+    conn.close()
+    return ids
+
+def _index_bytes(conn: Any) -> Optional[Dict[str, int]]:
+    try:
+        rows = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall()
+    except Exception:  # dbstat is a compile-time option
+        return None
+    return {name: size for name, size in rows if name.startswith(("sqlite_autoindex", "idx_", "Product_"))}
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+QUERIES = {
+    "pk_lookup": ("products", "SELECT Product_Id, Product_Name, Product_Price FROM Products WHERE Product_Id = ?"),
+    "supplier_join": ("suppliers", "SELECT p.Product_Id, p.Product_Name FROM Product_Supplier ps "
+                                   "JOIN Products p ON p.Product_Id = ps.Product_Id WHERE ps.Supplier_Id = ?"),
+    "category_scan": ("categories", "SELECT Product_Id FROM Product_Category WHERE Category_Id = ?"),
+    "image_lookup": ("products", "SELECT Image_Id, Image_URL FROM Images WHERE Product_Id = ?"),
+}
+
+def _measure(path: str, binary: bool, ids: Dict[str, List[str]], lookups: int, repeat: int, seed: int) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    keys = {kind: rnd.sample(v, min(lookups if kind == "products" else lookups // 10 or 1, len(v)))
+            for kind, v in ids.items()}
+    api = db.connect(path, readonly=True)
+    engine = sqlite3.connect(path)
+    result: Dict[str, Any] = {"file_bytes": os.path.getsize(path), "index_bytes": _index_bytes(engine)}
+    for name, (kind, sql) in QUERIES.items():
+        raw = [_uuid_bytes(k) for k in keys[kind]] if binary else keys[kind]
+
+        def run_engine() -> None:
+            for k in raw:
+                engine.execute(sql, (k,)).fetchall()
+
+        def run_api() -> None:
+            for k in keys[kind]:
+                api.execute(sql, (k,)).fetchall()
+
+        result[f"{name}_engine_us"] = round(_time(run_engine, repeat) / len(raw) * 1e6, 2)
+        result[f"{name}_api_us"] = round(_time(run_api, repeat) / len(raw) * 1e6, 2)
+    api.close()
+    engine.close()
+    return result
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--products", type=int, default=100_000)
+    ap.add_argument("--suppliers", type=int, default=1_000)
+    ap.add_argument("--categories", type=int, default=200)
+    ap.add_argument("--lookups", type=int, default=20_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=383)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path, binary_path = os.path.join(tmp, "text.db"), os.path.join(tmp, "binary.db")
+        ids = _seed(text_path, args.products, args.suppliers, args.categories, args.seed)
+        # Compare like with like: the binary copy is VACUUMed by the migration.
+        conn = db.connect(text_path)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        conn.close()
+        t0 = time.perf_counter()
+        migrate_to_binary_ids(text_path, binary_path)
+        migrate_seconds = time.perf_counter() - t0
+        text = _measure(text_path, False, ids, args.lookups, args.repeat, args.seed)
+        binary = _measure(binary_path, True, ids, args.lookups, args.repeat, args.seed)
+
+    result: Dict[str, Any] = {
+        "products": args.products,
+        "migrate_seconds": round(migrate_seconds, 3),
+        "text": text,
+        "binary": binary,
+        "file_size_ratio": round(binary["file_bytes"] / text["file_bytes"], 3),
+    }
+    for name in QUERIES:
+        for mode in ("engine", "api"):
+            k = f"{name}_{mode}_us"
+            result[f"{name}_{mode}_speedup"] = round(text[k] / binary[k], 3) if binary[k] else None
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
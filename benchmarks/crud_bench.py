@@ -0,0 +1,188 @@
+"""CRUD, linking and cascade-delete benchmark at several catalogue sizes.
+
+For each scale, seeds a database with benchmarks/seed.py (or reuses one
+from --data-dir), copies it, and times the supplier.py and repository
+write paths one call at a time. Prints one JSON document so runs can be
+diffed between versions.
+
+    python benchmarks/crud_bench.py --scales 10000,100000
+    python benchmarks/crud_bench.py --scales 1000000 --data-dir /var/tmp/inv-seeds
+"""
+from __future__ import annotations
+import argparse, json, os, platform, random, sqlite3, subprocess, sys, tempfile, time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cache  # noqa: E402
+import db  # noqa: E402
+from cascade import delete_products  # noqa: E402
+from repository import ProductRepository  # noqa: E402
+from seed import seed  # noqa: E402
+from supplier import (  # noqa: E402
+    create_supplier, add_product_to_supplier, remove_product_from_supplier, delete_supplier,
+    link_many, unlink_many,
+)
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+def _summary(latencies: List[float], **extra: Any) -> Dict[str, Any]:
+    s = sorted(latencies)
+    total = sum(s)
+    out = {
+        "n": len(s),
+        "total_s": round(total, 4),
+        "ops_per_sec": round(len(s) / total, 1) if total else None,
+        "mean_us": round(total / len(s) * 1e6, 1) if s else None,
+        "p50_us": round(_percentile(s, 50) * 1e6, 1),
+        "p95_us": round(_percentile(s, 95) * 1e6, 1),
+        "p99_us": round(_percentile(s, 99) * 1e6, 1),
+        "max_us": round(s[-1] * 1e6, 1) if s else None,
+    }
+    out.update(extra)
+    return out
+
+def _timed(fn: Callable[..., Any], calls: List[tuple]) -> List[float]:
+    latencies = []
+    for args in calls:
+        t0 = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+def _sample(conn: sqlite3.Connection, sql: str, n: int, rnd: random.Random) -> List[Any]:
+    rows = [r[0] for r in conn.execute(sql)]
+    return rnd.sample(rows, min(n, len(rows)))
+
+def run_scale(path: str, ops: int, seed_value: int) -> Dict[str, Any]:
+    """Time every operation against the database at path (which is modified)."""
+    rnd = random.Random(seed_value)
+    conn = db.connect(path)
+    products = ProductRepository(conn)
+    delete_batches = max(ops // 100, 1)
+    product_ids = _sample(conn, "SELECT Product_Id FROM Products", ops * 2 + delete_batches * 1000, rnd)
+    result: Dict[str, Any] = {}
+
+    sids: List[str] = []
+    result["create_supplier"] = _summary(_timed(
+        lambda name, email: sids.append(create_supplier(conn, name, email)),
+        [(f"Bench supplier {i}", f"bench{i}@example.com") for i in range(ops)],
+    ))
+
+    pairs = [(conn, rnd.choice(sids), pid) for pid in product_ids[:ops]]
+    result["add_product_to_supplier"] = _summary(_timed(add_product_to_supplier, pairs))
+    result["remove_product_from_supplier"] = _summary(_timed(remove_product_from_supplier, pairs))
+    # The same links in batches of 1000 pairs
+    batches = [[(sid, pid) for _, sid, pid in pairs[i:i + 1000]] for i in range(0, len(pairs), 1000)]
+    result["link_many"] = _summary(_timed(link_many, [(conn, b) for b in batches]), pairs_per_call=1000)
+    result["unlink_many"] = _summary(_timed(unlink_many, [(conn, b) for b in batches]), pairs_per_call=1000)
+
+    # Single product deletes: links, images and the product row
+    singles = product_ids[ops:2 * ops]
+    result["delete_product"] = _summary(_timed(lambda pid: products.delete(pid), [(pid,) for pid in singles]))
+
+    # Batched product deletes through the shared cascade
+    batch = product_ids[2 * ops:]
+    batches = [batch[i:i + 1000] for i in range(0, len(batch), 1000)][:delete_batches]
+    result["delete_products_batch"] = _summary(
+        _timed(lambda ids: delete_products(conn, ids), [(b,) for b in batches]),
+        products_per_call=1000,
+    )
+
+    # Supplier deletes cascade to every linked product. Time a mix of the
+    # largest suppliers and typical ones.
+    sizes = dict(conn.execute(
+        "SELECT s.Supplier_Id, COUNT(ps.Product_Id) FROM Suppliers s "
+        "LEFT JOIN Product_Supplier ps ON ps.Supplier_Id = s.Supplier_Id "
+        "WHERE s.Supplier_Name NOT LIKE 'Bench supplier %' GROUP BY s.Supplier_Id"
+    ).fetchall())
+    by_size = sorted(sizes, key=sizes.get, reverse=True)
+    victims = by_size[:3] + rnd.sample(by_size[3:], min(max(ops // 10, 1), len(by_size) - 3))
+    cascaded = sum(sizes[sid] for sid in victims)
+    result["delete_supplier"] = _summary(
+        _timed(delete_supplier, [(conn, sid) for sid in victims]),
+        linked_products_total=cascaded,
+        largest_supplier_products=sizes[by_size[0]] if by_size else 0,
+    )
+    conn.close()
+    return result
+
+def _seeded(data_dir: str, products: int, seed_value: int, binary_ids: bool) -> str:
+    name = f"seed-{products}-{seed_value}{'-binary' if binary_ids else ''}.db"
+    path = os.path.join(data_dir, name)
+    if not os.path.exists(path):
+        seed(path + ".tmp", products, seed=seed_value, binary_ids=binary_ids)
+        os.replace(path + ".tmp", path)
+    return path
+
+def _copy(src: str, dst: str) -> None:
+    s, d = sqlite3.connect(src), sqlite3.connect(dst)
+    try:
+        s.backup(d)
+    finally:
+        s.close()
+        d.close()
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--scales", default="10000,100000,1000000", help="comma-separated product counts")
+    ap.add_argument("--ops", type=int, default=500, help="calls per timed operation")
+    ap.add_argument("--seed", type=int, default=383)
+    ap.add_argument("--data-dir", help="keep seeded databases here and reuse them between runs")
+    ap.add_argument("--binary-ids", action="store_true")
+    ap.add_argument("--no-cache", action="store_true", help="disable the entity cache")
+    ap.add_argument("--output", help="write the JSON here as well as to stdout")
+    args = ap.parse_args(argv)
+    if args.no_cache:
+        cache.configure(enabled=False)
+
+    report: Dict[str, Any] = {
+        "revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "binary_ids": args.binary_ids,
+        "cache": not args.no_cache,
+        "ops": args.ops,
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        for products in (int(s) for s in args.scales.split(",")):
+            t0 = time.perf_counter()
+            seeded = _seeded(data_dir, products, args.seed, args.binary_ids)
+            seed_seconds = time.perf_counter() - t0
+            work = os.path.join(tmp, "work.db")
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(work + suffix):
+                    os.remove(work + suffix)
+            _copy(seeded, work)
+            entry = run_scale(work, args.ops, args.seed)
+            entry["seed_seconds"] = round(seed_seconds, 2)
+            entry["db_bytes"] = os.path.getsize(seeded)
+            report["scales"][str(products)] = entry
+            print(f"{products:>9,} products done", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    main()
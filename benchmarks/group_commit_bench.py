@@ -0,0 +1,138 @@
+"""Per-op commits vs db.GroupCommitWriter.
+
+Starts --threads threads that each issue --ops small writes (a supplier
+create, then linking products to it and adjusting stock), first with one
+commit per op through ConnectionPool.write, then through a
+GroupCommitWriter for each --groups setting. Runs with synchronous=FULL
+(an fsync per commit) and NORMAL. Prints ops/sec and latency percentiles
+as JSON, with the measured cost of one fsync: the gain from grouping grows
+with it.
+
+    python benchmarks/group_commit_bench.py --threads 16 --ops 300 --groups 256:0,1024:5
+"""
+from __future__ import annotations
+import argparse, json, os, random, sys, tempfile, threading, time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import db  # noqa: E402
+from repository import ProductRepository  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+from stock import adjust_stock  # noqa: E402
+from supplier import add_product_to_supplier, create_supplier  # noqa: E402
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))]
+
+def _fsync_ms(directory: str, n: int = 200) -> float:
+    path = os.path.join(directory, "fsync.probe")
+    with open(path, "wb") as f:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            f.write(b"x" * 4096)
+            f.flush()
+            os.fsync(f.fileno())
+        elapsed = time.perf_counter() - t0
+    os.remove(path)
+    return elapsed / n * 1000
+
+def _workload(thread: int, ops: int, product_ids: List[str]) -> List[tuple]:
+    """(fn, *args) per op; supplier ids are filled in when the create returns."""
+    rnd = random.Random(thread)
+    plan: List[tuple] = [(create_supplier, f"Bench {thread}", f"bench{thread}@example.com")]
+    for i in range(ops - 1):
+        if i % 2:
+            plan.append((adjust_stock, {rnd.choice(product_ids): rnd.choice((-1, 1))}))
+        else:
+            plan.append((add_product_to_supplier, None, rnd.choice(product_ids)))
+    return plan
+
+def _run(submit: Callable[..., Any], wait: bool, threads: int, ops: int, product_ids: List[str]) -> Dict[str, Any]:
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def worker(n: int) -> None:
+        mine = []
+        sid = None
+        for op in _workload(n, ops, product_ids):
+            fn, *args = op
+            if fn is add_product_to_supplier:
+                args[0] = sid
+            t0 = time.perf_counter()
+            result = submit(fn, *args)
+            if wait or fn is create_supplier:
+                result = result.result() if hasattr(result, "result") else result
+            if fn is create_supplier:
+                sid = result
+            mine.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(mine)
+
+    t0 = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    s = sorted(latencies)
+    return {
+        "ops": len(s),
+        "seconds": round(elapsed, 3),
+        "ops_per_sec": round(len(s) / elapsed),
+        "p50_ms": round(_percentile(s, 50) * 1000, 3),
+        "p99_ms": round(_percentile(s, 99) * 1000, 3),
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--ops", type=int, default=300, help="writes per thread")
+    ap.add_argument("--groups", default="256:0,64:1,1024:5", help="comma-separated max_ops:max_delay_ms settings")
+    ap.add_argument("--synchronous", default="FULL,NORMAL")
+    ap.add_argument("--dir", help="where to put the database (default: a temp dir)")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        report: Dict[str, Any] = {"threads": args.threads, "ops_per_thread": args.ops,
+                                  "fsync_ms": round(_fsync_ms(tmp), 3), "runs": {}}
+        for sync in args.synchronous.split(","):
+            path = os.path.join(tmp, f"group-{sync}.db")
+            conn = db.connect(path)
+            ensure_schema(conn)
+            repo = ProductRepository(conn)
+            product_ids = [repo.create(product_name=f"p{i}", product_quantity=1_000_000, product_price=1.0)
+                           for i in range(500)]
+            conn.close()
+            runs: Dict[str, Any] = {}
+
+            with db.ConnectionPool(path, synchronous=sync) as pool:
+                runs["per_op_commit"] = _run(pool.write, True, args.threads, args.ops, product_ids)
+                for setting in args.groups.split(","):
+                    max_ops, delay = setting.split(":")
+                    with db.GroupCommitWriter(pool, int(max_ops), float(delay)) as w:
+                        # Each caller waits for its own commit, like a request handler would
+                        r = _run(w.submit, True, args.threads, args.ops, product_ids)
+                        r["commits"] = w.groups
+                    runs[f"group_{max_ops}_ops_{delay}_ms"] = r
+                    with db.GroupCommitWriter(pool, int(max_ops), float(delay)) as w:
+                        # Fire-and-forget producers; timed until everything is committed
+                        t0 = time.perf_counter()
+                        r = _run(w.submit, False, args.threads, args.ops, product_ids)
+                        w.flush()
+                        r["seconds"] = round(time.perf_counter() - t0, 3)
+                        r["ops_per_sec"] = round(r["ops"] / r["seconds"])
+                        r["commits"] = w.groups
+                    runs[f"group_{max_ops}_ops_{delay}_ms_pipelined"] = r
+            base = runs["per_op_commit"]["ops_per_sec"]
+            for r in runs.values():
+                r["speedup"] = round(r["ops_per_sec"] / base, 2)
+            report["runs"][f"synchronous={sync}"] = runs
+            print(f"synchronous={sync} done", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Image page lookups and blob cache benchmark against a local file server.
+
+Seeds a small catalogue, points its Image_URLs at a local http.server
+serving a temporary directory (many products share each URL, and some
+distinct URLs serve identical bytes), then times:
+
+  - catalogue pages: query.images_for_product per product vs one
+    imagestore.images_for_products call per page
+  - BlobCache.get_many cold (every URL fetched) and warm (all from disk)
+  - eviction when the cache is smaller than the distinct content
+
+Prints one JSON document.
+
+    python benchmarks/image_cache_bench.py --products 20000 --urls 2000
+"""
+from __future__ import annotations
+import argparse, functools, http.server, json, os, platform, random, sqlite3, sys, tempfile, threading, time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import db  # noqa: E402
+from imagestore import BlobCache, images_for_products, store_stats  # noqa: E402
+from query import images_for_product  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+from seed import seed  # noqa: E402
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+def _serve(directory: str) -> http.server.ThreadingHTTPServer:
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(_QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _write_images(directory: str, urls: int, distinct: int, size: int, rnd: random.Random) -> List[str]:
+    """urls file names over only distinct different contents."""
+    blobs = [rnd.randbytes(size) for _ in range(distinct)]
+    names = [f"{i}.jpg" for i in range(urls)]
+    for i, name in enumerate(names):
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(blobs[i % distinct])
+    return names
+
+def _pages(conn: sqlite3.Connection, page_size: int, pages: int) -> List[List[str]]:
+    ids = [r[0] for r in conn.execute("SELECT Product_Id FROM Products ORDER BY Product_Id")]
+    return [ids[i:i + page_size] for i in range(0, min(len(ids), page_size * pages), page_size)]
+
+def _time_pages(fn: Any, pages: List[List[str]]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    images = 0
+    for page in pages:
+        images += fn(page)
+    total = time.perf_counter() - t0
+    return {"pages": len(pages), "images": images, "total_s": round(total, 4),
+            "ms_per_page": round(total / len(pages) * 1e3, 3)}
+
+def run(tmp: str, products: int, urls: int, distinct: int, image_kb: int, page_size: int, pages: int,
+        workers: int, seed_value: int) -> Dict[str, Any]:
+    rnd = random.Random(seed_value)
+    static = os.path.join(tmp, "static")
+    os.makedirs(static)
+    names = _write_images(static, urls, distinct, image_kb * 1024, rnd)
+    server = _serve(static)
+    base = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        path = os.path.join(tmp, "bench.db")
+        seed(path, products, seed=seed_value)
+        conn = db.connect(path)
+        ensure_schema(conn)
+        with conn:
+            conn.executemany("UPDATE Images SET Image_URL = ? WHERE Image_Id = ?",
+                             [(base + rnd.choice(names), r[0]) for r in conn.execute("SELECT Image_Id FROM Images")])
+        out: Dict[str, Any] = {}
+        page_ids = _pages(conn, page_size, pages)
+        out["per_product"] = _time_pages(
+            lambda page: sum(len(list(images_for_product(conn, pid))) for pid in page), page_ids)
+        out["batched"] = _time_pages(
+            lambda page: sum(map(len, images_for_products(conn, page).values())), page_ids)
+
+        all_urls = [r[0] for r in conn.execute("SELECT DISTINCT Image_URL FROM Images")]
+        cache = BlobCache(os.path.join(tmp, "blobs"), 1 << 40)
+        for label in ("cold", "warm"):
+            t0 = time.perf_counter()
+            got = cache.get_many(conn, all_urls, workers)
+            out[f"get_many_{label}"] = {"urls": len(all_urls), "resolved": len(got),
+                                        "total_s": round(time.perf_counter() - t0, 4), **cache.stats()}
+        out["store"] = store_stats(conn)
+
+        # Half the distinct content fits: every pass misses and evicts
+        small = BlobCache(os.path.join(tmp, "small"), distinct * image_kb * 1024 // 2)
+        t0 = time.perf_counter()
+        for _ in range(2):
+            with conn:  # forget the first cache's fetches
+                conn.execute("DELETE FROM Image_Store")
+            small.get_many(conn, all_urls, workers)
+        out["evicting"] = {"passes": 2, "total_s": round(time.perf_counter() - t0, 4), **small.stats()}
+        conn.close()
+        return out
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--products", type=int, default=20000)
+    ap.add_argument("--urls", type=int, default=2000, help="distinct image URLs shared by all products")
+    ap.add_argument("--distinct", type=int, default=500, help="distinct contents behind those URLs")
+    ap.add_argument("--image-kb", type=int, default=16)
+    ap.add_argument("--page-size", type=int, default=50)
+    ap.add_argument("--pages", type=int, default=100)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--seed", type=int, default=383)
+    ap.add_argument("--output", help="write the JSON here as well as to stdout")
+    args = ap.parse_args(argv)
+    if not 0 < args.distinct <= args.urls:
+        ap.error("--distinct must be between 1 and --urls")
+
+    report: Dict[str, Any] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        report["results"] = run(tmp, args.products, args.urls, args.distinct, args.image_kb,
+                                args.page_size, args.pages, args.workers, args.seed)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Full-text search vs LIKE '%term%' scans.
+
+Seeds (or reuses from --data-dir) a catalogue with benchmarks/seed.py and
+times search.search_products against the LIKE query it replaces, for
+common words, multi-word queries, prefixes, rare tokens and a category
+filter. Both sides return --limit matches. FTS ranks them; "like" is the
+first matches in table order (it can stop early), "like_sorted" orders
+them by name, which like any ranking has to look at every row. Prints JSON.
+
+    python benchmarks/search_bench.py --products 1000000 --data-dir /var/tmp/inv-seeds
+"""
+from __future__ import annotations
+import argparse, json, os, random, sqlite3, sys, tempfile, time
+from typing import Any, Callable, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import db  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+from search import search_products  # noqa: E402
+from seed import seed  # noqa: E402
+
+def _like(conn: sqlite3.Connection, text: str, category_id: Optional[str], limit: int,
+          order_by: str = "") -> List[tuple]:
+    where, args = [], []
+    for word in text.split():
+        where.append("(Product_Name LIKE ? OR Product_Description LIKE ?)")
+        args += [f"%{word}%"] * 2
+    if category_id:
+        where.append("Product_Id IN (SELECT Product_Id FROM Product_Category WHERE Category_Id = ?)")
+        args.append(category_id)
+    return conn.execute(
+        f"SELECT Product_Id, Product_Name FROM Products WHERE {' AND '.join(where)} {order_by} LIMIT ?",
+        [*args, limit],
+    ).fetchall()
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--products", type=int, default=1_000_000)
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=383)
+    ap.add_argument("--data-dir", help="keep the seeded database here and reuse it")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        path = os.path.join(data_dir, f"seed-{args.products}-{args.seed}.db")
+        t0 = time.perf_counter()
+        if not os.path.exists(path):
+            seed(path + ".tmp", args.products, seed=args.seed)
+            os.replace(path + ".tmp", path)
+        conn = db.connect(path)
+        ensure_schema(conn)  # builds the index for databases seeded before it existed
+        setup_seconds = time.perf_counter() - t0
+
+        rnd = random.Random(args.seed)
+        rare = conn.execute("SELECT Product_Name FROM Products LIMIT 1 OFFSET ?",
+                            (rnd.randrange(args.products),)).fetchone()[0].split()[-1]
+        category = conn.execute(
+            "SELECT Category_Id FROM Product_Category GROUP BY Category_Id ORDER BY COUNT(*) LIMIT 1"
+        ).fetchone()[0]
+        cases = [
+            ("common word", "steel", None, False),
+            ("two words", "cordless drill", None, False),
+            ("three words", "heavy duty hammer", None, False),
+            ("tail word", "brekuth", None, False),
+            ("prefix", "cordl", None, True),
+            ("rare token", rare, None, False),
+            ("missing word", "zeppelin", None, False),
+            ("word + smallest category", "valve", category, False),
+            ("common word + smallest category", "steel", category, False),
+        ]
+        results = []
+        for name, text, category_id, prefix in cases:
+            fts = lambda: search_products(conn, text, category_id, limit=args.limit, prefix=prefix)  # noqa: E731
+            like = lambda: _like(conn, text, category_id, args.limit)  # noqa: E731
+            like_sorted = lambda: _like(conn, text, category_id, args.limit, "ORDER BY Product_Name")  # noqa: E731
+            fts_s, like_s, sorted_s = _time(fts, args.repeat), _time(like, args.repeat), _time(like_sorted, args.repeat)
+            results.append({
+                "case": name,
+                "query": text,
+                "fts_ms": round(fts_s * 1000, 3),
+                "like_ms": round(like_s * 1000, 3),
+                "like_sorted_ms": round(sorted_s * 1000, 3),
+                "speedup_vs_like": round(like_s / fts_s, 2) if fts_s else None,
+                "speedup_vs_like_sorted": round(sorted_s / fts_s, 2) if fts_s else None,
+                "fts_hits": len(fts()),
+                "like_hits": len(like()),
+            })
+        conn.close()
+
+    print(json.dumps({"products": args.products, "limit": args.limit, "setup_seconds": round(setup_seconds, 2),
+                      "cases": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
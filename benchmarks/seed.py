@@ -0,0 +1,150 @@
+"""Synthetic inventory.db generator.
+
+Builds a database with the current schema and a skewed, realistic fan-out:
+a few suppliers carry most of the catalogue, categories hold thousands of
+products each, and products have a handful of images. The same arguments
+always produce the same database.
+
+    python benchmarks/seed.py /tmp/inv-100k.db --products 100000
+"""
+from __future__ import annotations
+import argparse, json, os, random, sys, time, uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import db  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+
+# Vocabulary for names and descriptions: a few real words, then a long tail
+# of made-up ones. Words are drawn with a Zipf-like skew, so early words are
+# common and most of the tail is rare, as in a real catalogue.
+WORDS = (
+    "steel", "oak", "copper", "wireless", "compact", "heavy", "duty", "mini", "pro", "classic",
+    "cordless", "drill", "hammer", "lamp", "chair", "desk", "cable", "adapter", "valve", "pump",
+    "filter", "sensor", "bracket", "hinge", "screw", "bolt", "panel", "switch", "battery", "charger",
+) + tuple(
+    a + b + c
+    for a in ("ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "bre", "dra", "gli", "pro", "sta", "tri")
+    for b in ("ba", "de", "fi", "go", "ku", "la", "me", "no", "pi", "re", "su", "te", "vi", "xo", "zu")
+    for c in ("n", "x", "l", "r", "t", "s", "m", "k", "d", "ra", "lo", "ne", "ta", "mi", "ko", "ve", "za", "th", "sh", "ck")
+)
+
+def _uuid(rnd: random.Random) -> str:
+    return str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+def _skewed(rnd: random.Random, n: int) -> int:
+    # Index in [0, n) biased towards 0: a few "big" suppliers/categories
+    return int(n * rnd.random() ** 3)
+
+def _text(rnd: random.Random, words: int) -> str:
+    return " ".join(WORDS[int(len(WORDS) * rnd.random() ** 2)] for _ in range(words))
+
+def _chunks(it: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    chunk: List[tuple] = []
+    for row in it:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def default_shape(products: int) -> Tuple[int, int]:
+    """(suppliers, categories) for a catalogue of the given size."""
+    return max(10, products // 100), max(5, products // 2000)
+
+def seed(
+    path: str,
+    products: int,
+    suppliers: Optional[int] = None,
+    categories: Optional[int] = None,
+    images_per_product: float = 3.0,
+    seed: int = 383,
+    binary_ids: bool = False,
+    batch_size: int = 50_000,
+) -> Dict[str, int]:
+    """Create path and fill it. Returns row counts per table."""
+    if os.path.exists(path):
+        raise ValueError(f"{path} already exists")
+    default_suppliers, default_categories = default_shape(products)
+    suppliers = default_suppliers if suppliers is None else suppliers
+    categories = default_categories if categories is None else categories
+    rnd = random.Random(seed)
+
+    conn = db.connect(path, binary_ids=binary_ids)
+    conn.execute("PRAGMA synchronous = OFF")
+    ensure_schema(conn)
+    supplier_ids = [_uuid(rnd) for _ in range(suppliers)]
+    category_ids = [_uuid(rnd) for _ in range(categories)]
+    with conn:
+        conn.executemany(
+            "INSERT INTO Suppliers (Supplier_Id, Supplier_Name, Supplier_Contact) VALUES (?, ?, ?)",
+            ((sid, f"Supplier {i}", f"orders{i}@supplier{i}.example.com") for i, sid in enumerate(supplier_ids)),
+        )
+        conn.executemany(
+            "INSERT INTO Category (Category_Id, Category_Name, Category_Description) VALUES (?, ?, ?)",
+            ((cid, f"Category {i}", _text(rnd, 8)) for i, cid in enumerate(category_ids)),
+        )
+
+    def product_rows() -> Iterator[tuple]:
+        for i in range(products):
+            pid = _uuid(rnd)
+            links = (
+                [supplier_ids[_skewed(rnd, suppliers)] for _ in range(rnd.randint(1, 2))],
+                [category_ids[_skewed(rnd, categories)] for _ in range(rnd.randint(1, 3))],
+                [_uuid(rnd) for _ in range(rnd.randint(0, int(images_per_product * 2)))],
+            )
+            yield (pid, f"{_text(rnd, 3)} {i}", _text(rnd, 20), rnd.randint(0, 500),
+                   round(rnd.uniform(0.5, 500), 2)), links
+
+    counts = {"Products": products, "Suppliers": suppliers, "Category": categories,
+              "Product_Supplier": 0, "Product_Category": 0, "Images": 0}
+    for chunk in _chunks(product_rows(), batch_size):
+        with conn:
+            conn.executemany(
+                "INSERT INTO Products (Product_Id, Product_Name, Product_Description, Product_Quantity, Product_Price) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (row for row, _ in chunk),
+            )
+            counts["Product_Supplier"] += conn.executemany(
+                "INSERT OR IGNORE INTO Product_Supplier (Product_Id, Supplier_Id) VALUES (?, ?)",
+                ((row[0], sid) for row, (sids, _, _) in chunk for sid in sids),
+            ).rowcount
+            counts["Product_Category"] += conn.executemany(
+                "INSERT OR IGNORE INTO Product_Category (Product_Id, Category_Id) VALUES (?, ?)",
+                ((row[0], cid) for row, (_, cids, _) in chunk for cid in cids),
+            ).rowcount
+            counts["Images"] += conn.executemany(
+                "INSERT INTO Images (Image_Id, Product_Id, Image_URL) VALUES (?, ?, ?)",
+                ((iid, row[0], f"https://cdn.example.com/img/{iid}.jpg")
+                 for row, (_, _, iids) in chunk for iid in iids),
+            ).rowcount
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("ANALYZE")
+    conn.close()
+    return counts
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("path")
+    ap.add_argument("--products", type=int, default=100_000)
+    ap.add_argument("--suppliers", type=int, default=None)
+    ap.add_argument("--categories", type=int, default=None)
+    ap.add_argument("--images-per-product", type=float, default=3.0)
+    ap.add_argument("--seed", type=int, default=383)
+    ap.add_argument("--binary-ids", action="store_true")
+    args = ap.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        counts = seed(args.path, args.products, args.suppliers, args.categories,
+                      args.images_per_product, args.seed, args.binary_ids)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps({"path": args.path, "seconds": round(time.perf_counter() - start, 2), "rows": counts}, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
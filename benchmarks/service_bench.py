@@ -0,0 +1,145 @@
+"""Concurrency benchmark for the asyncio service (app/service.py).
+
+Starts the service against a temporary SQLite file, then drives it with N
+concurrent keep-alive HTTP clients issuing a read/write mix. Prints req/s
+and latency percentiles as JSON.
+
+    python benchmarks/service_bench.py --clients 64 --requests 200
+    python benchmarks/service_bench.py --max-batch 1     # one commit per write
+"""
+from __future__ import annotations
+import argparse, asyncio, json, os, random, sys, tempfile, threading, time
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from service import InventoryService  # noqa: E402
+
+class _Client:
+    def __init__(self, host: str, port: int) -> None:
+        self.host, self.port = host, port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Any = None) -> Tuple[int, Any]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = b"" if body is None else json.dumps(body).encode()
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+        )
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            k, _, v = line.decode().partition(":")
+            if k.lower() == "content-length":
+                length = int(v)
+        payload = await self.reader.readexactly(length) if length else b""
+        return status, json.loads(payload) if payload else None
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+async def _run_clients(host: str, port: int, clients: int, requests: int, write_ratio: float, seed: int) -> Dict[str, Any]:
+    setup = _Client(host, port)
+    _, s = await setup.request("POST", "/suppliers", {"supplier_name": "bench", "supplier_contact": "bench@example.com"})
+    supplier_id = s["supplier_id"]
+    product_ids: List[str] = []
+    for i in range(200):
+        _, p = await setup.request("POST", "/products", {"product_name": f"seed {i}", "product_quantity": 10, "product_price": 1.0})
+        product_ids.append(p["product_id"])
+    setup.close()
+
+    latencies: List[float] = []
+    errors = 0
+
+    async def one_client(n: int) -> None:
+        nonlocal errors
+        rnd = random.Random(seed + n)
+        c = _Client(host, port)
+        try:
+            for i in range(requests):
+                roll = rnd.random()
+                t0 = time.perf_counter()
+                if roll < write_ratio / 2:
+                    status, body = await c.request("POST", "/products", {
+                        "product_name": f"c{n}-{i}", "product_quantity": rnd.randint(0, 100), "product_price": 9.99})
+                    if status == 201:
+                        product_ids.append(body["product_id"])
+                elif roll < write_ratio:
+                    status, _ = await c.request("PUT", f"/suppliers/{supplier_id}/products/{rnd.choice(product_ids)}")
+                else:
+                    status, _ = await c.request("GET", f"/products/{rnd.choice(product_ids)}")
+                latencies.append(time.perf_counter() - t0)
+                if status >= 400:
+                    errors += 1
+        finally:
+            c.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_client(n) for n in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+def _serve_in_thread(path: str, max_batch: int) -> Tuple[int, threading.Event, threading.Thread]:
+    """Run the service on its own event loop so clients and server don't share one."""
+    ready: Dict[str, int] = {}
+    started, stop = threading.Event(), threading.Event()
+
+    def run() -> None:
+        async def serve() -> None:
+            svc = InventoryService(path, max_batch=max_batch)
+            server = await svc.start("127.0.0.1", 0)
+            ready["port"] = server.sockets[0].getsockname()[1]
+            started.set()
+            while not stop.is_set():
+                await asyncio.sleep(0.05)
+            await svc.close()
+        asyncio.run(serve())
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    started.wait()
+    return ready["port"], stop, t
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--clients", type=int, default=64)
+    ap.add_argument("--requests", type=int, default=200, help="requests per client")
+    ap.add_argument("--write-ratio", type=float, default=0.5)
+    ap.add_argument("--max-batch", type=int, default=256)
+    ap.add_argument("--seed", type=int, default=383)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        port, stop, thread = _serve_in_thread(os.path.join(tmp, "inventory.db"), args.max_batch)
+        try:
+            result = asyncio.run(_run_clients("127.0.0.1", port, args.clients, args.requests, args.write_ratio, args.seed))
+        finally:
+            stop.set()
+            thread.join()
+    result.update(max_batch=args.max_batch, write_ratio=args.write_ratio)
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Read throughput across processes: live database vs read-only snapshot.
+
+Seeds a catalogue, then for each mode and each process count runs a
+multiprocessing pool in which every process opens its own connection and
+does random product, supplier and category reads (90/8/2%) for --seconds:
+
+  writer    db.connect(path), the read/write connection the CLI uses
+  readonly  db.connect(path, readonly=True): mode=ro, memory-mapped
+  snapshot  the same over a db.copy_snapshot copy, opened immutable
+
+--write-load runs a process committing stock adjustments to the live
+database throughout, which the snapshot readers never see. The entity
+cache is off unless --cache, so every read reaches SQLite. Prints one
+JSON document with reads/sec per run and the speedup over one process.
+
+    python benchmarks/snapshot_read_bench.py --products 100000 --processes 1,2,4,8 --write-load
+"""
+from __future__ import annotations
+import argparse, json, multiprocessing, os, platform, random, sqlite3, sys, tempfile, time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cache  # noqa: E402
+import db  # noqa: E402
+from repository import CategoryRepository, ProductRepository  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+from seed import seed  # noqa: E402
+from stock import adjust_stock  # noqa: E402
+from supplier import read_supplier  # noqa: E402
+
+MODES = ("writer", "readonly", "snapshot")
+
+# Per-process state, set by _init
+_conn: Any = None
+_ids: Dict[str, List[str]] = {}
+
+def _init(path: str, mode: str, ids: Dict[str, List[str]], use_cache: bool) -> None:
+    global _conn, _ids
+    if not use_cache:
+        cache.configure(enabled=False)
+    _conn = db.connect(path, readonly=mode != "writer", immutable=mode == "snapshot")
+    _ids = ids
+
+def _reads(args: tuple) -> int:
+    seconds, seed_value = args
+    rnd = random.Random(seed_value)
+    products, categories = ProductRepository(_conn), CategoryRepository(_conn)
+    pids, sids, cids = _ids["products"], _ids["suppliers"], _ids["categories"]
+    n = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(50):
+            r = rnd.random()
+            # Category reads carry every linked product id, so they are kept rare
+            if r < 0.9:
+                products.read(rnd.choice(pids))
+            elif r < 0.98:
+                read_supplier(_conn, rnd.choice(sids))
+            else:
+                categories.read(rnd.choice(cids))
+        n += 50
+    return n
+
+def _write_load(path: str, pids: List[str], stop: Any, counter: Any) -> None:
+    conn = db.connect(path)
+    rnd = random.Random(1)
+    while not stop.is_set():
+        adjust_stock(conn, {rnd.choice(pids): rnd.choice((-1, 1)) for _ in range(10)})
+        counter.value += 1
+    conn.close()
+
+def _sample_ids(path: str, n: int) -> Dict[str, List[str]]:
+    conn = db.connect(path, readonly=True)
+    rnd = random.Random(7)
+    out = {}
+    for key, table, column in (("products", "Products", "Product_Id"), ("suppliers", "Suppliers", "Supplier_Id"),
+                               ("categories", "Category", "Category_Id")):
+        rows = [r[0] for r in conn.execute(f"SELECT {column} FROM {table}")]
+        out[key] = rnd.sample(rows, min(n, len(rows)))
+    conn.close()
+    return out
+
+def run(path: str, snapshot_path: str, modes: List[str], processes: List[int], seconds: float,
+        write_load: bool, use_cache: bool) -> Dict[str, Any]:
+    ids = _sample_ids(path, 20000)
+    ctx = multiprocessing.get_context("spawn")
+    out: Dict[str, Any] = {}
+    for mode in modes:
+        target = snapshot_path if mode == "snapshot" else path
+        runs = []
+        for n in processes:
+            stop, counter = ctx.Event(), ctx.Value("q", 0)
+            writer = None
+            if write_load:
+                writer = ctx.Process(target=_write_load, args=(path, ids["products"], stop, counter))
+                writer.start()
+            with ctx.Pool(n, _init, (target, mode, ids, use_cache)) as pool:
+                pool.map(_reads, [(0.2, i) for i in range(n)])  # warm up every process
+                t0 = time.perf_counter()
+                counts = pool.map(_reads, [(seconds, 100 + i) for i in range(n)])
+                elapsed = time.perf_counter() - t0
+            if writer is not None:
+                stop.set()
+                writer.join()
+            entry = {"processes": n, "reads": sum(counts), "reads_per_sec": round(sum(counts) / elapsed)}
+            if write_load:
+                entry["write_commits"] = counter.value
+            runs.append(entry)
+        base = runs[0]["reads_per_sec"] / runs[0]["processes"]
+        for entry in runs:
+            entry["speedup"] = round(entry["reads_per_sec"] / base, 2)
+        out[mode] = runs
+    return out
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--products", type=int, default=100000)
+    ap.add_argument("--processes", default=",".join(str(2 ** i) for i in range((os.cpu_count() or 1).bit_length())),
+                    help="comma-separated process counts (default: powers of two up to the core count)")
+    ap.add_argument("--modes", default=",".join(MODES))
+    ap.add_argument("--seconds", type=float, default=3.0, help="measured time per run")
+    ap.add_argument("--write-load", action="store_true", help="commit stock changes to the live database meanwhile")
+    ap.add_argument("--cache", action="store_true", help="leave the entity cache on")
+    ap.add_argument("--seed", type=int, default=383)
+    ap.add_argument("--output", help="write the JSON here as well as to stdout")
+    args = ap.parse_args(argv)
+    modes = args.modes.split(",")
+    if not set(modes) <= set(MODES):
+        ap.error(f"--modes must be from {', '.join(MODES)}")
+
+    report: Dict[str, Any] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "cpus": os.cpu_count(),
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "live.db")
+        seed(path, args.products, seed=args.seed)
+        conn = db.connect(path)
+        ensure_schema(conn)
+        conn.close()
+        db.copy_snapshot(path, os.path.join(tmp, "snapshot.db"))
+        report["results"] = run(path, os.path.join(tmp, "snapshot.db"), modes,
+                                [int(n) for n in args.processes.split(",")], args.seconds,
+                                args.write_load, args.cache)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
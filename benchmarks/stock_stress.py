@@ -0,0 +1,131 @@
+"""Concurrent stock reservation stress test for app/stock.py.
+
+Starts --workers processes, each with its own connection, that place
+random multi-line orders against a few hot products with stock.reserve
+and give some of them back with stock.release. Afterwards every product
+must satisfy
+
+    final quantity == initial - reserved + released  and  final >= 0
+
+i.e. nothing was oversold and no update was lost. Exits 1 if any product
+doesn't. --naive runs the same load through a read-then-UPDATE instead,
+which is what the check is there to catch.
+
+    python benchmarks/stock_stress.py --workers 8 --orders 2000
+"""
+from __future__ import annotations
+import argparse, json, multiprocessing, os, random, sys, tempfile, time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import db  # noqa: E402
+from repository import ProductRepository  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+from stock import reserve, release, stock_levels  # noqa: E402
+
+def _naive_reserve(conn: Any, lines: Dict[str, int]) -> Dict[str, str]:
+    # The pattern stock.py replaces: check in Python, then write the new value
+    levels = stock_levels(conn, lines)
+    if any(levels.get(pid, 0) < n for pid, n in lines.items()):
+        return {pid: "insufficient" for pid in lines}
+    with conn:
+        for pid, n in lines.items():
+            conn.execute("UPDATE Products SET Product_Quantity = ? WHERE Product_Id = ?", (levels[pid] - n, pid))
+    return {}
+
+def _worker(args: Tuple[str, List[str], int, int, float, bool]) -> Dict[str, Any]:
+    path, product_ids, orders, seed, release_ratio, naive = args
+    rnd = random.Random(seed)
+    conn = db.connect(path, busy_timeout_ms=60_000)
+    reserved: Counter = Counter()
+    released: Counter = Counter()
+    held: List[Dict[str, int]] = []
+    placed = rejected = errors = 0
+    latencies: List[float] = []
+    for _ in range(orders):
+        if held and rnd.random() < release_ratio:
+            lines = held.pop(rnd.randrange(len(held)))
+            if not release(conn, lines):
+                released.update(lines)
+            continue
+        lines = {pid: rnd.randint(1, 5) for pid in rnd.sample(product_ids, rnd.randint(1, 3))}
+        t0 = time.perf_counter()
+        try:
+            failed = (_naive_reserve if naive else reserve)(conn, lines)
+        except Exception:
+            # e.g. the CHECK constraint firing under the naive pattern
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - t0)
+        if failed:
+            rejected += 1
+        else:
+            placed += 1
+            reserved.update(lines)
+            held.append(lines)
+    conn.close()
+    return {"reserved": reserved, "released": released, "placed": placed, "rejected": rejected,
+            "errors": errors, "latencies": latencies}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--orders", type=int, default=2000, help="orders per worker")
+    ap.add_argument("--products", type=int, default=10, help="hot products competed for")
+    ap.add_argument("--stock", type=int, default=2000, help="initial quantity per product")
+    ap.add_argument("--release-ratio", type=float, default=0.2)
+    ap.add_argument("--seed", type=int, default=383)
+    ap.add_argument("--naive", action="store_true", help="use read-then-UPDATE instead of stock.reserve")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stock.db")
+        conn = db.connect(path)
+        ensure_schema(conn)
+        repo = ProductRepository(conn)
+        product_ids = [
+            repo.create(product_name=f"hot {i}", product_quantity=args.stock, product_price=1.0)
+            for i in range(args.products)
+        ]
+        conn.close()
+
+        t0 = time.perf_counter()
+        jobs = [(path, product_ids, args.orders, args.seed + w, args.release_ratio, args.naive)
+                for w in range(args.workers)]
+        with multiprocessing.Pool(args.workers) as pool:
+            results = pool.map(_worker, jobs)
+        elapsed = time.perf_counter() - t0
+
+        conn = db.connect(path)
+        final = stock_levels(conn, product_ids)
+        conn.close()
+
+    reserved: Counter = Counter()
+    released: Counter = Counter()
+    for r in results:
+        reserved.update(r["reserved"])
+        released.update(r["released"])
+    violations = {
+        pid: {"final": final[pid], "expected": args.stock - reserved[pid] + released[pid]}
+        for pid in product_ids
+        if final[pid] < 0 or final[pid] != args.stock - reserved[pid] + released[pid]
+    }
+    latencies = sorted(x for r in results for x in r["latencies"])
+    print(json.dumps({
+        "mode": "naive" if args.naive else "stock.reserve",
+        "workers": args.workers,
+        "seconds": round(elapsed, 2),
+        "orders_placed": sum(r["placed"] for r in results),
+        "orders_rejected": sum(r["rejected"] for r in results),
+        "errors": sum(r["errors"] for r in results),
+        "reserve_p50_ms": round(latencies[len(latencies) // 2] * 1000, 3) if latencies else None,
+        "reserve_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 3) if latencies else None,
+        "sold_out_products": sum(1 for q in final.values() if q < 5),
+        "violations": violations,
+    }, indent=2))
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
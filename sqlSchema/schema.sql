@@ -1,30 +1,155 @@
+-- Generated by `python app/schema.py dump` (schema version 7); edit app/schema.py instead.
+
 CREATE TABLE Products (
-    Product_Id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    Product_Name VARCHAR(2000) NOT NULL,
-    Product_Description VARCHAR(10000),
-    Product_Quantity INT NOT NULL CHECK (Product_Quantity >= 0),
-    Product_Price DECIMAL NOT NULL CHECK (Product_Price > 0),
-    Supplier_Ids UUID[] DEFAULT '{}', 
-    Category_Ids UUID[] DEFAULT '{}', 
-    Image_Ids UUID[] DEFAULT '{}'    
-);
+        Product_Id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2))) || '-4' || substr(lower(hex(randomblob(2))), 2) || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) || substr(lower(hex(randomblob(2))), 2) || '-' || lower(hex(randomblob(6)))),
+        Product_Name TEXT NOT NULL,
+        Product_Description TEXT,
+        Product_Quantity INTEGER NOT NULL CHECK (Product_Quantity >= 0),
+        Product_Price REAL NOT NULL CHECK (Product_Price > 0),
+        Supplier_Ids TEXT DEFAULT '[]',   -- legacy JSON array, see Product_Supplier
+        Category_Ids TEXT DEFAULT '[]',   -- legacy JSON array, see Product_Category
+        Image_Ids TEXT DEFAULT '[]'
+    );
 
 CREATE TABLE Suppliers (
-    Supplier_Id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    Supplier_Name VARCHAR(2000) NOT NULL,
-    Supplier_Contact VARCHAR(320) NOT NULL CHECK (Supplier_Contact ~* '^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$'),
-    Product_Ids UUID[] DEFAULT '{}' 
-);
-
-CREATE TABLE Categories (
-    Category_Id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    Category_Name VARCHAR(2000) NOT NULL,
-    Category_Description VARCHAR(10000),
-    Product_Ids UUID[] DEFAULT '{}' 
-);
+        Supplier_Id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2))) || '-4' || substr(lower(hex(randomblob(2))), 2) || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) || substr(lower(hex(randomblob(2))), 2) || '-' || lower(hex(randomblob(6)))),
+        Supplier_Name TEXT NOT NULL,
+        Supplier_Contact TEXT NOT NULL,
+        Product_Ids TEXT DEFAULT '[]'  -- legacy JSON array, see Product_Supplier
+    );
+
+CREATE TABLE Category (
+        Category_Id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2))) || '-4' || substr(lower(hex(randomblob(2))), 2) || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) || substr(lower(hex(randomblob(2))), 2) || '-' || lower(hex(randomblob(6)))),
+        Category_Name TEXT NOT NULL,
+        Category_Description TEXT,
+        Product_Ids TEXT  -- legacy JSON array, see Product_Category
+    );
 
 CREATE TABLE Images (
-    Image_Id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    Product_Id UUID NOT NULL,
-    Image_URL TEXT NOT NULL
-);
+        Image_Id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2))) || '-4' || substr(lower(hex(randomblob(2))), 2) || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) || substr(lower(hex(randomblob(2))), 2) || '-' || lower(hex(randomblob(6)))),
+        Product_Id TEXT NOT NULL,
+        Image_URL TEXT NOT NULL
+    );
+
+CREATE TABLE Product_Supplier (
+        Product_Id TEXT NOT NULL,
+        Supplier_Id TEXT NOT NULL,
+        PRIMARY KEY (Product_Id, Supplier_Id)
+    ) WITHOUT ROWID
+    ;
+
+CREATE INDEX idx_product_supplier_supplier ON Product_Supplier (Supplier_Id, Product_Id);
+
+CREATE TABLE Product_Category (
+        Product_Id TEXT NOT NULL,
+        Category_Id TEXT NOT NULL,
+        PRIMARY KEY (Product_Id, Category_Id)
+    ) WITHOUT ROWID
+    ;
+
+CREATE INDEX idx_product_category_category ON Product_Category (Category_Id, Product_Id);
+
+CREATE INDEX idx_images_product_image ON Images (Product_Id, Image_Id);
+
+CREATE TABLE Schema_Backfill (
+        Name TEXT PRIMARY KEY,
+        Position INTEGER NOT NULL DEFAULT 0,  -- last rowid done
+        Done INTEGER NOT NULL DEFAULT 0,
+        Seq INTEGER NOT NULL                  -- backfills run in the order they were started
+    );
+
+CREATE VIRTUAL TABLE Products_FTS USING fts5(
+        Product_Name, Product_Description,
+        content = 'Products', content_rowid = 'rowid',
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    );
+
+CREATE TABLE Product_Detail (
+            Product_Id TEXT NOT NULL PRIMARY KEY,
+            Product_Name TEXT NOT NULL,
+            Product_Description TEXT,
+            Product_Quantity INTEGER NOT NULL,
+            Product_Price REAL NOT NULL,
+            Suppliers TEXT NOT NULL DEFAULT '[]',   -- [{supplier_id, supplier_name}] by name
+            Categories TEXT NOT NULL DEFAULT '[]',  -- [{category_id, category_name}] by name
+            Images TEXT NOT NULL DEFAULT '[]'       -- [{image_id, image_url}] by id
+        );
+
+CREATE TRIGGER product_detail_product_insert AFTER INSERT ON Products BEGIN INSERT OR REPLACE INTO Product_Detail SELECT p.Product_Id, p.Product_Name, p.Product_Description, p.Product_Quantity, p.Product_Price, (SELECT json_group_array(json_object('supplier_id', id, 'supplier_name', name)) FROM (SELECT s.Supplier_Id AS id, s.Supplier_Name AS name FROM Product_Supplier l JOIN Suppliers s ON s.Supplier_Id = l.Supplier_Id WHERE l.Product_Id = p.Product_Id ORDER BY s.Supplier_Name)), (SELECT json_group_array(json_object('category_id', id, 'category_name', name)) FROM (SELECT c.Category_Id AS id, c.Category_Name AS name FROM Product_Category l JOIN Category c ON c.Category_Id = l.Category_Id WHERE l.Product_Id = p.Product_Id ORDER BY c.Category_Name)), (SELECT json_group_array(json_object('image_id', id, 'image_url', url)) FROM (SELECT i.Image_Id AS id, i.Image_URL AS url FROM Images i WHERE i.Product_Id = p.Product_Id ORDER BY i.Image_Id)) FROM Products p WHERE p.Product_Id = new.Product_Id; END;
+
+CREATE TRIGGER product_detail_product_update AFTER UPDATE OF Product_Name, Product_Description, Product_Quantity, Product_Price ON Products BEGIN UPDATE Product_Detail SET Product_Name = new.Product_Name, Product_Description = new.Product_Description, Product_Quantity = new.Product_Quantity, Product_Price = new.Product_Price WHERE Product_Id = new.Product_Id; END;
+
+CREATE TRIGGER product_detail_product_delete AFTER DELETE ON Products BEGIN DELETE FROM Product_Detail WHERE Product_Id = old.Product_Id; END;
+
+CREATE TRIGGER product_detail_supplier_link AFTER INSERT ON Product_Supplier BEGIN UPDATE Product_Detail SET Suppliers = (SELECT json_group_array(json_object('supplier_id', id, 'supplier_name', name)) FROM (SELECT s.Supplier_Id AS id, s.Supplier_Name AS name FROM Product_Supplier l JOIN Suppliers s ON s.Supplier_Id = l.Supplier_Id WHERE l.Product_Id = Product_Detail.Product_Id ORDER BY s.Supplier_Name)) WHERE Product_Id = new.Product_Id; END;
+
+CREATE TRIGGER product_detail_supplier_unlink AFTER DELETE ON Product_Supplier BEGIN UPDATE Product_Detail SET Suppliers = (SELECT json_group_array(json_object('supplier_id', id, 'supplier_name', name)) FROM (SELECT s.Supplier_Id AS id, s.Supplier_Name AS name FROM Product_Supplier l JOIN Suppliers s ON s.Supplier_Id = l.Supplier_Id WHERE l.Product_Id = Product_Detail.Product_Id ORDER BY s.Supplier_Name)) WHERE Product_Id = old.Product_Id; END;
+
+CREATE TRIGGER product_detail_category_link AFTER INSERT ON Product_Category BEGIN UPDATE Product_Detail SET Categories = (SELECT json_group_array(json_object('category_id', id, 'category_name', name)) FROM (SELECT c.Category_Id AS id, c.Category_Name AS name FROM Product_Category l JOIN Category c ON c.Category_Id = l.Category_Id WHERE l.Product_Id = Product_Detail.Product_Id ORDER BY c.Category_Name)) WHERE Product_Id = new.Product_Id; END;
+
+CREATE TRIGGER product_detail_category_unlink AFTER DELETE ON Product_Category BEGIN UPDATE Product_Detail SET Categories = (SELECT json_group_array(json_object('category_id', id, 'category_name', name)) FROM (SELECT c.Category_Id AS id, c.Category_Name AS name FROM Product_Category l JOIN Category c ON c.Category_Id = l.Category_Id WHERE l.Product_Id = Product_Detail.Product_Id ORDER BY c.Category_Name)) WHERE Product_Id = old.Product_Id; END;
+
+CREATE TRIGGER product_detail_image_insert AFTER INSERT ON Images BEGIN UPDATE Product_Detail SET Images = (SELECT json_group_array(json_object('image_id', id, 'image_url', url)) FROM (SELECT i.Image_Id AS id, i.Image_URL AS url FROM Images i WHERE i.Product_Id = Product_Detail.Product_Id ORDER BY i.Image_Id)) WHERE Product_Id = new.Product_Id; END;
+
+CREATE TRIGGER product_detail_image_delete AFTER DELETE ON Images BEGIN UPDATE Product_Detail SET Images = (SELECT json_group_array(json_object('image_id', id, 'image_url', url)) FROM (SELECT i.Image_Id AS id, i.Image_URL AS url FROM Images i WHERE i.Product_Id = Product_Detail.Product_Id ORDER BY i.Image_Id)) WHERE Product_Id = old.Product_Id; END;
+
+CREATE TRIGGER product_detail_image_update AFTER UPDATE OF Product_Id, Image_URL ON Images BEGIN UPDATE Product_Detail SET Images = (SELECT json_group_array(json_object('image_id', id, 'image_url', url)) FROM (SELECT i.Image_Id AS id, i.Image_URL AS url FROM Images i WHERE i.Product_Id = Product_Detail.Product_Id ORDER BY i.Image_Id)) WHERE Product_Id IN (old.Product_Id, new.Product_Id); END;
+
+CREATE TRIGGER product_detail_supplier_rename AFTER UPDATE OF Supplier_Name ON Suppliers BEGIN UPDATE Product_Detail SET Suppliers = (SELECT json_group_array(json_object('supplier_id', id, 'supplier_name', name)) FROM (SELECT s.Supplier_Id AS id, s.Supplier_Name AS name FROM Product_Supplier l JOIN Suppliers s ON s.Supplier_Id = l.Supplier_Id WHERE l.Product_Id = Product_Detail.Product_Id ORDER BY s.Supplier_Name)) WHERE Product_Id IN (SELECT Product_Id FROM Product_Supplier WHERE Supplier_Id = new.Supplier_Id); END;
+
+CREATE TRIGGER product_detail_supplier_delete AFTER DELETE ON Suppliers BEGIN UPDATE Product_Detail SET Suppliers = (SELECT json_group_array(json_object('supplier_id', id, 'supplier_name', name)) FROM (SELECT s.Supplier_Id AS id, s.Supplier_Name AS name FROM Product_Supplier l JOIN Suppliers s ON s.Supplier_Id = l.Supplier_Id WHERE l.Product_Id = Product_Detail.Product_Id ORDER BY s.Supplier_Name)) WHERE Product_Id IN (SELECT Product_Id FROM Product_Supplier WHERE Supplier_Id = old.Supplier_Id); END;
+
+CREATE TRIGGER product_detail_category_rename AFTER UPDATE OF Category_Name ON Category BEGIN UPDATE Product_Detail SET Categories = (SELECT json_group_array(json_object('category_id', id, 'category_name', name)) FROM (SELECT c.Category_Id AS id, c.Category_Name AS name FROM Product_Category l JOIN Category c ON c.Category_Id = l.Category_Id WHERE l.Product_Id = Product_Detail.Product_Id ORDER BY c.Category_Name)) WHERE Product_Id IN (SELECT Product_Id FROM Product_Category WHERE Category_Id = new.Category_Id); END;
+
+CREATE TRIGGER product_detail_category_delete AFTER DELETE ON Category BEGIN UPDATE Product_Detail SET Categories = (SELECT json_group_array(json_object('category_id', id, 'category_name', name)) FROM (SELECT c.Category_Id AS id, c.Category_Name AS name FROM Product_Category l JOIN Category c ON c.Category_Id = l.Category_Id WHERE l.Product_Id = Product_Detail.Product_Id ORDER BY c.Category_Name)) WHERE Product_Id IN (SELECT Product_Id FROM Product_Category WHERE Category_Id = old.Category_Id); END;
+
+CREATE TABLE Change_Log (
+            Seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            Entity TEXT NOT NULL,   -- product | supplier | category | image
+            Op TEXT NOT NULL,       -- insert | update | delete | link | unlink
+            Entity_Id TEXT NOT NULL,
+            Related_Id TEXT,    -- an image's product; the product linked or unlinked
+            Changed_At TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+        );
+
+CREATE TRIGGER change_log_products_insert AFTER INSERT ON Products  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('product', 'insert', new.Product_Id, NULL); END;
+
+CREATE TRIGGER change_log_products_update AFTER UPDATE ON Products WHEN old.Product_Name IS NOT new.Product_Name OR old.Product_Description IS NOT new.Product_Description OR old.Product_Quantity IS NOT new.Product_Quantity OR old.Product_Price IS NOT new.Product_Price BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('product', 'update', new.Product_Id, NULL); END;
+
+CREATE TRIGGER change_log_products_delete AFTER DELETE ON Products  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('product', 'delete', old.Product_Id, NULL); END;
+
+CREATE TRIGGER change_log_suppliers_insert AFTER INSERT ON Suppliers  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('supplier', 'insert', new.Supplier_Id, NULL); END;
+
+CREATE TRIGGER change_log_suppliers_update AFTER UPDATE ON Suppliers WHEN old.Supplier_Name IS NOT new.Supplier_Name OR old.Supplier_Contact IS NOT new.Supplier_Contact BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('supplier', 'update', new.Supplier_Id, NULL); END;
+
+CREATE TRIGGER change_log_suppliers_delete AFTER DELETE ON Suppliers  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('supplier', 'delete', old.Supplier_Id, NULL); END;
+
+CREATE TRIGGER change_log_category_insert AFTER INSERT ON Category  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('category', 'insert', new.Category_Id, NULL); END;
+
+CREATE TRIGGER change_log_category_update AFTER UPDATE ON Category WHEN old.Category_Name IS NOT new.Category_Name OR old.Category_Description IS NOT new.Category_Description BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('category', 'update', new.Category_Id, NULL); END;
+
+CREATE TRIGGER change_log_category_delete AFTER DELETE ON Category  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('category', 'delete', old.Category_Id, NULL); END;
+
+CREATE TRIGGER change_log_images_insert AFTER INSERT ON Images  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('image', 'insert', new.Image_Id, new.Product_Id); END;
+
+CREATE TRIGGER change_log_images_update AFTER UPDATE ON Images WHEN old.Product_Id IS NOT new.Product_Id OR old.Image_URL IS NOT new.Image_URL BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('image', 'update', new.Image_Id, new.Product_Id); END;
+
+CREATE TRIGGER change_log_images_delete AFTER DELETE ON Images  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('image', 'delete', old.Image_Id, old.Product_Id); END;
+
+CREATE TRIGGER change_log_product_supplier_link AFTER INSERT ON Product_Supplier  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('supplier', 'link', new.Supplier_Id, new.Product_Id); END;
+
+CREATE TRIGGER change_log_product_supplier_unlink AFTER DELETE ON Product_Supplier  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('supplier', 'unlink', old.Supplier_Id, old.Product_Id); END;
+
+CREATE TRIGGER change_log_product_category_link AFTER INSERT ON Product_Category  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('category', 'link', new.Category_Id, new.Product_Id); END;
+
+CREATE TRIGGER change_log_product_category_unlink AFTER DELETE ON Product_Category  BEGIN INSERT INTO Change_Log (Entity, Op, Entity_Id, Related_Id) VALUES ('category', 'unlink', old.Category_Id, old.Product_Id); END;
+
+CREATE TABLE Image_Store (
+        Image_URL TEXT PRIMARY KEY,
+        Content_Hash TEXT,
+        Content_Type TEXT,
+        Size INTEGER,
+        Fetched_At TEXT
+    ) WITHOUT ROWID
+;
+
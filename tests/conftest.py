@@ -0,0 +1,23 @@
+import os, sys
+
+import pytest
+
+# The app modules import each other by bare name (python app/main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import db  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "inventory.db")
+    conn = db.connect(path)
+    ensure_schema(conn)
+    conn.close()
+    return path
+
+@pytest.fixture
+def conn(db_path):
+    conn = db.connect(db_path)
+    yield conn
+    conn.close()
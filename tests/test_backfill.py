@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+import db
+from repository import ProductRepository
+from schema import pending_backfills, run_backfills, start_backfill
+from supplier import create_supplier
+
+class Interrupted(Exception):
+    pass
+
+def _legacy_products(conn, n):
+    # Rows as the old CLI left them: links only in the JSON columns
+    sid = create_supplier(conn, "Acme", "sales@acme.example")
+    pids = ProductRepository(conn).create_many(
+        {"product_name": f"P{i}", "product_quantity": 1, "product_price": 1.0} for i in range(n)
+    )
+    with conn:
+        conn.executemany("UPDATE Products SET Supplier_Ids = ? WHERE Product_Id = ?",
+                         [(json.dumps([sid]), pid) for pid in pids])
+        start_backfill(conn, "json_links_products")
+    return pids
+
+def _linked(conn):
+    return conn.execute("SELECT count(*) FROM Product_Supplier").fetchone()[0]
+
+def test_interrupted_backfill_resumes_where_it_stopped(db_path, conn):
+    pids = _legacy_products(conn, 5)
+
+    def stop_after_first_chunk(name, rows):
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        run_backfills(conn, chunk_rows=2, progress=stop_after_first_chunk)
+    assert _linked(conn) == 2
+    assert pending_backfills(conn) == ["json_links_products"]
+
+    # A fresh process picks up after the committed chunk
+    other = db.connect(db_path)
+    try:
+        assert run_backfills(other, chunk_rows=2) == {"json_links_products": 3}
+        assert pending_backfills(other) == []
+    finally:
+        other.close()
+    assert _linked(conn) == len(pids)
+    assert conn.execute("SELECT count(*) FROM Products WHERE Supplier_Ids != '[]'").fetchone()[0] == 0
+
+def test_finished_backfill_does_not_run_again(conn):
+    _legacy_products(conn, 3)
+    assert run_backfills(conn, chunk_rows=10) == {"json_links_products": 3}
+    assert run_backfills(conn, chunk_rows=10) == {}
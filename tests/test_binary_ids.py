@@ -0,0 +1,43 @@
+import uuid
+
+import db
+from repository import ProductRepository
+from schema import ensure_schema, migrate_to_binary_ids
+from supplier import create_supplier, link_many, read_supplier
+
+def test_ids_are_stored_as_blobs_and_read_back_as_strings(tmp_path):
+    conn = db.connect(str(tmp_path / "binary.db"), binary_ids=True)
+    try:
+        ensure_schema(conn)
+        products = ProductRepository(conn)
+        pid = products.create(product_name="Widget", product_quantity=1, product_price=1.0)
+        sid = create_supplier(conn, "Acme", "sales@acme.example")
+        assert link_many(conn, [(sid, pid)]) == 1
+        assert conn.execute("SELECT typeof(Product_Id), length(Product_Id) FROM Products").fetchone() == ("blob", 16)
+        assert products.read(pid).product_id == pid
+        assert read_supplier(conn, sid).product_ids == [pid]
+    finally:
+        conn.close()
+
+def test_migration_keeps_ids_and_legacy_text_ids(db_path, conn):
+    pid = ProductRepository(conn).create(product_name="Widget", product_quantity=1, product_price=1.0)
+    legacy = "5b7d5f36aa01"
+    with conn:
+        conn.execute("INSERT INTO Products (Product_Id, Product_Name, Product_Quantity, Product_Price) "
+                     "VALUES (?, 'Legacy', 1, 1.0)", (legacy,))
+    conn.close()
+    dst = db_path + ".binary"
+    assert migrate_to_binary_ids(db_path, dst)["Products"] == 2
+
+    binary = db.connect(dst)
+    try:
+        assert binary.binary_ids
+        rows = dict(binary.execute("SELECT Product_Id, typeof(Product_Id) FROM Products").fetchall())
+        assert rows == {pid: "blob", legacy: "text"}
+        products = ProductRepository(binary)
+        assert products.exists(pid)
+        new = str(uuid.uuid4())
+        products.create(product_id=new, product_name="New", product_quantity=1, product_price=1.0)
+        assert products.read(new).product_id == new
+    finally:
+        binary.close()
@@ -0,0 +1,17 @@
+from bulk import import_rows
+from supplier import create_supplier, read_supplier
+
+def test_batch_rows_and_links_commit_together(conn):
+    sid = create_supplier(conn, "Acme", "sales@acme.example")
+    statements = []
+    conn.set_trace_callback(statements.append)
+    report = import_rows(conn, "products", [
+        {"product_name": f"P{i}", "product_quantity": "1", "product_price": "2.5", "supplier_ids": sid}
+        for i in range(3)
+    ])
+    conn.set_trace_callback(None)
+    assert (report.rows_inserted, report.links_inserted) == (3, 3)
+    # The savepoint nests inside one transaction instead of committing the rows by itself
+    assert [s for s in statements if s.split()[0] in ("BEGIN", "SAVEPOINT", "RELEASE", "COMMIT")] == [
+        "BEGIN IMMEDIATE", "SAVEPOINT bulk_batch", "RELEASE bulk_batch", "COMMIT"]
+    assert len(read_supplier(conn, sid).product_ids) == 3
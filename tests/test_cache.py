@@ -0,0 +1,55 @@
+import pytest
+
+import cache, db
+from repository import ProductRepository
+
+@pytest.fixture(autouse=True)
+def cache_on():
+    cache.configure(enabled=True)
+    yield
+    cache.configure(enabled=cache.is_enabled())
+
+@pytest.fixture
+def reader(db_path):
+    conn = db.connect(db_path, readonly=True)
+    yield conn
+    conn.close()
+
+def _product(conn, quantity):
+    return ProductRepository(conn).create(product_name="Widget", product_quantity=quantity, product_price=1.0)
+
+def test_committed_update_is_seen_by_other_connections(conn, reader):
+    pid = _product(conn, 5)
+    assert ProductRepository(reader).read(pid).product_quantity == 5
+    ProductRepository(conn).update(pid, product_quantity=7)
+    assert ProductRepository(reader).read(pid).product_quantity == 7
+
+def test_copy_cached_before_commit_is_dropped_at_commit(conn, reader):
+    pid = _product(conn, 5)
+    with conn:
+        conn.execute("UPDATE Products SET Product_Quantity = 9 WHERE Product_Id = ?", (pid,))
+        cache.invalidate(conn, "Products", [pid])
+        # The reader still sees the committed row and caches it
+        assert ProductRepository(reader).read(pid).product_quantity == 5
+    assert ProductRepository(reader).read(pid).product_quantity == 9
+
+def test_rolled_back_create_is_not_cached(conn):
+    products = ProductRepository(conn)
+    # batch() turns the create's own `with conn:` into a savepoint of one transaction
+    with pytest.raises(RuntimeError):
+        with conn.batch():
+            pid = _product(conn, 1)
+            assert products.exists(pid)
+            raise RuntimeError
+    assert not products.exists(pid)
+
+def test_rolled_back_update_is_not_cached(conn, reader):
+    pid = _product(conn, 5)
+    products = ProductRepository(conn)
+    with pytest.raises(RuntimeError):
+        with conn.batch():
+            products.update(pid, product_quantity=1)
+            assert products.read(pid).product_quantity == 1
+            raise RuntimeError
+    assert products.read(pid).product_quantity == 5
+    assert ProductRepository(reader).read(pid).product_quantity == 5
@@ -0,0 +1,44 @@
+from cascade import delete_products
+from repository import CategoryRepository, ImageRepository, ProductRepository
+from supplier import create_supplier, read_supplier
+
+def _count(conn, sql, *args):
+    return conn.execute(sql, args).fetchone()[0]
+
+def test_delete_removes_links_images_and_emptied_categories(conn):
+    products, categories = ProductRepository(conn), CategoryRepository(conn)
+    sid = create_supplier(conn, "Acme", "sales@acme.example")
+    shared = categories.create(category_name="Shared")
+    alone = categories.create(category_name="Alone")
+    doomed, kept = products.create_many([
+        {"product_name": "Doomed", "product_quantity": 1, "product_price": 1.0,
+         "supplier_ids": [sid], "category_ids": [shared, alone]},
+        {"product_name": "Kept", "product_quantity": 1, "product_price": 1.0,
+         "supplier_ids": [sid], "category_ids": [shared]},
+    ])
+    ImageRepository(conn).create(product_id=doomed, image_url="https://img.example/1.png")
+
+    assert delete_products(conn, [doomed]) == 1
+
+    assert not products.exists(doomed)
+    assert products.exists(kept)
+    assert _count(conn, "SELECT count(*) FROM Product_Supplier WHERE Product_Id = ?", doomed) == 0
+    assert _count(conn, "SELECT count(*) FROM Product_Category WHERE Product_Id = ?", doomed) == 0
+    assert _count(conn, "SELECT count(*) FROM Images WHERE Product_Id = ?", doomed) == 0
+    assert _count(conn, "SELECT count(*) FROM Category WHERE Category_Id = ?", alone) == 0
+    assert _count(conn, "SELECT count(*) FROM Category WHERE Category_Id = ?", shared) == 1
+    assert read_supplier(conn, sid).product_ids == [kept]
+
+def test_delete_can_keep_emptied_categories(conn):
+    cid = CategoryRepository(conn).create(category_name="Tools")
+    pid = ProductRepository(conn).create(product_name="Widget", product_quantity=1, product_price=1.0,
+                                         category_ids=[cid])
+    assert delete_products(conn, [pid], drop_empty_categories=False) == 1
+    assert _count(conn, "SELECT count(*) FROM Category WHERE Category_Id = ?", cid) == 1
+
+def test_delete_batch_counts_only_existing_products(conn):
+    pids = ProductRepository(conn).create_many(
+        {"product_name": f"P{i}", "product_quantity": 1, "product_price": 1.0} for i in range(3)
+    )
+    assert delete_products(conn, pids + pids[:1] + ["not-a-product"]) == 3
+    assert _count(conn, "SELECT count(*) FROM Products") == 0
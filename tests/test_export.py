@@ -0,0 +1,27 @@
+import json, os, sqlite3, uuid
+
+import pytest
+
+from export import export
+
+def test_export_upgrades_an_old_database_first(tmp_path):
+    # A products table as the original app created it, with no later tables
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Products (Product_Id TEXT PRIMARY KEY, Product_Name TEXT NOT NULL, "
+                 "Product_Description TEXT, Product_Quantity INTEGER NOT NULL, Product_Price REAL NOT NULL, "
+                 "Supplier_Ids TEXT, Category_Ids TEXT, Image_Ids TEXT)")
+    pid = str(uuid.uuid4())
+    conn.execute("INSERT INTO Products VALUES (?, 'Widget', NULL, 1, 2.5, '[]', '[]', '[]')", (pid,))
+    conn.commit()
+    conn.close()
+
+    report = export(path, str(tmp_path / "out"), ["products", "suppliers"])
+    assert (report["products"]["rows"], report["suppliers"]["rows"]) == (1, 0)
+    with open(report["products"]["path"]) as f:
+        assert json.loads(f.readline())["product_id"] == pid
+
+def test_export_of_a_missing_database_is_a_value_error(tmp_path):
+    with pytest.raises(ValueError):
+        export(str(tmp_path / "missing.db"), str(tmp_path / "out"))
+    assert not os.path.exists(tmp_path / "missing.db")
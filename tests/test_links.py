@@ -0,0 +1,58 @@
+import uuid
+
+import pytest
+
+from repository import CategoryRepository, ProductRepository
+from supplier import create_supplier, link_many, read_supplier, unlink_many
+
+def _products(conn, n):
+    return ProductRepository(conn).create_many(
+        {"product_name": f"P{i}", "product_quantity": 1, "product_price": 1.0} for i in range(n)
+    )
+
+def _links(conn, sid):
+    return sorted(r[0] for r in conn.execute("SELECT Product_Id FROM Product_Supplier WHERE Supplier_Id = ?", (sid,)))
+
+def test_link_many_links_each_pair_once(conn):
+    s1 = create_supplier(conn, "A", "a@example.com")
+    s2 = create_supplier(conn, "B", "b@example.com")
+    p1, p2 = _products(conn, 2)
+    assert link_many(conn, [(s1, p1), (s1, p2), (s2, p1), (s1, p1)]) == 3
+    assert link_many(conn, [(s1, p1)]) == 0
+    assert _links(conn, s1) == sorted([p1, p2])
+    assert read_supplier(conn, s2).product_ids == [p1]
+
+def test_link_many_is_all_or_nothing(conn):
+    sid = create_supplier(conn, "Acme", "sales@acme.example")
+    pid, = _products(conn, 1)
+    with pytest.raises(KeyError):
+        link_many(conn, [(sid, pid), (sid, str(uuid.uuid4()))])
+    with pytest.raises(ValueError):
+        link_many(conn, [(sid, pid), (sid, "not-a-uuid")])
+    assert _links(conn, sid) == []
+
+def test_link_many_matches_text_ids_exactly(conn):
+    sid = create_supplier(conn, "Acme", "sales@acme.example")
+    pid, = _products(conn, 1)
+    # The real id in the same call must not vouch for its upper-case twin
+    with pytest.raises(KeyError):
+        link_many(conn, [(sid, pid), (sid, pid.upper())])
+    assert _links(conn, sid) == []
+
+def test_unlink_many_removes_only_existing_links(conn):
+    sid = create_supplier(conn, "Acme", "sales@acme.example")
+    p1, p2, p3 = _products(conn, 3)
+    link_many(conn, [(sid, p1), (sid, p2)])
+    assert unlink_many(conn, [(sid, p1), (sid, p3)]) == 1
+    assert read_supplier(conn, sid).product_ids == [p2]
+
+def test_category_link_many_and_unlink_many(conn):
+    categories = CategoryRepository(conn)
+    cid = categories.create(category_name="Tools")
+    p1, p2 = _products(conn, 2)
+    assert categories.link_many([(cid, p1), (cid, p2)]) == 2
+    assert sorted(categories.read(cid).product_ids) == sorted([p1, p2])
+    with pytest.raises(KeyError):
+        categories.link_many([(cid, str(uuid.uuid4()))])
+    assert categories.unlink_many([(cid, p1)]) == 1
+    assert categories.read(cid).product_ids == [p2]
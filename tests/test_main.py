@@ -0,0 +1,27 @@
+import io, uuid
+
+import pytest
+
+from main import main, run_script
+from repository import ProductRepository
+
+def _products(conn, n):
+    return ProductRepository(conn).create_many(
+        {"product_name": f"P{i}", "product_quantity": 1, "product_price": 1.0} for i in range(n)
+    )
+
+def test_delete_with_a_missing_id_deletes_nothing(db_path, conn, capsys):
+    pids = _products(conn, 2)
+    assert main(["--db", db_path, "product", "delete", *pids, str(uuid.uuid4())]) == 1
+    assert "not found" in capsys.readouterr().err
+    assert all(ProductRepository(conn).exists(pid) for pid in pids)
+    assert main(["--db", db_path, "product", "delete", *pids]) == 0
+    assert not any(ProductRepository(conn).exists(pid) for pid in pids)
+
+def test_failed_script_prints_nothing_and_saves_nothing(conn):
+    out = io.StringIO()
+    with pytest.raises(KeyError, match="line 2"):
+        run_script(conn, ["product create --name A --quantity 1 --price 2",
+                          f"product read {uuid.uuid4()}"], out)
+    assert out.getvalue() == ""
+    assert conn.execute("SELECT count(*) FROM Products").fetchone()[0] == 0
@@ -0,0 +1,25 @@
+from repository import CategoryRepository, ProductRepository, SupplierRepository
+from supplier import create_supplier
+
+def _category_count(conn):
+    return conn.execute("SELECT count(*) FROM Category").fetchone()[0]
+
+def test_product_delete_drops_emptied_categories(conn):
+    categories, products = CategoryRepository(conn), ProductRepository(conn)
+    emptied = categories.create(category_name="Emptied")
+    shared = categories.create(category_name="Shared")
+    doomed, kept = products.create_many([
+        {"product_name": "Doomed", "product_quantity": 1, "product_price": 1.0, "category_ids": [emptied, shared]},
+        {"product_name": "Kept", "product_quantity": 1, "product_price": 1.0, "category_ids": [shared]},
+    ])
+    products.delete(doomed)
+    assert not categories.exists(emptied)
+    assert categories.read(shared).product_ids == [kept]
+
+def test_supplier_delete_many_drops_emptied_categories_too(conn):
+    sid = create_supplier(conn, "Acme", "sales@acme.example")
+    cid = CategoryRepository(conn).create(category_name="Tools")
+    ProductRepository(conn).create(product_name="Widget", product_quantity=1, product_price=1.0,
+                                   supplier_ids=[sid], category_ids=[cid])
+    assert SupplierRepository(conn).delete_many([sid]) == 1
+    assert _category_count(conn) == 0
@@ -0,0 +1,24 @@
+import asyncio, json
+
+import pytest
+
+from service import InventoryService
+
+@pytest.mark.parametrize("method, target, body, error", [
+    ("POST", "/suppliers/links", {}, "pairs is required"),
+    ("POST", "/suppliers/links", {"pairs": {}}, "pairs must be a list"),
+    ("POST", "/suppliers/links", {"pairs": [1]}, "pairs[0] must be a [supplier_id, product_id] list of two id strings"),
+    ("POST", "/categories/unlinks", {"pairs": [["a"]]}, "pairs[0] must be a [category_id, product_id] list of two id strings"),
+    ("POST", "/stock/reserve", {"lines": [1]}, "lines must be an object"),
+    ("GET", "/products?min_price=abc", None, "min_price must be a number"),
+    ("GET", "/changes?since=x", None, "since must be an integer"),
+])
+def test_malformed_requests_are_400_with_a_readable_message(db_path, method, target, body, error):
+    async def run():
+        svc = InventoryService(db_path)
+        try:
+            return await svc.dispatch(method, target, b"" if body is None else json.dumps(body).encode())
+        finally:
+            await svc.close()
+
+    assert asyncio.run(run()) == (400, {"error": error})
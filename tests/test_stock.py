@@ -0,0 +1,51 @@
+import uuid
+
+from repository import ProductRepository
+from stock import INSUFFICIENT, NOT_FOUND, adjust_stock, release, reserve, stock_levels
+
+def _products(conn, *quantities):
+    return ProductRepository(conn).create_many(
+        {"product_name": f"P{i}", "product_quantity": q, "product_price": 1.0} for i, q in enumerate(quantities)
+    )
+
+def test_reserve_takes_every_line(conn):
+    a, b = _products(conn, 5, 3)
+    assert reserve(conn, {a: 2, b: 3}) == {}
+    assert stock_levels(conn, [a, b]) == {a: 3, b: 0}
+
+def test_reserve_is_all_or_nothing(conn):
+    a, b = _products(conn, 5, 1)
+    assert reserve(conn, {a: 2, b: 2}) == {b: INSUFFICIENT}
+    assert stock_levels(conn, [a, b]) == {a: 5, b: 1}
+
+def test_reserve_unknown_product_changes_nothing(conn):
+    a, = _products(conn, 5)
+    missing = str(uuid.uuid4())
+    assert reserve(conn, {a: 1, missing: 1}) == {missing: NOT_FOUND}
+    assert stock_levels(conn, [a]) == {a: 5}
+
+def test_release_puts_stock_back(conn):
+    a, = _products(conn, 5)
+    reserve(conn, {a: 4})
+    assert release(conn, {a: 4}) == {}
+    assert stock_levels(conn, [a]) == {a: 5}
+
+def test_atomic_adjust_rolls_back_on_any_failure(conn):
+    a, b = _products(conn, 5, 0)
+    assert adjust_stock(conn, {a: 10, b: -1}, atomic=True) == {b: INSUFFICIENT}
+    assert stock_levels(conn, [a, b]) == {a: 5, b: 0}
+
+def test_non_atomic_adjust_applies_the_other_lines(conn):
+    a, b = _products(conn, 5, 0)
+    assert adjust_stock(conn, {a: -5, b: -1}) == {b: INSUFFICIENT}
+    assert stock_levels(conn, [a, b]) == {a: 0, b: 0}
+
+def test_reserve_rejects_non_positive_quantities(conn):
+    a, = _products(conn, 5)
+    for n in (0, -1, 1.5, True):
+        try:
+            reserve(conn, {a: n})
+        except ValueError:
+            continue
+        raise AssertionError(f"reserve accepted {n!r}")
+    assert stock_levels(conn, [a]) == {a: 5}